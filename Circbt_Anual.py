@@ -0,0 +1,142 @@
+##########################################################
+##   Simulação de longo prazo (anual) em blocos         ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Avança a solução em blocos de passos (ex.: 52.560 passos de 10 min = 1 ano).
+# Ao fim de cada bloco os monitores são gravados em disco (array colunar
+# monitor x canal x tempo, mapeado em memória), os contadores de DRP/DRC e o
+# carregamento do trafo são atualizados (inclusive o modelo térmico, que continua
+# do estado do bloco anterior) e os monitores são zerados. Assim a memória usada
+# não depende do horizonte simulado.
+
+import os
+import numpy as np
+import pandas as pd
+from Circbt_Monitores import extrair_monitores, monitores_ativos
+from Circbt_Indicadores import FAIXAS_PRODIST, calcular_indicadores
+from Circbt_Trafo import envelhecimento_trafo
+
+
+def executar_periodo(sessao, n_passos, pasta_saida, passos_bloco=1440, faixas=FAIXAS_PRODIST[127],
+                     trafo=None, kva_admissivel=None, temperatura_ambiente=30.0):
+    # temperatura_ambiente (°C): escalar ou perfil com n_passos valores || trafo: padrão o da sessão
+    dss = sessao.dss
+    trafo = trafo or sessao.trafo
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    nomes = monitores_ativos(dss)
+    barras = list(sessao.monitores_barras)
+    monitores_barras = [sessao.monitores_barras[b] for b in barras]
+
+    # Potência nominal do trafo e limite de sobrecarga admissível (1,2 pu, como nos gráficos dos REV)
+    dss.transformers.name = trafo
+    kva_nominal = dss.transformers.kva
+    kva_admissivel = kva_admissivel or 1.2 * kva_nominal
+    passo_h = dss.solution.step_size / 3600
+
+    # Acumuladores dos indicadores
+    contagens = np.zeros((len(barras), 3, 5), dtype=np.int64)
+    trafo_kva_max = 0.0
+    trafo_kwh = 0.0
+    passos_acima_nominal = 0
+    passos_acima_admissivel = 0
+    estado_termico = None
+    ponto_quente_max = -np.inf
+    perda_vida_h = 0.0
+
+    sessao.preparar()
+    arquivo = None
+    inicio = 0
+    while inicio < n_passos:
+        n = min(passos_bloco, n_passos - inicio)
+        dss.solution.number = n
+        dss.solution.solve()
+
+        dados = extrair_monitores(dss, nomes)
+        dss.monitors.reset_all()
+
+        # Arquivo colunar criado no primeiro bloco (já se conhece o nº de canais)
+        if arquivo is None:
+            arquivo = np.lib.format.open_memmap(os.path.join(pasta_saida, "monitores.npy"), mode="w+",
+                                                dtype=np.float32, shape=(len(nomes), dados.dados.shape[1], n_passos))
+            horas = np.lib.format.open_memmap(os.path.join(pasta_saida, "horas.npy"), mode="w+",
+                                              dtype=np.float64, shape=(n_passos,))
+        arquivo[:, :, inicio:inicio + n] = dados.dados
+        horas[inicio:inicio + n] = dados.horas
+        arquivo.flush()
+        horas.flush()
+
+        # DRP/DRC acumulados (ocupação das faixas por barra e fase)
+        tensoes = dados.selecionar(monitores_barras, [1, 3, 5])
+        contagens += calcular_indicadores(tensoes, faixas, percentis=())["histograma"]
+
+        # Carregamento do trafo (P = canais 1, 3, 5 || Q = canais 2, 4, 6)
+        ptotal = dados.selecionar([f"P_{trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+        qtotal = dados.selecionar([f"P_{trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+        stotal = np.sqrt(ptotal**2 + qtotal**2)
+        trafo_kva_max = max(trafo_kva_max, stotal.max())
+        trafo_kwh += ptotal.sum() * passo_h
+        passos_acima_nominal += np.count_nonzero(stotal > kva_nominal)
+        passos_acima_admissivel += np.count_nonzero(stotal > kva_admissivel)
+
+        # Modelo térmico do trafo (estado levado de um bloco para o seguinte)
+        ambiente = temperatura_ambiente if np.ndim(temperatura_ambiente) == 0 else \
+            np.asarray(temperatura_ambiente)[inicio:inicio + n]
+        termico = envelhecimento_trafo(stotal, kva_nominal, passo_h, ambiente, estado=estado_termico)
+        estado_termico = termico["estado"]
+        ponto_quente_max = max(ponto_quente_max, float(termico["ponto_quente_max"]))
+        perda_vida_h += float(termico["perda_vida_h"])
+
+        inicio += n
+
+    dss.solution.number = sessao.number
+
+    # Nomes dos monitores e canais gravados junto com o array
+    largura = max(len(c) for canais in dados.canais for c in canais)
+    canais = np.full((len(nomes), dados.dados.shape[1]), "", dtype=f"U{largura}")
+    for i, c in enumerate(dados.canais):
+        canais[i, :len(c)] = c
+    np.save(os.path.join(pasta_saida, "nomes_monitores.npy"), np.array(nomes))
+    np.save(os.path.join(pasta_saida, "canais.npy"), canais)
+
+    # Indicadores finais
+    df_indicadores = pd.DataFrame({'barra': barras, 'monitor': monitores_barras})
+    validas = np.maximum(contagens.sum(axis=-1), 1)   # amostras com tensão (sem os NaN de fases inexistentes)
+    for k, fase in enumerate("ABC"):
+        df_indicadores[f'DRP_{fase}'] = 100 * (contagens[:, k, 1] + contagens[:, k, 3]) / validas[:, k]
+        df_indicadores[f'DRC_{fase}'] = 100 * (contagens[:, k, 0] + contagens[:, k, 4]) / validas[:, k]
+    df_indicadores.to_csv(os.path.join(pasta_saida, "indicadores_barras.csv"), index=False)
+
+    resumo_trafo = {
+        "kVA_max": trafo_kva_max,
+        "kWh": trafo_kwh,
+        "horas_acima_nominal": passos_acima_nominal * passo_h,
+        "horas_acima_admissivel": passos_acima_admissivel * passo_h,
+        "ponto_quente_max": ponto_quente_max,
+        "FEQA": perda_vida_h / (n_passos * passo_h),
+        "perda_vida_h": perda_vida_h,
+    }
+    return df_indicadores, resumo_trafo
+
+
+def carregar_periodo(pasta_saida):
+    # Leitura mapeada em memória do que foi gravado por executar_periodo
+    dados = np.load(os.path.join(pasta_saida, "monitores.npy"), mmap_mode="r")
+    horas = np.load(os.path.join(pasta_saida, "horas.npy"), mmap_mode="r")
+    nomes = list(np.load(os.path.join(pasta_saida, "nomes_monitores.npy")))
+    canais = np.load(os.path.join(pasta_saida, "canais.npy"))
+    return nomes, canais, horas, dados
+
+
+if __name__ == "__main__":
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    pasta_saida = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados_anuais')
+
+    # Um ano em passos de 10 minutos (as curvas diárias se repetem a cada 24 h)
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    df_indicadores, resumo_trafo = executar_periodo(sessao, 365 * 144, pasta_saida)
+    print(df_indicadores.round(2).to_string(index=False))
+    print(resumo_trafo)
@@ -0,0 +1,265 @@
+##########################################################
+##   Benchmark das etapas do fluxo de simulação         ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Mede cada etapa do fluxo dos REV (leitura dos loadshapes, Compile, criação
+# dos monitores, solve diário, extração dos monitores, DRP/DRC, montagem dos
+# DataFrames e geração das figuras) no circuito original e em circuitos
+# sintéticos maiores (Circbt_Gerador). Para cada etapa: tempo (mediana das
+# repetições), memória alocada no pico da etapa e nº de chamadas à interface do
+# OpenDSS. A memória da etapa vem do tracemalloc (Python e numpy; as alocações
+# internas do OpenDSS ficam de fora) em uma execução extra, não cronometrada;
+# o pico de RSS do processo todo (ru_maxrss) é informado à parte.
+# Os resultados podem ser gravados como referência (baseline) e comparados
+# em execuções futuras, indicando as etapas que ficaram mais lentas.
+#
+# Uso:  python Circbt_Benchmark.py [--tamanhos 100 1000] [--repeticoes 3]
+#                                  [--salvar] [--limiar 0.2] [--referencia arquivo.json]
+#                                  [--rastros pasta]
+
+import os
+import io
+import json
+import time
+import platform
+import tracemalloc
+import resource
+import tempfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+FILE_DSS_ORIGINAL = os.path.join(PASTA, 'dssfiles', 'circbtfull_storage.dss')
+REFERENCIA_PADRAO = os.path.join(PASTA, 'benchmarks', 'referencia.json')
+
+ETAPAS = ("loadshapes", "compile", "monitores", "solve", "extracao", "indicadores", "dataframes", "graficos")
+
+LIMIAR_PADRAO = 0.20      # aumento relativo considerado regressão (20%)
+TOLERANCIA_TEMPO = 0.005  # diferenças abaixo de 5 ms são ruído de medição
+TOLERANCIA_MEMORIA = 5.0  # MB
+
+
+############################
+### Etapas medidas
+############################
+
+
+def _rss_mb():
+    # Pico de memória do processo desde o início (ru_maxrss em kB no Linux): cumulativo, não por etapa
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _figuras(dados, monitores, horas, trafo):
+    # As figuras dos REV (tensões de um poste, P, Q e S do trafo e mapa de todas as barras), sem exibição
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from Circbt_Graficos import plotar_mapa_tensoes
+
+    tensoes = dados.selecionar([monitores[-1]], [1, 3, 5])[0]
+    p = dados.selecionar([f"P_{trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+    q = dados.selecionar([f"P_{trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+    series = [(tensoes, (105, 140)), (p, (-30, 120)), (q, (0, 30)), (np.sqrt(p**2 + q**2), (0, 150))]
+
+    for valores, limites in series:
+        fig = Figure(figsize=(6, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        for serie in np.atleast_2d(valores):
+            ax.step(horas, serie, where='post')
+        ax.set_ylim(*limites)
+        ax.grid(True, linestyle='--')
+        fig.savefig(io.BytesIO(), format="png")
+
+    fig = Figure(figsize=(9, 6))
+    FigureCanvasAgg(fig)
+    plotar_mapa_tensoes(dados.selecionar(monitores, [1])[:, 0], horas, ax=fig.add_subplot())
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def _medir_caso(file_dss, repeticoes, arquivo_rastro=None):
+    # Executado em um processo novo para cada caso (pico de memória isolado)
+    import Circbt_Perfil as perfil
+    from Circbt_Sessao import SessaoDSS
+    from Circbt_Monitores import extrair_monitores
+    from Circbt_Indicadores import calcular_indicadores
+    from Circbt_Loadshapes import ler_loadshapes_dss
+    from Circbt_Cache import arquivos_circuito
+
+    # Chamadas ao OpenDSS contadas pelo Circbt_Perfil (a sessão envolve o objeto DSS)
+    perfil.ativar(rastro=arquivo_rastro is not None)
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    arquivo_loadshapes = next((a for a in arquivos_circuito(file_dss) if "loadshape" in os.path.basename(a).lower()),
+                              file_dss)
+    estado = {}
+
+    def loadshapes():
+        estado["loadshapes"] = ler_loadshapes_dss(arquivo_loadshapes)
+
+    def compilar():
+        sessao.carregar_circuito()
+
+    def monitores():
+        sessao.instrumentar()
+
+    def solve():
+        sessao.resolver()
+
+    def extracao():
+        estado["dados"] = extrair_monitores(sessao.dss)
+
+    def indicadores():
+        monitores = list(sessao.monitores_barras.values())
+        estado["monitores"] = monitores
+        estado["indicadores"] = calcular_indicadores(estado["dados"].selecionar(monitores, [1, 3, 5]))
+
+    def dataframes():
+        # Tensões de todas as barras (tempo x barra-fase) e tabela de indicadores, como nos REV
+        dados, monitores = estado["dados"], estado["monitores"]
+        tensoes = dados.selecionar(monitores, [1, 3, 5])
+        colunas = [f"{m}_{fase}" for m in monitores for fase in "ABC"]
+        df_tensoes = pd.DataFrame(tensoes.reshape(-1, tensoes.shape[-1]).T, columns=colunas)
+        df_tensoes.insert(0, 'tempo', np.arange(len(df_tensoes)) / 6)
+        df_indicadores = pd.DataFrame({'monitor': monitores})
+        for indice in ("DRP", "DRC", "P1", "P99"):
+            for k, fase in enumerate("ABC"):
+                df_indicadores[f'{indice}_{fase}'] = estado["indicadores"][indice][:, k]
+        estado["horas"] = df_tensoes['tempo'].to_numpy()
+
+    def graficos():
+        _figuras(estado["dados"], estado["monitores"], estado["horas"], sessao.trafo)
+
+    funcoes = dict(zip(ETAPAS, (loadshapes, compilar, monitores, solve, extracao, indicadores, dataframes, graficos)))
+
+    # Uma execução de aquecimento (imports, caches do OpenDSS) seguida das repetições medidas
+    tempos = {etapa: [] for etapa in ETAPAS}
+    chamadas = {}
+    for repeticao in range(repeticoes + 1):
+        if repeticao == 1:
+            perfil.zerar()   # o rastro fica só com as repetições medidas
+        for etapa in ETAPAS:
+            antes = perfil.total_chamadas()
+            inicio = time.perf_counter()
+            with perfil.etapa(f"benchmark.{etapa}"):
+                funcoes[etapa]()
+            tempo = time.perf_counter() - inicio
+            if repeticao > 0:
+                tempos[etapa].append(tempo)
+                chamadas[etapa] = perfil.total_chamadas() - antes
+    if arquivo_rastro:
+        perfil.gravar_rastro(arquivo_rastro)
+    rss_pico = _rss_mb()
+
+    # Memória de cada etapa: pico alocado durante a etapa acima do que já estava alocado no início,
+    # em uma execução à parte (o tracemalloc deixa as etapas mais lentas)
+    memoria = {}
+    tracemalloc.start()
+    for etapa in ETAPAS:
+        tracemalloc.reset_peak()
+        alocado = tracemalloc.get_traced_memory()[0]
+        funcoes[etapa]()
+        memoria[etapa] = (tracemalloc.get_traced_memory()[1] - alocado) / 1024**2
+    tracemalloc.stop()
+
+    return {
+        "barras": len(sessao.monitores_barras),
+        "cargas": len(sessao.loads),
+        "etapas": {etapa: {"tempo_s": float(np.median(tempos[etapa])), "memoria_mb": memoria[etapa],
+                           "chamadas": chamadas[etapa], "rss_pico_processo_mb": rss_pico} for etapa in ETAPAS},
+    }
+
+
+############################
+### Execução e comparação
+############################
+
+
+def preparar_casos(tamanhos, pasta):
+    # Circuito original + sintéticos (semente fixa: os mesmos circuitos em todas as execuções)
+    from Circbt_Gerador import gravar_alimentador
+    casos = {"original": FILE_DSS_ORIGINAL}
+    for n in tamanhos:
+        casos[f"sintetico_{n}"] = gravar_alimentador(os.path.join(pasta, f"circbt_sintetico_{n}.dss"),
+                                                     n_barras=n, semente=0)
+    return casos
+
+
+def executar_benchmark(tamanhos=(100, 1000), repeticoes=3, pasta_rastros=None):
+    # pasta_rastros: um rastro (Trace Event JSON) por caso, para abrir no chrome://tracing / Perfetto
+    linhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        casos = preparar_casos(tamanhos, pasta)
+        for caso, file_dss in casos.items():
+            # Um processo por caso (spawn: sem herdar a memória do processo principal)
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                arquivo_rastro = None
+                if pasta_rastros:
+                    os.makedirs(pasta_rastros, exist_ok=True)
+                    arquivo_rastro = os.path.abspath(os.path.join(pasta_rastros, f"rastro_{caso}.json"))
+                resultado = executor.submit(_medir_caso, file_dss, repeticoes, arquivo_rastro).result()
+            for etapa, medidas in resultado["etapas"].items():
+                linhas.append({"caso": caso, "barras": resultado["barras"], "etapa": etapa, **medidas})
+    return pd.DataFrame(linhas)
+
+
+def gravar_referencia(df, arquivo=REFERENCIA_PADRAO):
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    referencia = {
+        "sistema": {"plataforma": platform.platform(), "python": platform.python_version(),
+                    "processador": platform.processor(), "data": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "medidas": df.to_dict(orient="records"),
+    }
+    with open(arquivo, "w") as f:
+        json.dump(referencia, f, indent=1)
+
+
+def comparar_referencia(df, arquivo=REFERENCIA_PADRAO, limiar=LIMIAR_PADRAO):
+    # Acrescenta as medidas de referência e marca as regressões (tempo, memória ou nº de chamadas)
+    with open(arquivo) as f:
+        referencia = pd.DataFrame(json.load(f)["medidas"])
+    # Referências anteriores sem alguma das medidas: a medida ausente não é comparada
+    referencia = referencia.reindex(columns=["caso", "etapa", "tempo_s", "memoria_mb", "chamadas"])
+    df = df.merge(referencia, on=["caso", "etapa"], how="left", suffixes=("", "_ref"))
+
+    df["variacao_tempo"] = df["tempo_s"] / df["tempo_s_ref"] - 1
+    regressao_tempo = (df["variacao_tempo"] > limiar) & (df["tempo_s"] - df["tempo_s_ref"] > TOLERANCIA_TEMPO)
+    regressao_memoria = (df["memoria_mb"] > (1 + limiar) * df["memoria_mb_ref"]) & \
+        (df["memoria_mb"] - df["memoria_mb_ref"] > TOLERANCIA_MEMORIA)
+    regressao_chamadas = df["chamadas"] > df["chamadas_ref"]
+
+    motivos = pd.DataFrame({"tempo": regressao_tempo, "memória": regressao_memoria, "chamadas": regressao_chamadas})
+    df["regressao"] = [",".join(motivos.columns[linha]) for linha in motivos.to_numpy()]
+    return df
+
+
+if __name__ == "__main__":
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do fluxo de simulação")
+    parser.add_argument("--tamanhos", type=int, nargs="*", default=[100, 1000],
+                        help="nº de barras dos circuitos sintéticos")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--referencia", default=REFERENCIA_PADRAO, help="arquivo JSON de referência")
+    parser.add_argument("--salvar", action="store_true", help="grava as medidas como nova referência")
+    parser.add_argument("--limiar", type=float, default=LIMIAR_PADRAO, help="aumento relativo tolerado")
+    parser.add_argument("--rastros", help="pasta para os rastros de cada caso (Trace Event JSON)")
+    argumentos = parser.parse_args()
+
+    df_benchmark = executar_benchmark(argumentos.tamanhos, argumentos.repeticoes, argumentos.rastros)
+    regressoes = 0
+    if os.path.exists(argumentos.referencia) and not argumentos.salvar:
+        df_benchmark = comparar_referencia(df_benchmark, argumentos.referencia, argumentos.limiar)
+        regressoes = int((df_benchmark["regressao"] != "").sum())
+
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(df_benchmark.round(4).to_string(index=False))
+
+    if argumentos.salvar:
+        gravar_referencia(df_benchmark, argumentos.referencia)
+        print(f"Referência gravada em {argumentos.referencia}")
+    elif regressoes:
+        print(f"{regressoes} etapa(s) com regressão acima de {100 * argumentos.limiar:.0f}%")
+        sys.exit(1)
@@ -0,0 +1,279 @@
+##########################################################
+##   Cache de resultados de simulação (por conteúdo)    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Evita resolver de novo cenários idênticos. A chave é o hash de tudo o que
+# define o resultado do fluxo:
+#   - texto do circuito (arquivo .dss, arquivos do Redirect/Compile e arquivos mult=(file=...))
+#   - valores das curvas de carga usadas pelos elementos ativos (incluindo alterações feitas na sessão)
+#   - ajustes da solução (modo, passo, nº de passos) e monitores instrumentados (só os habilitados)
+#   - alterações de cenário aplicadas na sessão (baterias, edições e SOC inicial)
+#   - trafo e faixas de tensão usados nos indicadores guardados
+# Cada entrada é uma pasta com os arrays dos monitores (.npy) e os indicadores de
+# todas as barras (.npz). O tamanho total é limitado, removendo as entradas usadas
+# há mais tempo (LRU pela data de modificação, atualizada a cada acerto).
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import uuid
+import numpy as np
+from Circbt_Loadshapes import PASTA_CACHE, hash_arquivo
+from Circbt_Monitores import DadosMonitores, extrair_monitores, monitores_ativos
+from Circbt_Indicadores import FAIXAS_PRODIST, CANAIS_FASORES, calcular_indicadores, indicadores_desequilibrio
+
+RE_REDIRECT = re.compile(r"^\s*(?:redirect|compile)\s+[\[\"'(]?([^\]\"')]+?)[\]\"')]?\s*$",
+                         re.IGNORECASE | re.MULTILINE)
+
+VERSAO_CACHE = 2                   # incrementar quando o formato das entradas mudar
+LIMITE_PADRAO = 2 * 1024**3        # 2 GB
+CLASSES_COM_CURVA = ("load", "generator", "storage", "pvsystem")
+
+
+############################
+### Chave do cenário
+############################
+
+
+def arquivos_circuito(file_dss):
+    # Arquivo principal e todos os arquivos chamados por Redirect/Compile (recursivamente)
+    arquivos, pendentes = [], [os.path.abspath(file_dss)]
+    while pendentes:
+        arquivo = pendentes.pop(0)
+        if arquivo in arquivos or not os.path.exists(arquivo):
+            continue
+        arquivos.append(arquivo)
+        with open(arquivo, encoding="latin-1") as f:
+            texto = f.read()
+        pasta = os.path.dirname(arquivo)
+        pendentes += [os.path.join(pasta, r.strip()) for r in RE_REDIRECT.findall(texto)]
+    return arquivos
+
+
+def hash_circuito(file_dss):
+    h = hashlib.sha256()
+    for arquivo in arquivos_circuito(file_dss):
+        h.update(os.path.basename(arquivo).lower().encode())
+        h.update(hash_arquivo(arquivo).encode())
+    return h.hexdigest()
+
+
+def _curvas_usadas(dss):
+    # Curvas (daily/yearly/duty) referenciadas pelos elementos ativos: curvas criadas na sessão e
+    # não usadas no cenário (ex. a curva do despacho depois de desfazer a bateria) não mudam a chave
+    usadas = {"default"}
+    for elemento in dss.circuit.elements_names:
+        if elemento.split(".")[0].lower() not in CLASSES_COM_CURVA:
+            continue
+        dss.circuit.set_active_element(elemento)
+        if not dss.cktelement.is_enabled:
+            continue
+        for propriedade in ("daily", "yearly", "duty"):
+            curva = dss.text(f"? {elemento}.{propriedade}").strip().lower()
+            if curva:
+                usadas.add(curva)
+    return usadas
+
+
+def _hash_loadshapes(dss):
+    # Valores efetivamente carregados no OpenDSS (e não os do arquivo), de modo que curvas
+    # alteradas durante a sessão geram outra chave
+    h = hashlib.sha256()
+    curvas = dss.loadshapes
+    usadas = _curvas_usadas(dss)
+    for nome in curvas.names:
+        if nome.lower() not in usadas:
+            continue
+        curvas.name = nome
+        h.update(nome.lower().encode())
+        h.update(np.array([curvas.npts, curvas.s_interval], dtype=float).tobytes())
+        h.update(np.asarray(curvas.p_mult, dtype=float).tobytes())
+        h.update(np.asarray(curvas.q_mult, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def chave_cenario(sessao, hash_texto=None, trafo=None, faixas=FAIXAS_PRODIST[127]):
+    dss = sessao.dss
+    alteracoes, soc = sessao.estado_cenario()
+    descricao = {
+        "versao": VERSAO_CACHE,
+        "circuito": hash_texto or hash_circuito(sessao.file_dss),
+        "loadshapes": _hash_loadshapes(dss),
+        "modo": str(sessao.modo).lower(),
+        "passo_s": dss.solution.step_size,
+        "number": sessao.number,
+        "monitores": [m.lower() for m in monitores_ativos(dss)],
+        "alteracoes": alteracoes,
+        "soc_inicial": soc,
+        "trafo": (trafo or sessao.trafo).lower(),
+        "faixas": [float(f) for f in faixas],
+    }
+    return hashlib.sha256(json.dumps(descricao, sort_keys=True).encode()).hexdigest()
+
+
+############################
+### Indicadores guardados
+############################
+
+
+def indicadores_cenario(sessao, dados, trafo=None, faixas=FAIXAS_PRODIST[127]):
+    # Indicadores de todas as barras monitoradas (barras x fases) e do trafo (padrão: o da sessão)
+    trafo = trafo or sessao.trafo
+    barras = list(sessao.monitores_barras)
+    monitores = [sessao.monitores_barras[b] for b in barras]
+    indicadores = calcular_indicadores(dados.selecionar(monitores, [1, 3, 5]), faixas)
+    indicadores["FD95"] = indicadores_desequilibrio(dados.selecionar(monitores, CANAIS_FASORES))["FD95"]
+
+    ptotal = dados.selecionar([f"P_{trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+    qtotal = dados.selecionar([f"P_{trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+    indicadores["barras"] = np.array(barras)
+    indicadores["kVA_max"] = np.sqrt(ptotal**2 + qtotal**2).max()
+    indicadores["kWh_trafo"] = ptotal.sum() * sessao.dss.solution.step_size / 3600
+    indicadores["convergiu"] = sessao.dss.solution.converged
+    return indicadores
+
+
+############################
+### Armazenamento em disco
+############################
+
+
+class CacheSimulacoes:
+    """Entradas (monitores + indicadores) endereçadas pelo hash do cenário, com limite de tamanho."""
+
+    def __init__(self, pasta, limite_bytes=LIMITE_PADRAO):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        self._hash_texto = {}
+        self._tamanho = None   # estimativa do tamanho total (recalculada ao passar do limite)
+        os.makedirs(pasta, exist_ok=True)
+
+    def chave(self, sessao, trafo=None, faixas=FAIXAS_PRODIST[127]):
+        # O hash dos arquivos do circuito é calculado uma vez por arquivo
+        if sessao.file_dss not in self._hash_texto:
+            self._hash_texto[sessao.file_dss] = hash_circuito(sessao.file_dss)
+        return chave_cenario(sessao, self._hash_texto[sessao.file_dss], trafo, faixas)
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave)
+
+    def obter(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(os.path.join(caminho, "meta.json")) as arquivo:
+                meta = json.load(arquivo)
+            valores = np.load(os.path.join(caminho, "dados.npy"), mmap_mode="r")
+            horas = np.load(os.path.join(caminho, "horas.npy"))
+            with np.load(os.path.join(caminho, "indicadores.npz")) as arquivo:
+                indicadores = {nome: arquivo[nome] for nome in arquivo.files}
+            os.utime(caminho)   # uso mais recente (LRU)
+        except (FileNotFoundError, NotADirectoryError):
+            # Entrada ausente ou removida por outro processo durante a leitura
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        dados = DadosMonitores(meta["monitores"], meta["canais"], meta["modos"], horas, valores)
+        return dados, indicadores
+
+    def gravar(self, chave, dados, indicadores):
+        # Entrada montada em pasta temporária e renomeada no final (leitores só enxergam entradas completas)
+        temporaria = os.path.join(self.pasta, f".{chave}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp")
+        os.makedirs(temporaria)
+        meta = {"monitores": list(dados.monitores), "canais": [list(c) for c in dados.canais],
+                "modos": [int(m) for m in dados.modos]}
+        with open(os.path.join(temporaria, "meta.json"), "w") as arquivo:
+            json.dump(meta, arquivo)
+        np.save(os.path.join(temporaria, "dados.npy"), np.asarray(dados.dados))
+        np.save(os.path.join(temporaria, "horas.npy"), np.asarray(dados.horas))
+        np.savez(os.path.join(temporaria, "indicadores.npz"), **indicadores)
+        tamanho = _tamanho_pasta(temporaria)
+
+        try:
+            os.rename(temporaria, self._caminho(chave))
+        except OSError:
+            # Mesma entrada gravada por outro processo: o conteúdo é o mesmo
+            shutil.rmtree(temporaria, ignore_errors=True)
+            return
+        if self._tamanho is not None:
+            self._tamanho += tamanho
+        self.limitar()
+
+    def entradas(self):
+        # (data de uso, tamanho, caminho) de cada entrada completa
+        entradas = []
+        for entrada in os.scandir(self.pasta):
+            if entrada.is_dir() and not entrada.name.startswith("."):
+                try:
+                    entradas.append((entrada.stat().st_mtime, _tamanho_pasta(entrada.path), entrada.path))
+                except FileNotFoundError:
+                    pass
+        return entradas
+
+    def limitar(self):
+        # A pasta só é varrida quando a estimativa passa do limite (outros processos também gravam)
+        if self._tamanho is not None and self._tamanho <= self.limite_bytes:
+            return
+        entradas = sorted(self.entradas())
+        self._tamanho = sum(e[1] for e in entradas)
+        for _, tamanho, caminho in entradas:
+            if self._tamanho <= self.limite_bytes:
+                break
+            shutil.rmtree(caminho, ignore_errors=True)
+            self._tamanho -= tamanho
+
+    def limpar(self):
+        for _, _, caminho in self.entradas():
+            shutil.rmtree(caminho, ignore_errors=True)
+        self._tamanho = 0
+
+
+def _tamanho_pasta(pasta):
+    return sum(e.stat().st_size for e in os.scandir(pasta) if e.is_file())
+
+
+def pasta_cache_padrao(file_dss):
+    # Junto do cache de loadshapes (dssfiles/__cache__/simulacoes)
+    return os.path.join(os.path.dirname(os.path.abspath(file_dss)), PASTA_CACHE, "simulacoes")
+
+
+############################
+### Solve com cache
+############################
+
+
+def resolver_com_cache(sessao, cache, trafo=None, faixas=FAIXAS_PRODIST[127]):
+    # Retorna (DadosMonitores com todos os monitores, indicadores). Sem acerto no cache,
+    # resolve o fluxo, extrai os monitores e grava a entrada. trafo: padrão o da sessão.
+    chave = cache.chave(sessao, trafo, faixas)
+    encontrado = cache.obter(chave)
+    if encontrado is not None:
+        return encontrado
+
+    sessao.resolver()
+    dados = extrair_monitores(sessao.dss)
+    indicadores = indicadores_cenario(sessao, dados, trafo, faixas)
+    cache.gravar(chave, dados, indicadores)
+    return dados, indicadores
+
+
+if __name__ == "__main__":
+    import time
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    cache = CacheSimulacoes(pasta_cache_padrao(file_dss))
+
+    # Mesmo cenário duas vezes: a segunda execução vem do cache
+    for tentativa in range(2):
+        inicio = time.perf_counter()
+        sessao.adicionar_bateria("P7", 20, 110, 0)
+        dados, indicadores = resolver_com_cache(sessao, cache)
+        sessao.desfazer()
+        print(f"Execução {tentativa + 1}: {1000 * (time.perf_counter() - inicio):.1f} ms "
+              f"(acertos={cache.acertos}, faltas={cache.faltas}, kVA_max={float(indicadores['kVA_max']):.2f})")
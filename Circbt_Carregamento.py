@@ -0,0 +1,80 @@
+##########################################################
+##   Carregamento dos condutores (fases e neutro)       ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Os monitores das linhas (mode=0, terminal 2) já registram as correntes das
+# fases e do neutro (canais I1, I2, I3 e I4) junto com as tensões, e são lidos
+# na mesma extração em bloco (extrair_monitores). Aqui as correntes de todas as
+# linhas são comparadas com o normamps dos linecodes em operações vetorizadas
+# sobre o array (linha x condutor x tempo): carregamento (%), tempo em
+# sobrecarga, carregamento do neutro (relevante com as cargas monofásicas
+# desequilibradas) e os piores instantes de cada linha.
+
+import numpy as np
+import pandas as pd
+
+CANAIS_CORRENTE = ["I1", "I2", "I3", "I4"]   # fases A, B, C e neutro
+
+
+def correntes_linhas(dados, linhas):
+    # Array (linha, condutor, tempo) com as correntes (A) de fases e neutro
+    return dados.selecionar([f"V_{linha}" for linha in linhas], CANAIS_CORRENTE)
+
+
+def calcular_carregamento(correntes, normamps, passo_h, limite=100.0, n_piores=3):
+    # correntes: (..., linha, 4, tempo) || normamps: (..., linha). Indicadores com a forma (..., linha)
+    correntes = np.asarray(correntes, dtype=float)
+    normamps = np.asarray(normamps, dtype=float)
+    carregamento = 100 * correntes / normamps[..., np.newaxis, np.newaxis]
+    fases = carregamento[..., :3, :].max(axis=-2)   # pior fase em cada instante
+    neutro = carregamento[..., 3, :]
+
+    # Piores instantes de cada linha (maior carregamento de fase), em ordem decrescente
+    k = min(n_piores, fases.shape[-1])
+    piores = np.argpartition(-fases, k - 1, axis=-1)[..., :k]
+    ordem = np.argsort(-np.take_along_axis(fases, piores, axis=-1), axis=-1, kind="stable")
+    piores = np.take_along_axis(piores, ordem, axis=-1)
+
+    return {
+        "carregamento": carregamento,
+        "carregamento_max": fases.max(axis=-1),
+        "carregamento_medio": fases.mean(axis=-1),
+        "carregamento_neutro_max": neutro.max(axis=-1),
+        "horas_sobrecarga": np.count_nonzero(fases > limite, axis=-1) * passo_h,
+        "horas_sobrecarga_neutro": np.count_nonzero(neutro > limite, axis=-1) * passo_h,
+        "piores_passos": piores,
+    }
+
+
+def tabela_carregamento(sessao, dados, limite=100.0, n_piores=3):
+    # Uma linha por trecho, da mais carregada para a menos carregada
+    correntes = correntes_linhas(dados, sessao.lines)
+    passo_h = float(dados.horas[1] - dados.horas[0]) if len(dados.horas) > 1 else 1.0
+    resultado = calcular_carregamento(correntes, sessao.normamps_linhas, passo_h, limite, n_piores)
+
+    df = pd.DataFrame({"linha": sessao.lines, "normamps": sessao.normamps_linhas})
+    for k, condutor in enumerate("ABCN"):
+        df[f"I{condutor}_max"] = correntes[:, k].max(axis=-1)
+    for indicador in ("carregamento_max", "carregamento_medio", "carregamento_neutro_max",
+                      "horas_sobrecarga", "horas_sobrecarga_neutro"):
+        df[indicador] = resultado[indicador]
+    horas_piores = np.asarray(dados.horas)[resultado["piores_passos"]]
+    for k in range(horas_piores.shape[1]):
+        df[f"pior_hora_{k + 1}"] = horas_piores[:, k]
+
+    df = df.sort_values("carregamento_max", ascending=False, ignore_index=True)
+    df.insert(0, "ranking", np.arange(1, len(df) + 1))
+    return df
+
+
+if __name__ == "__main__":
+    import os
+    from Circbt_Sessao import SessaoDSS
+    from Circbt_Monitores import extrair_monitores
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    sessao.resolver()
+    df_carregamento = tabela_carregamento(sessao, extrair_monitores(sessao.dss))
+    print(df_carregamento.round(2).to_string(index=False))
@@ -0,0 +1,258 @@
+##########################################################
+##   Despacho da bateria para corte de pico             ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Calcula a curva de carga/descarga da bateria (em vez da CurvaBAT fixa) a
+# partir da potência do trafo no caso sem bateria: descarrega acima de um
+# nível de descarga e carrega abaixo de um nível de carga, de modo a achatar
+# a curva do trafo. Os níveis são em kVA (|S| do trafo, com o P e o Q do
+# monitor): a bateria tem fator de potência 1 e só altera o P, então em cada
+# instante o nível vira um limite de P = sqrt(nível² - Q²). Os níveis saem de
+# bisseções vetorizadas com o SOC simulado em ordem cronológica (SOC inicial,
+# eficiências, perdas ociosas e limites de SOC e potência):
+#   - nível de descarga: o menor em que a descarga acima dele é viável,
+#     carregando antes sempre que o trafo estiver abaixo dele (a bateria só
+#     descarrega a energia que já tem em cada pico);
+#   - nível de carga: o menor (até o de descarga) que ainda mantém essa
+#     descarga viável, para não carregar mais que o necessário.
+# A bateria não carrega depois da última descarga do dia. Em seguida o SOC é
+# simulado de novo com a curva final (limites de SOC e potência). Com as
+# tensões da barra da bateria no caso sem bateria, a bateria não carrega nos
+# instantes com tensão precária/crítica inferior nem descarrega nos instantes
+# acima da faixa adequada.
+#
+# Tudo é vetorizado nos eixos iniciais (cenários, dias, ...): as bisseções
+# simulam o dia passo a passo, ~0,1 s por dia e ~1,5 s por um ano de dias
+# calculados juntos. A curva resultante (mult entre -1 e 1, descarga positiva,
+# como a CurvaBAT com dispmode=follow) é gravada como Loadshape no OpenDSS.
+# Baterias grandes em barras fracas (ex. 40 kW no P7/P15 do circbtfull) com
+# potência parcial podem não convergir no OpenDSS (tensões absurdas em um
+# passo e a energia esgotada): conferir o resultado com a CurvaBAT nesses casos.
+
+import numpy as np
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import FAIXAS_PRODIST
+
+# Valores padrão do elemento Storage do OpenDSS (%reserve, %EffCharge, %EffDischarge, %IdlingkW).
+# As perdas ociosas (% do kwrated) só contam com a bateria carregando ou descarregando: a descarga de
+# p kW retira (p + perdas) / eficiência e a carga guarda (p - perdas) * eficiência.
+SOC_MINIMO = 20.0
+SOC_MAXIMO = 100.0
+EFICIENCIA_CARGA = 0.90
+EFICIENCIA_DESCARGA = 0.90
+PERDAS_OCIOSAS = 1.0
+
+CURVA_OTIMA = "CurvaBAT_Otima"
+
+
+def _bissecao(funcao, inferior, superior, iteracoes=40):
+    # Raiz de uma função crescente no nível, para vários níveis de uma vez (pelo lado positivo:
+    # o nível devolvido é sempre viável quando o superior é)
+    for _ in range(iteracoes):
+        meio = (inferior + superior) / 2
+        positivo = funcao(meio) > 0
+        superior = np.where(positivo, meio, superior)
+        inferior = np.where(positivo, inferior, meio)
+    return superior
+
+
+def _retirada(descarga, passo_h, perdas, eficiencia_descarga):
+    # Energia retirada da bateria (kWh) pela descarga de cada passo
+    return np.where(descarga > 0, (descarga + perdas) / eficiencia_descarga, 0) * passo_h
+
+
+def _armazenada(carga, passo_h, perdas, eficiencia_carga):
+    # Energia guardada na bateria (kWh) pela carga de cada passo
+    return np.where(carga > 0, (carga - perdas) * eficiencia_carga, 0) * passo_h
+
+
+def _curva_desejada(carga, reativa, passo_h, kwrated, kwhrated, soc_inicial, soc_minimo, soc_maximo,
+                    eficiencia_carga, eficiencia_descarga, perdas, tensoes, faixas):
+    # Potência desejada da bateria (..., tempo) pelos níveis de descarga e de carga (kVA) de cada série
+    forma = carga.shape[:-1]
+    reativa = np.zeros(carga.shape) if reativa is None else np.broadcast_to(reativa, carga.shape)
+    energia_inicial = np.broadcast_to(kwhrated * np.asarray(soc_inicial, dtype=float) / 100, forma)
+    energia_minima = kwhrated * soc_minimo / 100
+    energia_maxima = kwhrated * soc_maximo / 100
+
+    pode_carregar = np.ones(carga.shape)
+    pode_descarregar = np.ones(carga.shape)
+    if tensoes is not None:
+        tensoes = np.asarray(tensoes, dtype=float)
+        # Fases sem tensão no monitor (NaN) não bloqueiam a carga/descarga
+        pode_carregar = ~(np.fmin.reduce(tensoes, axis=-2) < faixas[1])
+        pode_descarregar = ~(np.fmax.reduce(tensoes, axis=-2) > faixas[2])
+
+    def limite(nivel):
+        # Maior P do trafo com |S| até o nível em cada instante
+        return np.sqrt(np.maximum(nivel[..., np.newaxis]**2 - reativa**2, 0))
+
+    def descarga(nivel):
+        return np.clip(carga - limite(nivel), 0, kwrated) * pode_descarregar
+
+    def recarga(nivel, potencia_descarga):
+        # Sem carga depois da última descarga da série (não ajuda no corte de pico)
+        antes = np.cumsum(potencia_descarga[..., ::-1] > 0, axis=-1)[..., ::-1] > 0
+        return np.clip(limite(nivel) - carga, 0, kwrated) * pode_carregar * antes
+
+    def falta(nivel_descarga, nivel_carga):
+        # Energia que faltaria na bateria para cumprir a descarga, com o SOC simulado em ordem
+        # cronológica (kWh; 0: níveis viáveis)
+        potencia_descarga = descarga(nivel_descarga)
+        retirada = _retirada(potencia_descarga, passo_h, perdas, eficiencia_descarga)
+        armazenada = _armazenada(recarga(nivel_carga, potencia_descarga), passo_h, perdas, eficiencia_carga)
+        energia = energia_inicial.astype(float)
+        faltando = np.zeros(forma)
+        for t in range(carga.shape[-1]):
+            disponivel = np.maximum(energia - energia_minima, 0)
+            faltando += np.maximum(retirada[..., t] - disponivel, 0)
+            energia = np.minimum(energia - np.minimum(retirada[..., t], disponivel) + armazenada[..., t],
+                                 energia_maxima)
+        return faltando
+
+    # O nível de descarga pode ficar abaixo do pico mínimo com descarga plena (kwrated): com energia
+    # de sobra, a bateria descarrega também em volta do pico, onde as perdas da rede (fora do modelo)
+    # fazem o pico real cair mais que o previsto
+    inferior = np.zeros(forma)
+    superior = np.broadcast_to(np.sqrt(carga**2 + reativa**2).max(axis=-1), forma).astype(float)
+
+    tolerancia = 1e-9 * max(kwhrated, 1)
+    nivel_descarga = _bissecao(lambda n: tolerancia - falta(n, n), inferior, superior)
+    nivel_descarga = np.where(falta(nivel_descarga, nivel_descarga) > tolerancia, superior, nivel_descarga)
+    nivel_carga = _bissecao(lambda n: tolerancia - falta(nivel_descarga, n), inferior, nivel_descarga)
+    nivel_carga = np.where(falta(nivel_descarga, nivel_carga) > tolerancia, nivel_descarga, nivel_carga)
+    potencia_descarga = descarga(nivel_descarga)
+    return potencia_descarga - recarga(nivel_carga, potencia_descarga), nivel_descarga, nivel_carga
+
+
+def _simular_soc(desejada, passo_h, kwhrated, soc_inicial, soc_minimo, soc_maximo, eficiencia_carga,
+                 eficiencia_descarga, perdas):
+    # Simulação cronológica do SOC (potência limitada pela energia disponível e pelo espaço livre)
+    energia_minima = kwhrated * soc_minimo / 100
+    energia_maxima = kwhrated * soc_maximo / 100
+    energia = np.broadcast_to(kwhrated * np.asarray(soc_inicial, dtype=float) / 100,
+                              desejada.shape[:-1]).astype(float)
+    potencia = np.empty(desejada.shape)
+    soc = np.empty(desejada.shape)
+    for t in range(desejada.shape[-1]):
+        descarga = np.maximum(np.maximum(energia - energia_minima, 0) * eficiencia_descarga / passo_h - perdas, 0)
+        livre = np.maximum(energia_maxima - energia, 0)
+        carga = np.where(livre > 0, livre / (eficiencia_carga * passo_h) + perdas, 0)
+        p = np.clip(desejada[..., t], -carga, descarga)
+        energia = energia - _retirada(p, passo_h, perdas, eficiencia_descarga) \
+            + _armazenada(-p, passo_h, perdas, eficiencia_carga)
+        potencia[..., t] = p
+        soc[..., t] = 100 * energia / kwhrated
+    return potencia, soc
+
+
+def despacho_pico(carga, passo_h, kwrated, kwhrated, soc_inicial=50.0, soc_minimo=SOC_MINIMO,
+                  soc_maximo=SOC_MAXIMO, eficiencia_carga=EFICIENCIA_CARGA,
+                  eficiencia_descarga=EFICIENCIA_DESCARGA, perdas_ociosas=PERDAS_OCIOSAS, reativa=None,
+                  tensoes=None, faixas=FAIXAS_PRODIST[127]):
+    # carga: potência ativa do trafo sem bateria (..., tempo) em kW || reativa: idem em kvar (opcional; sem
+    # ela o pico cortado é o de P) || tensoes: (..., fases, tempo) na barra da bateria (opcional).
+    # Potências da bateria com descarga positiva; níveis e picos em kVA.
+    carga = np.asarray(carga, dtype=float)
+    reativa = np.zeros(carga.shape) if reativa is None else np.asarray(reativa, dtype=float)
+    perdas = kwrated * perdas_ociosas / 100
+    desejada, nivel_descarga, nivel_carga = _curva_desejada(carga, reativa, passo_h, kwrated, kwhrated,
+                                                            soc_inicial, soc_minimo, soc_maximo, eficiencia_carga,
+                                                            eficiencia_descarga, perdas, tensoes, faixas)
+    potencia, soc = _simular_soc(desejada, passo_h, kwhrated, soc_inicial, soc_minimo, soc_maximo,
+                                 eficiencia_carga, eficiencia_descarga, perdas)
+
+    resultante = carga - potencia
+    return {
+        "potencia": potencia,
+        "soc": soc,
+        "curva": potencia / kwrated,
+        "carga_resultante": resultante,
+        "nivel_descarga": nivel_descarga,
+        "nivel_carga": nivel_carga,
+        "pico_original": np.sqrt(carga**2 + reativa**2).max(axis=-1),
+        "pico_resultante": np.sqrt(resultante**2 + reativa**2).max(axis=-1),
+    }
+
+
+def despacho_periodo(carga, passo_h, passos_dia, kwrated, kwhrated, soc_inicial=50.0, soc_minimo=SOC_MINIMO,
+                     soc_maximo=SOC_MAXIMO, eficiencia_carga=EFICIENCIA_CARGA,
+                     eficiencia_descarga=EFICIENCIA_DESCARGA, perdas_ociosas=PERDAS_OCIOSAS, reativa=None,
+                     tensoes=None, faixas=FAIXAS_PRODIST[127]):
+    # Períodos longos (ex. um ano, nº inteiro de dias): níveis de cada dia calculados juntos e o SOC
+    # simulado em sequência no período todo (o SOC final de um dia é o inicial do seguinte). Os níveis
+    # de cada dia supõem a bateria na reserva no início do dia (só o primeiro parte do SOC inicial):
+    # cada dia descarrega só o que carregou, sem contar com a sobra do dia anterior.
+    carga = np.asarray(carga, dtype=float)
+    forma = carga.shape
+    perdas = kwrated * perdas_ociosas / 100
+    dias = forma[:-1] + (forma[-1] // passos_dia, passos_dia)
+    reativa = None if reativa is None else np.broadcast_to(np.asarray(reativa, dtype=float), forma).reshape(dias)
+    soc_dias = np.full(dias[:-1], float(soc_minimo))
+    soc_dias[..., 0] = soc_inicial
+    if tensoes is not None:
+        tensoes = np.asarray(tensoes, dtype=float)
+        tensoes = np.moveaxis(tensoes.reshape(tensoes.shape[:-1] + dias[-2:]), -2, -3)
+    desejada, _, _ = _curva_desejada(carga.reshape(dias), reativa, passo_h, kwrated, kwhrated, soc_dias,
+                                     soc_minimo, soc_maximo, eficiencia_carga, eficiencia_descarga, perdas, tensoes,
+                                     faixas)
+    potencia, soc = _simular_soc(desejada.reshape(forma), passo_h, kwhrated, soc_inicial, soc_minimo,
+                                 soc_maximo, eficiencia_carga, eficiencia_descarga, perdas)
+    return {"potencia": potencia, "soc": soc, "curva": potencia / kwrated, "carga_resultante": carga - potencia}
+
+############################
+### Integração com o OpenDSS
+############################
+
+
+def comando_loadshape(nome, curva, passo_h):
+    # Mesmo formato das curvas do loadshapes.dss
+    valores = " ".join(f"{v:.4f}".rstrip("0").rstrip(".") for v in np.asarray(curva, dtype=float))
+    return f"loadshape.{nome} npts={len(curva)} minterval={passo_h * 60:g} mult=({valores})"
+
+
+def definir_curva(dss, nome, curva, passo_h):
+    # Cria a Loadshape ou atualiza a existente (mesmo nome a cada ponto de uma varredura)
+    existe = dss.loadshapes.count > 0 and nome.lower() in (n.lower() for n in dss.loadshapes.names)
+    dss.text(f"{'Edit' if existe else 'New'} {comando_loadshape(nome, curva, passo_h)}")
+
+
+def carga_base(sessao):
+    # Potências ativa e reativa do trafo e monitores do caso atual da sessão (chamar antes de inserir a bateria)
+    sessao.resolver()
+    dados = extrair_monitores(sessao.dss)
+    p = dados.selecionar([f"P_{sessao.trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+    q = dados.selecionar([f"P_{sessao.trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+    return p, q, dados
+
+
+def despachar_bateria(sessao, poste, kwrated, kwhrated, socbat, base, nome_curva=CURVA_OTIMA, **parametros):
+    # Bateria no poste com a curva de corte de pico calculada sobre o caso base (ver carga_base)
+    p, q, dados = base
+    passo_h = sessao.dss.solution.step_size / 3600
+    tensoes = dados.selecionar([sessao.monitor_barra(poste)], [1, 3, 5])[0]
+    despacho = despacho_pico(p, passo_h, kwrated, kwhrated, socbat, reativa=q, tensoes=tensoes, **parametros)
+    definir_curva(sessao.dss, nome_curva, despacho["curva"], passo_h)
+    sessao.adicionar_bateria(poste, kwrated, kwhrated, socbat, curva=nome_curva)
+    return despacho
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+
+    base = carga_base(sessao)
+    inicio = time.perf_counter()
+    despacho = despachar_bateria(sessao, "P7", 30, 150, 50, base)
+    print(f"Despacho calculado em {1000 * (time.perf_counter() - inicio):.2f} ms")
+
+    # Verificação no OpenDSS: pico do trafo com a bateria despachada
+    p, q, _ = carga_base(sessao)
+    print(f"Pico sem bateria: {despacho['pico_original']:.2f} kVA || previsto: {despacho['pico_resultante']:.2f} kVA"
+          f" || OpenDSS: {np.sqrt(p**2 + q**2).max():.2f} kVA")
+    sessao.desfazer()
@@ -0,0 +1,391 @@
+##########################################################
+##   Balanceamento de fases das cargas monofásicas      ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Procura novas ligações de fase para as unidades consumidoras monofásicas
+# (carga e GD do mesmo consumidor mudam juntas) que reduzam a corrente de
+# neutro, o desequilíbrio de tensão (FD95) e os indicadores DRP/DRC.
+#
+# Avaliação rápida em lote: o modelo da varredura radial (Circbt_Radial)
+# recebe três cópias de cada ramo monofásico, uma por ligação possível
+# (A, B, C ou AB, BC, CA), e cada candidato apenas liga uma das cópias pela
+# potência. A ligação base da busca é resolvida exatamente em todos os passos
+# do dia (mesma resolução do fluxo diário: DRP/DRC em passos de 1/144) e
+# linearizada: cada cópia tem o seu efeito nas tensões e na corrente de neutro
+# (com a reação dos demais elementos, dI/dV na solução base), e um lote de
+# candidatos é um único produto de matrizes, sem nenhuma chamada ao OpenDSS.
+# A busca é local (trocas de um consumidor e perturbações aleatórias de
+# vários): a cada iteração relineariza na ligação atual, filtra a vizinhança
+# pelo modelo linearizado e refaz os melhores com a varredura completa, que
+# decide o movimento. Os melhores candidatos são confirmados no OpenDSS com o
+# fluxo diário completo. Storages não são representados na avaliação rápida
+# (ver Circbt_Radial), mas entram na confirmação.
+#
+# Circuito de exemplo (24 consumidores, 15 barras, 144 passos): custo radial
+# da ligação original 12.009 (OpenDSS: 12.009). Erro médio da linearização no
+# custo: ~0.2 com um consumidor trocado e ~0.4 com quatro. otimizar_fases mede
+# as taxas em separado; em uma máquina de 1 núcleo, sem outra carga: avaliação
+# linearizada (só as chamadas a avaliar) ~2700 a 2900 ligações/s, varredura
+# exata ~95 ligações/s e busca completa (ligações distintas no tempo total,
+# com relinearizações e verificações exatas) ~1800 a 1900 ligações/s. Os
+# valores dependem da máquina: em outra, ocupada, a busca ficou em ~800/s.
+
+import copy
+import time
+import numpy as np
+import pandas as pd
+from Circbt_Radial import ModeloRadial, NO_TERRA
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import (FAIXAS_PRODIST, FD_LIMITE, CANAIS_FASORES, calcular_indicadores,
+                                fator_desequilibrio, indicadores_desequilibrio)
+from Circbt_Carregamento import correntes_linhas
+
+DRP_LIMITE = 3.0
+DRC_LIMITE = 0.5
+
+CURVAS_FIXAS = ("curvaip",)   # elementos que não são remanejados (iluminação pública)
+NEUTRO = 3                    # índice do nó 4 nos arrays do modelo radial
+
+# Peso de cada termo do custo (cada indicador é dividido pelo seu limite; mudancas = por consumidor remanejado)
+PESOS_PADRAO = {"neutro": 1.0, "FD": 1.0, "DRP": 1.0, "DRC": 1.0, "mudancas": 0.02}
+
+
+def _alternativas(no_a, no_b):
+    # Ligações possíveis de um ramo monofásico: fase-neutro (ou fase-terra) ou fase-fase
+    if no_b in (NEUTRO, NO_TERRA):
+        return [(0, no_b), (1, no_b), (2, no_b)]
+    return [(0, 1), (1, 2), (2, 0)]
+
+
+def _opcao(no_a, no_b):
+    # Índice da ligação atual entre as alternativas (AC e CA são a mesma ligação)
+    alternativas = _alternativas(no_a, no_b)
+    for k, (a, b) in enumerate(alternativas):
+        if {a, b} == {no_a, no_b}:
+            return k
+    raise ValueError(f"Ligação monofásica não reconhecida: nós {no_a + 1}.{no_b + 1}")
+
+
+class AvaliadorFases:
+    """Modelo radial linearizado em uma ligação base, para avaliar ligações das fases em lote."""
+
+    def __init__(self, modelo, normamps_barras, passo_h=1 / 6, passos=None, pesos=PESOS_PADRAO,
+                 faixas=FAIXAS_PRODIST[127]):
+        # passos: índices dos passos do dia usados na avaliação (padrão: todos, como no fluxo diário)
+        self.base = modelo
+        self.pesos = pesos
+        self.faixas = faixas
+        self.normamps_barras = np.asarray(normamps_barras, dtype=float)
+        n_passos = int(round(24 / passo_h))
+        self.passos = np.arange(n_passos) if passos is None else np.asarray(passos)
+
+        # Consumidores remanejáveis: elementos monofásicos (um só ramo) agrupados pelo nome
+        # (Load.P2_1 e Generator.P2_1_G formam o mesmo consumidor)
+        nomes, contagem = np.unique(modelo.elementos, return_counts=True)
+        um_ramo = set(nomes[contagem == 1])
+        curvas = np.array(modelo.curvas + [""])
+        self.consumidores = {}
+        for r, elemento in enumerate(modelo.elementos):
+            if elemento not in um_ramo or curvas[modelo.curva[r]] in CURVAS_FIXAS or modelo.no_a[r] > 2:
+                continue
+            chave = elemento.split(".", 1)[1].lower()
+            chave = chave[:-2] if elemento.lower().startswith("generator.") and chave.endswith("_g") else chave
+            self.consumidores.setdefault(chave, []).append(r)
+        self.nomes_consumidores = list(self.consumidores)
+        self.original = np.array([_opcao(modelo.no_a[ramos[0]], modelo.no_b[ramos[0]])
+                                  for ramos in self.consumidores.values()])
+
+        # Modelo expandido: ramos originais + 3 cópias de cada ramo remanejável
+        extras, grupo_extra, opcao_extra, nos_extra = [], [], [], []
+        for g, ramos in enumerate(self.consumidores.values()):
+            for r in ramos:
+                for k, (a, b) in enumerate(_alternativas(modelo.no_a[r], modelo.no_b[r])):
+                    extras.append(r)
+                    grupo_extra.append(g)
+                    opcao_extra.append(k)
+                    nos_extra.append((a, b))
+        extras = np.array(extras, dtype=int)
+        nos_extra = np.array(nos_extra, dtype=int).reshape(-1, 2)
+
+        expandido = copy.copy(modelo)
+        for atributo in ("barra_elemento", "vbase", "s_nominal", "modelo", "vmin", "vmax", "vlow", "curva"):
+            valores = getattr(modelo, atributo)
+            setattr(expandido, atributo, np.concatenate([valores, valores[extras]]))
+        expandido.no_a = np.concatenate([modelo.no_a, nos_extra[:, 0]])
+        expandido.no_b = np.concatenate([modelo.no_b, nos_extra[:, 1]])
+        expandido.elementos = list(modelo.elementos) + [modelo.elementos[r] for r in extras]
+        expandido.grupos = [(mod, np.flatnonzero(expandido.modelo == mod)) for mod in np.unique(expandido.modelo)]
+        self.modelo = expandido
+
+        # Ramos originais remanejáveis ficam sempre desligados; as cópias dependem do candidato
+        self._fixos = np.ones(len(modelo.elementos))
+        self._fixos[[r for ramos in self.consumidores.values() for r in ramos]] = 0
+        self._grupo_extra = np.array(grupo_extra, dtype=int)
+        self._opcao_extra = np.array(opcao_extra, dtype=int)
+
+        mult = modelo.multiplicadores(n_passos, passo_h)[:, self.passos]
+        self._s = expandido.potencias(mult)   # (passos, ramos do modelo expandido)
+        # Resposta da rede (fonte em curto) a 1 A injetado em cada nó: tensões nodais e correntes dos trechos
+        n_nos = len(modelo.barras) * 4
+        barras, nos = np.divmod(np.arange(n_nos), 4)
+        dv, di = expandido.resposta_linear(barras, nos, np.full(n_nos, NO_TERRA))
+        self._nos_fases = np.flatnonzero(nos < 3)
+        self._resposta_v = dv.reshape(n_nos, n_nos).T                        # (nó observado, nó da injeção)
+        self._resposta_i = di.reshape(n_nos, n_nos).T[np.flatnonzero(nos == NEUTRO)]   # (neutro do trecho, nó)
+        self._no_a = expandido.barra_elemento * 4 + expandido.no_a
+        self._no_b = np.where(expandido.no_b >= 0, expandido.barra_elemento * 4 + expandido.no_b, n_nos)
+
+        # Injeções de 1 A (entra no nó a, sai no nó b) dos pares de nós distintos usados pelas cópias
+        copias = slice(len(modelo.elementos), None)
+        pares, par_copia = np.unique(np.stack([self._no_a[copias], self._no_b[copias]], axis=1), axis=0,
+                                     return_inverse=True)
+        self._par_copia = par_copia.ravel()
+        injecoes = np.zeros((n_nos + 1, len(pares)))
+        injecoes[pares[:, 0], np.arange(len(pares))] = 1
+        injecoes[pares[:, 1], np.arange(len(pares))] = -1
+        self._injecoes = injecoes[:n_nos]
+        self._tensoes_base = None
+        self.linearizar(self.original)
+
+    def _mascara(self, atribuicoes):
+        # Cópias ligadas em cada candidato (candidatos x cópias)
+        return (atribuicoes[:, self._grupo_extra] == self._opcao_extra).astype(float)
+
+    def linearizar(self, atribuicao, variacao_relativa=1e-4):
+        # Solução exata da ligação 'atribuicao' em todos os passos e, para cada cópia, o efeito de ligá-la
+        # (tensões de fase e corrente de neutro das barras) com a corrente da cópia calculada nas tensões
+        # dessa solução: cada candidato é essa solução + a soma dos efeitos das cópias que mudaram.
+        # O efeito inclui a reação dos demais elementos (dI/dV no ponto da solução: abaixo de Vminpu as
+        # cargas viram impedância e a queda adicional diminui). O erro cresce com o nº de consumidores
+        # trocados em relação à ligação linearizada (a busca relineariza a cada iteração)
+        n_fixos, n_passos, n_nos = len(self._fixos), len(self.passos), len(self._resposta_v)
+        self._mascara_base = self._mascara(np.atleast_2d(atribuicao))[0]
+        ligados = np.concatenate([self._fixos, self._mascara_base])
+        solucao = self.modelo.resolver(self._s * ligados, tensoes_iniciais=self._tensoes_base)
+        self.convergiu = solucao.convergiu
+        self._tensoes_base = solucao.tensoes
+
+        # Correntes de todos os ramos (ligados ou não) e derivada em relação à tensão entre os nós
+        corrente = self.modelo.correntes_elementos(solucao.tensoes, self._s)              # (passos, ramos)
+        variada = self.modelo.correntes_elementos(solucao.tensoes * (1 + variacao_relativa), self._s)
+        vnos = np.concatenate([solucao.tensoes.reshape(n_passos, -1), np.zeros((n_passos, 1))], axis=1)
+        vramos = vnos[:, self._no_a] - vnos[:, self._no_b]
+        y = ligados * (variada - corrente) / np.where(vramos != 0, variacao_relativa * vramos, 1)
+
+        # Matriz nodal das derivadas (passo x nó x nó, sem a terra) e respostas às injeções das cópias com
+        # a reação dos elementos: dV = (1 - Zv Y)^-1 Zv dI || dI_trechos = Zi (dI + Y dV)
+        ymat = np.zeros((n_passos, n_nos + 1, n_nos + 1), dtype=complex)
+        passos = np.arange(n_passos)[:, np.newaxis]
+        for linhas, colunas, sinal in ((self._no_a, self._no_a, 1), (self._no_b, self._no_b, 1),
+                                       (self._no_a, self._no_b, -1), (self._no_b, self._no_a, -1)):
+            np.add.at(ymat, (passos, linhas, colunas), sinal * y)
+        ymat = ymat[:, :n_nos, :n_nos]
+        dv = np.linalg.solve(np.eye(n_nos) - self._resposta_v @ ymat, self._resposta_v @ self._injecoes)
+        di = self._resposta_i @ (self._injecoes + ymat @ dv)
+
+        # Efeito de cada cópia = resposta do seu par de nós x corrente da cópia, no formato das saídas
+        # (tensões: barra x fase x passo || corrente de neutro: barra x passo) em uma única matriz real:
+        # avaliar um lote é um produto de matrizes
+        saidas = np.concatenate([dv[:, self._nos_fases], di], axis=1)[:, :, self._par_copia] \
+            * corrente[:, np.newaxis, n_fixos:]                                   # (passo, saída, cópia)
+        base = np.concatenate([solucao.tensoes[:, :, :3].reshape(n_passos, -1), solucao.correntes[:, :, NEUTRO]],
+                              axis=1)
+        self._efeitos = np.ascontiguousarray(np.transpose(saidas, (2, 1, 0))).reshape(saidas.shape[-1], -1).view(float)
+        self._solucao_base = np.ascontiguousarray(base.T).ravel().view(float)
+
+    def ligacao(self, g, opcao):
+        # Barra com os nós da opção para cada elemento do consumidor g (formato Bus1 do OpenDSS)
+        modelo = self.base
+        ligacoes = {}
+        for r in self.consumidores[self.nomes_consumidores[g]]:
+            a, b = _alternativas(modelo.no_a[r], modelo.no_b[r])[opcao]
+            barra = modelo.barras[modelo.barra_elemento[r]]
+            ligacoes[modelo.elementos[r]] = f"{barra}.{a + 1}.4" if b in (NEUTRO, NO_TERRA) \
+                else f"{barra}.{a + 1}.{b + 1}.4"
+        return ligacoes
+
+    def avaliar(self, atribuicoes):
+        # atribuicoes: (candidatos, consumidores) com a opção (0 a 2) de cada consumidor.
+        # Avaliação linearizada em torno da última ligação passada a linearizar()
+        atribuicoes = np.atleast_2d(atribuicoes)
+        n_candidatos, n_passos, n_barras = atribuicoes.shape[0], len(self.passos), len(self.base.barras)
+        variacao = self._mascara(atribuicoes) - self._mascara_base
+        valores = (self._solucao_base + variacao @ self._efeitos).view(complex)
+        tensoes = valores[:, :n_barras * 3 * n_passos].reshape(n_candidatos, n_barras, 3, n_passos)
+        neutro = valores[:, n_barras * 3 * n_passos:].reshape(n_candidatos, n_barras, n_passos)
+        return self._medidas(atribuicoes, tensoes, neutro, self.convergiu)
+
+    def avaliar_exato(self, atribuicoes):
+        # Mesmas medidas com a varredura radial completa de cada candidato (partindo da solução da ligação base)
+        atribuicoes = np.atleast_2d(atribuicoes)
+        n_candidatos, n_passos = atribuicoes.shape[0], len(self.passos)
+        mascara = np.concatenate([np.broadcast_to(self._fixos, (n_candidatos, len(self._fixos))),
+                                  self._mascara(atribuicoes)], axis=1)
+        s = (mascara[:, np.newaxis, :] * self._s).reshape(n_candidatos * n_passos, -1)
+        resultado = self.modelo.resolver(s, tensoes_iniciais=np.tile(self._tensoes_base, (n_candidatos, 1, 1)))
+
+        # (candidato, barra, condutor, passo)
+        tensoes = np.moveaxis(resultado.tensoes.reshape(n_candidatos, n_passos, -1, 4), 1, -1)
+        correntes = np.moveaxis(resultado.correntes.reshape(n_candidatos, n_passos, -1, 4), 1, -1)
+        return self._medidas(atribuicoes, tensoes[:, :, :3], correntes[:, :, NEUTRO], resultado.convergiu)
+
+    def _medidas(self, atribuicoes, tensoes, neutro, convergiu):
+        # tensoes: fasores das fases (candidato, barra, fase, passo) || neutro: corrente (candidato, barra, passo)
+        indicadores = calcular_indicadores(np.abs(tensoes), self.faixas, percentis=())
+        fd = fator_desequilibrio(tensoes)
+        neutro = 100 * np.abs(neutro).max(axis=-1) / self.normamps_barras
+        medidas = {
+            "neutro_pct": neutro.max(axis=-1),
+            "FD95_max": np.percentile(fd, 95, axis=-1).max(axis=-1),
+            "DRP_max": indicadores["DRP"].max(axis=(1, 2)),
+            "DRC_max": indicadores["DRC"].max(axis=(1, 2)),
+            "mudancas": np.count_nonzero(atribuicoes != self.original, axis=1),
+        }
+        medidas["custo"] = self.custo(medidas)
+        medidas["convergiu"] = np.full(len(atribuicoes), convergiu)
+        return medidas
+
+    def custo(self, medidas):
+        p = self.pesos
+        return (p["neutro"] * medidas["neutro_pct"] / 100 + p["FD"] * medidas["FD95_max"] / FD_LIMITE
+                + p["DRP"] * medidas["DRP_max"] / DRP_LIMITE + p["DRC"] * medidas["DRC_max"] / DRC_LIMITE
+                + p["mudancas"] * medidas["mudancas"])
+
+############################
+### Busca
+############################
+
+
+def otimizar_fases(avaliador, max_iteracoes=100, n_aleatorios=1024, max_trocas=4, n_exatos=4, tamanho_lote=256,
+                   semente=0):
+    # Busca local em lote: a cada iteração lineariza o avaliador na ligação atual, avalia todas as trocas
+    # de um consumidor e 'n_aleatorios' perturbações de 2 a 'max_trocas' consumidores, refaz os 'n_exatos'
+    # melhores com a varredura completa e segue para o melhor destes, até não melhorar.
+    # Retorna todas as ligações avaliadas (DataFrame ordenado pelo custo; coluna 'exato': varredura
+    # completa) e as ligações por segundo: {"linearizada": só as chamadas a avaliar(), "exata": só as
+    # chamadas a avaliar_exato(), "busca": ligações distintas no tempo total, com as relinearizações}.
+    gerador = np.random.default_rng(semente)
+    n = len(avaliador.nomes_consumidores)
+    avaliados = {}
+    contagem = {False: [0, 0.0], True: [0, 0.0]}   # exato -> [ligações avaliadas, tempo (s)]
+
+    def avaliar(candidatos, exato=False):
+        novos = list(dict.fromkeys(tuple(c) for c in candidatos if exato or tuple(c) not in avaliados))
+        funcao = avaliador.avaliar_exato if exato else avaliador.avaliar
+        for inicio in range(0, len(novos), tamanho_lote):
+            lote = np.array(novos[inicio:inicio + tamanho_lote])
+            inicio_lote = time.perf_counter()
+            medidas = funcao(lote)
+            contagem[exato][0] += len(lote)
+            contagem[exato][1] += time.perf_counter() - inicio_lote
+            for i, c in enumerate(novos[inicio:inicio + tamanho_lote]):
+                avaliados[c] = {**{indicador: valores[i] for indicador, valores in medidas.items()}, "exato": exato}
+        return novos
+
+    inicio = time.perf_counter()
+    atual = tuple(avaliador.original)
+    avaliador.linearizar(avaliador.original)
+    avaliar([atual])
+    avaliados[atual]["exato"] = True   # sem variação, a avaliação linearizada é a própria solução
+    for _ in range(max_iteracoes):
+        base = np.array(atual)
+        # Vizinhança: cada consumidor nas outras duas ligações
+        vizinhos = np.repeat(base[np.newaxis], 2 * n, axis=0)
+        vizinhos[np.arange(2 * n), np.tile(np.arange(n), 2)] = (np.tile(base, 2) + np.repeat([1, 2], n)) % 3
+        # Perturbações aleatórias de vários consumidores
+        aleatorios = np.repeat(base[np.newaxis], n_aleatorios, axis=0)
+        for c in aleatorios:
+            trocados = gerador.choice(n, min(n, gerador.integers(2, max_trocas + 1)), replace=False)
+            c[trocados] = (c[trocados] + gerador.integers(1, 3, len(trocados))) % 3
+        novos = avaliar(np.concatenate([vizinhos, aleatorios]))
+        avaliar(sorted(novos, key=lambda c: avaliados[c]["custo"])[:n_exatos], exato=True)
+
+        melhor = min((c for c in avaliados if avaliados[c]["exato"]), key=lambda c: avaliados[c]["custo"])
+        if avaliados[melhor]["custo"] >= avaliados[atual]["custo"] - 1e-9:
+            break
+        atual = melhor
+        avaliador.linearizar(np.array(atual))
+    duracao = time.perf_counter() - inicio
+
+    df = pd.DataFrame([{"ligacoes": c, **medidas} for c, medidas in avaliados.items()])
+    taxas = {
+        "linearizada": contagem[False][0] / contagem[False][1] if contagem[False][1] > 0 else np.nan,
+        "exata": contagem[True][0] / contagem[True][1] if contagem[True][1] > 0 else np.nan,
+        "busca": len(avaliados) / duracao,
+    }
+    return df.sort_values("custo", ignore_index=True), taxas
+
+
+def descrever_mudancas(avaliador, atribuicao):
+    # {elemento: nova Bus1} dos consumidores com ligação diferente da original
+    mudancas = {}
+    for g, opcao in enumerate(atribuicao):
+        if opcao != avaliador.original[g]:
+            mudancas.update(avaliador.ligacao(g, opcao))
+    return mudancas
+
+
+def confirmar_opendss(sessao, avaliador, atribuicao, faixas=FAIXAS_PRODIST[127]):
+    # Fluxo diário completo no OpenDSS com as novas ligações (desfeitas ao final)
+    mudancas = descrever_mudancas(avaliador, atribuicao)
+    for elemento, barra in mudancas.items():
+        sessao.editar(elemento, {"bus1": barra})
+    convergiu = sessao.resolver()
+    dados = extrair_monitores(sessao.dss)
+    sessao.desfazer(len(mudancas))
+
+    monitores = list(sessao.monitores_barras.values())
+    indicadores = calcular_indicadores(dados.selecionar(monitores, [1, 3, 5]), faixas, percentis=())
+    fd95 = indicadores_desequilibrio(dados.selecionar(monitores, CANAIS_FASORES))["FD95"]
+    neutro = correntes_linhas(dados, sessao.lines)[:, 3].max(axis=-1) / np.asarray(sessao.normamps_linhas)
+    return {
+        "mudancas": mudancas,
+        "convergiu": bool(convergiu),
+        "neutro_pct": 100 * neutro.max(),
+        "FD95_max": fd95.max(),
+        "DRP_max": indicadores["DRP"].max(),
+        "DRC_max": indicadores["DRC"].max(),
+    }
+
+
+def balancear_fases(sessao, n_confirmar=3, pesos=PESOS_PADRAO, faixas=FAIXAS_PRODIST[127], passos=None, **busca):
+    # Busca com o avaliador radial e confirmação dos 'n_confirmar' melhores candidatos no OpenDSS.
+    # A primeira linha do resultado é a ligação original.
+    modelo = ModeloRadial(sessao.dss, sessao.trafo)
+    normamps = dict(zip(sessao.lines, sessao.normamps_linhas))
+    normamps_barras = [normamps.get(linha, np.inf) for linha in modelo.linhas]
+    avaliador = AvaliadorFases(modelo, normamps_barras, sessao.dss.solution.step_size / 3600, passos, pesos,
+                               faixas)
+    df_busca, taxas = otimizar_fases(avaliador, **busca)
+
+    original = tuple(avaliador.original)
+    candidatos = [original] + [c for c in df_busca.loc[df_busca["exato"], "ligacoes"] if c != original][:n_confirmar]
+    linhas = []
+    for c in candidatos:
+        confirmado = confirmar_opendss(sessao, avaliador, c, faixas)
+        radial = df_busca.loc[df_busca["ligacoes"] == c].iloc[0]
+        medidas = {k: confirmado[k] for k in ("neutro_pct", "FD95_max", "DRP_max", "DRC_max")}
+        linhas.append({
+            "n_mudancas": int(radial["mudancas"]),
+            "custo_radial": radial["custo"],
+            "custo": avaliador.custo({**medidas, "mudancas": radial["mudancas"]}),
+            **medidas,
+            "convergiu": confirmado["convergiu"],
+            "mudancas": "; ".join(f"{e} -> {b}" for e, b in confirmado["mudancas"].items()),
+        })
+    return pd.DataFrame(linhas), df_busca, taxas
+
+
+if __name__ == "__main__":
+    import os
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+
+    df_confirmados, df_busca, taxas = balancear_fases(sessao)
+    print(f"{len(df_busca)} ligações avaliadas: {taxas['busca']:.0f} por segundo na busca completa, "
+          f"{taxas['linearizada']:.0f} linearizadas e {taxas['exata']:.0f} exatas por segundo")
+    with pd.option_context("display.width", 250, "display.max_colwidth", 200):
+        print(df_confirmados.round(3).to_string(index=False))
@@ -0,0 +1,173 @@
+##########################################################
+##   Frotas de baterias (armazenamento comunitário)     ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Avalia várias configurações de frota (lista de baterias com barra, ligação,
+# kW, kWh, SOC inicial e curva de despacho) sobre o mesmo circuito compilado:
+# cada frota é aplicada de uma vez (SessaoDSS.adicionar_frota), resolvida e
+# desfeita. Os monitores de estado de cada unidade (energia armazenada e
+# potências de saída/entrada) são lidos na mesma extração em bloco dos demais
+# monitores. As frotas são distribuídas em um pool de processos, cada um com o
+# seu circuito compilado uma única vez, como em Circbt_Varredura.
+
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import FAIXAS_PRODIST
+from Circbt_Cache import CacheSimulacoes, resolver_com_cache, indicadores_cenario, LIMITE_PADRAO
+from Circbt_Carregamento import correntes_linhas, calcular_carregamento
+
+CANAIS_BATERIA = ["kWh", "kWOut", "kWIn"]
+
+DRP_LIMITE = 3.0
+DRC_LIMITE = 0.5
+
+
+def combinar_frotas(postes, n_unidades, kwrated, kwhrated, socbat=0, fases="ABC", curva="CurvaBAT"):
+    # Todas as frotas de n unidades iguais em postes distintos (armazenamento distribuído)
+    return [[{"barra": poste, "kwrated": kwrated, "kwhrated": kwhrated, "socbat": socbat, "fases": fases,
+              "curva": curva} for poste in escolha]
+            for escolha in itertools.combinations(postes, n_unidades)]
+
+
+def tabela_unidades(sessao, dados, frota, elementos, passo_h):
+    # Uma linha por unidade: SOC (mín., máx., final) e energia/potência de carga e descarga
+    if elementos:
+        estados = dados.selecionar([sessao.monitores_baterias[e.lower()] for e in elementos], CANAIS_BATERIA)
+    else:
+        estados = np.empty((0, len(CANAIS_BATERIA), len(dados.horas)))   # frota vazia (caso base)
+    kwhrated = np.array([unidade["kwhrated"] for unidade in frota], dtype=float)
+    soc = 100 * estados[:, 0] / kwhrated[:, np.newaxis]
+    descarga, carga = estados[:, 1], estados[:, 2]
+
+    df = pd.DataFrame({
+        "unidade": [e.split(".", 1)[1] for e in elementos],
+        "barra": [unidade["barra"] for unidade in frota],
+        "fases": [unidade.get("fases", "ABC") for unidade in frota],
+        "kwrated": [unidade["kwrated"] for unidade in frota],
+        "kwhrated": kwhrated,
+        "socbat": [unidade.get("socbat", 0) for unidade in frota],
+        "curva": [unidade.get("curva", "CurvaBAT") for unidade in frota],
+    })
+    df["SOC_min"] = soc.min(axis=1)
+    df["SOC_max"] = soc.max(axis=1)
+    df["SOC_final"] = soc[:, -1]
+    df["kW_descarga_max"] = descarga.max(axis=1)
+    df["kW_carga_max"] = carga.max(axis=1)
+    df["kWh_descarregado"] = descarga.sum(axis=1, dtype=float) * passo_h
+    df["kWh_carregado"] = carga.sum(axis=1, dtype=float) * passo_h
+    return df
+
+
+class AvaliadorFrota:
+    """Circuito compilado e indicadores de rede de cada configuração de frota."""
+
+    def __init__(self, sessao, faixas=FAIXAS_PRODIST[127], cache=None):
+        self.sessao = sessao
+        self.faixas = faixas
+        self.cache = cache
+        self.passo_h = sessao.dss.solution.step_size / 3600
+        sessao.dss.transformers.name = sessao.trafo
+        self.kva_nominal = sessao.dss.transformers.kva
+
+    def avaliar(self, frota):
+        # Retorna (resumo da rede com a frota, tabela das unidades)
+        sessao = self.sessao
+        elementos = sessao.adicionar_frota(frota)
+        if self.cache is not None:
+            dados, indicadores = resolver_com_cache(sessao, self.cache, sessao.trafo, self.faixas)
+        else:
+            sessao.resolver()
+            dados = extrair_monitores(sessao.dss)
+            indicadores = indicadores_cenario(sessao, dados, sessao.trafo, self.faixas)
+        unidades = tabela_unidades(sessao, dados, frota, elementos, self.passo_h)
+        sessao.desfazer(len(elementos))
+
+        carregamento = calcular_carregamento(correntes_linhas(dados, sessao.lines), sessao.normamps_linhas,
+                                             self.passo_h)
+        drp = np.asarray(indicadores["DRP"]).max(axis=1)
+        drc = np.asarray(indicadores["DRC"]).max(axis=1)
+        resumo = {
+            "unidades": len(frota),
+            "barras_frota": " ".join(str(unidade["barra"]) for unidade in frota),
+            "kw_total": float(sum(unidade["kwrated"] for unidade in frota)),
+            "kwh_total": float(sum(unidade["kwhrated"] for unidade in frota)),
+            "DRP_max": float(drp.max()),
+            "DRC_max": float(drc.max()),
+            "barras_DRP": int(np.count_nonzero(drp > DRP_LIMITE)),
+            "barras_DRC": int(np.count_nonzero(drc > DRC_LIMITE)),
+            "FD95_max": float(np.max(indicadores["FD95"])),
+            "kVA_max": float(indicadores["kVA_max"]),
+            "carregamento_trafo_max": 100 * float(indicadores["kVA_max"]) / self.kva_nominal,
+            "carregamento_cabos_max": float(carregamento["carregamento_max"].max()),
+            "kWh_trafo": float(indicadores["kWh_trafo"]),
+            "kWh_descarregado": float(unidades["kWh_descarregado"].sum()),
+            "convergiu": bool(indicadores["convergiu"]),
+        }
+        return resumo, unidades
+
+############################
+### Execução em paralelo
+############################
+
+_avaliador = None
+
+
+def _iniciar_trabalhador(file_dss, stepsize, number, faixas, pasta_cache, limite_cache):
+    global _avaliador
+    perfil.iniciar_trabalhador()
+    cache = CacheSimulacoes(pasta_cache, limite_cache) if pasta_cache is not None else None
+    _avaliador = AvaliadorFrota(SessaoDSS(file_dss, modo="daily", stepsize=stepsize, number=number), faixas, cache)
+
+
+def _avaliar_lote(lote):
+    resultados = []
+    for indice, frota in lote:
+        resumo, unidades = _avaliador.avaliar(frota)
+        unidades.insert(0, "frota", indice)
+        resultados.append(({"frota": indice, **resumo}, unidades))
+    return resultados
+
+
+def avaliar_frotas(file_dss, frotas, n_processos=None, stepsize="10m", number=144, faixas=FAIXAS_PRODIST[127],
+                   pasta_cache=None, limite_cache=LIMITE_PADRAO):
+    # Retorna (uma linha por frota, uma linha por unidade de cada frota); a coluna "frota" é o índice em frotas
+    n_processos = n_processos or os.cpu_count()
+    pares = list(enumerate(frotas))
+    tamanho = max(1, len(pares) // (4 * n_processos))
+    lotes = [pares[i:i + tamanho] for i in range(0, len(pares), tamanho)]
+    if pasta_cache is not None:
+        pasta_cache = os.path.abspath(pasta_cache)
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                             initargs=(os.path.abspath(file_dss), stepsize, number, faixas, pasta_cache,
+                                       limite_cache)) as executor:
+        resultados = [r for lote in executor.map(_avaliar_lote, lotes) for r in lote]
+
+    df_frotas = pd.DataFrame([resumo for resumo, _ in resultados])
+    df_unidades = pd.concat([unidades for _, unidades in resultados], ignore_index=True) if resultados \
+        else pd.DataFrame()
+    return df_frotas, df_unidades
+
+
+if __name__ == "__main__":
+    import time
+
+    perfil.ativar_pelo_ambiente()   # CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO (rastro de cada trabalhador)
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+
+    # Armazenamento comunitário: 30 kW / 150 kWh concentrados em um poste ou divididos em 2 e 3 postes
+    postes = [f"P{i}" for i in range(2, 16)]
+    frotas = combinar_frotas(postes, 1, 30, 150, 50)
+    frotas += combinar_frotas(postes, 2, 15, 75, 50)
+    frotas += combinar_frotas(postes[::2], 3, 10, 50, 50)
+
+    inicio = time.perf_counter()
+    df_frotas, df_unidades = avaliar_frotas(file_dss, frotas)
+    print(f"{len(frotas)} frotas avaliadas em {time.perf_counter() - inicio:.1f} s")
+    print(df_frotas.sort_values("DRP_max").head(10).round(2).to_string(index=False))
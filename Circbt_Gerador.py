@@ -0,0 +1,183 @@
+##########################################################
+##   Gerador de circuitos BT sintéticos                 ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Gera circuitos secundários no mesmo formato do circbtfull_storage.dss
+# (equivalente de Thevenin, trafo MT/BT Dyn com reator de aterramento, trechos
+# de 4 fios com os linecodes Cabo2CA/Cabo4CA, cargas mono/bi/trifásicas nas
+# curvas CurvaCARGA, GD (CurvaGD_CARGA + Generator em CurvaGD_GEN) e IP em
+# todos os postes), com 10 a 10.000 barras, para testes de desempenho.
+# Os postes seguem a convenção P1 (secundário do trafo), P2, ... e as linhas
+# P<pai>_P<filho>, como no circuito original.
+
+import os
+import shutil
+import numpy as np
+
+# Potências nominais padronizadas de trafos de distribuição (kVA)
+KVA_PADRONIZADOS = (15, 30, 45, 75, 112.5, 150)
+
+# Ligações das unidades consumidoras (nós da barra, nº de fases, conexão), como no circuito original
+LIGACOES_MONO = ("1.4", "2.4", "3.4")
+LIGACOES_BI = ("1.2.4", "2.3.4", "1.3.4")
+LIGACAO_TRI = "1.2.3.4"
+
+MAX_VAOS = 12   # nº de vãos do trafo até o fim do circuito mais longo (cerca de 400 m)
+
+
+def gerar_topologia(n_barras, ramificacao=2, continuidade=0.5, gerador=None):
+    # Pai de cada poste (o poste 0 é o secundário do trafo). Cada novo poste é ligado ao último
+    # poste criado (com probabilidade 'continuidade', formando troncos) ou a um poste qualquer
+    # que ainda tenha menos de 'ramificacao' derivações. O poste do trafo aceita até 4 circuitos.
+    gerador = gerador or np.random.default_rng()
+    pais = np.full(n_barras, -1)
+    filhos = np.zeros(n_barras, dtype=int)
+    limites = np.full(n_barras, ramificacao)
+    limites[0] = max(ramificacao, 4)
+    abertos = [0]
+    for i in range(1, n_barras):
+        ultimo = i - 1
+        if filhos[ultimo] < limites[ultimo] and gerador.random() < continuidade:
+            pai = ultimo
+        else:
+            pai = abertos[gerador.integers(len(abertos))]
+        pais[i] = pai
+        filhos[pai] += 1
+        if filhos[pai] >= limites[pai]:
+            abertos.remove(pai)
+        abertos.append(i)
+    return pais
+
+
+def _profundidades(pais):
+    profundidade = np.zeros(len(pais), dtype=int)
+    for i in range(1, len(pais)):
+        profundidade[i] = profundidade[pais[i]] + 1
+    return profundidade
+
+
+def _tamanhos_subarvores(pais):
+    # Nº de postes a jusante de cada poste (inclusive); os filhos sempre vêm depois dos pais
+    tamanhos = np.ones(len(pais), dtype=int)
+    for i in range(len(pais) - 1, 0, -1):
+        tamanhos[pais[i]] += tamanhos[i]
+    return tamanhos
+
+
+def gerar_alimentador(n_barras=15, ramificacao=2, penetracao_gd=0.3, semente=0, kva_trafo=None,
+                      continuidade=0.5, consumidores_por_poste=(1, 2), arquivo_loadshapes="loadshapes.dss"):
+    # Retorna o texto do .dss. penetracao_gd: fração das unidades consumidoras com GD
+    gerador = np.random.default_rng(semente)
+    pais = gerar_topologia(n_barras, ramificacao, continuidade, gerador)
+    tamanhos = _tamanhos_subarvores(pais)
+
+    # Unidades consumidoras: (poste, tipo, kW, GD)
+    consumidores = []
+    for poste in range(n_barras):
+        for _ in range(gerador.integers(consumidores_por_poste[0], consumidores_por_poste[1] + 1)):
+            tipo = gerador.choice(["mono", "bi", "tri"], p=[0.45, 0.40, 0.15])
+            gd = gerador.random() < penetracao_gd
+            if gd:
+                kw = float(gerador.choice([2, 3, 5, 6, 8] if tipo != "mono" else [2, 3, 5]))
+            elif tipo == "tri":
+                kw = round(gerador.uniform(3.0, 6.0), 2)
+            else:
+                kw = round(gerador.uniform(1.2, 3.5), 2)
+            consumidores.append((poste, tipo, kw, gd))
+
+    # Trafo dimensionado para a demanda (limitado ao maior padronizado). Em circuitos muito grandes
+    # as cargas são reduzidas na mesma proporção, para que as tensões continuem realistas.
+    demanda = sum(c[2] for c in consumidores)
+    if kva_trafo is None:
+        kva_trafo = next((k for k in KVA_PADRONIZADOS if k >= 0.7 * demanda), KVA_PADRONIZADOS[-1])
+    fator = min(1.0, kva_trafo / (0.7 * demanda))
+
+    linhas = [
+        "Clear",
+        "",
+        f"// Circuito BT sintético: {n_barras} postes, ramificação {ramificacao}, "
+        f"penetração de GD {100 * penetracao_gd:.0f}%, semente {semente}",
+        "",
+        "// Definição dos Loadshapes",
+        f"Redirect {arquivo_loadshapes}",
+        "",
+        "// Equivalente de Thevenin",
+        "New Circuit.MT phases=3 basekv=13.8 pu=1.025 bus1=P0.1.2.3 frequency=60 R1=0 X1=0.00001",
+        "",
+        "// Transformador",
+        f"New Transformer.TRAFO phases=3 windings=2 buses=(P0.1.2.3  P1.1.2.3.4) Conns=(Delta wye)  "
+        f"kvs=(13.8 0.22)  kVas=({kva_trafo:g} {kva_trafo:g}) Taps=[1.0  1.0]  %loadloss=0.3807 %noloadloss=0.002",
+        "New Reactor.TRAFO_R phases=1 bus1=P1.4 Bus2=P1.0 R=15.0  X=0 basefreq=60",
+        "",
+        "// Definição dos cabos",
+        "New Linecode.Cabo2CA nphases=4 basefreq=60 r1=0.9632 x1=0.3420 r0=3.8528 x0=1.3680 units=km normamps=138",
+        "New Linecode.Cabo4CA nphases=4 basefreq=60 r1=1.5285 x1=0.3603 r0=6.1140 x0=1.4412 units=km normamps=100",
+        "",
+        "// Definição dos trechos de rede BT",
+    ]
+
+    # Trechos com muitos postes a jusante usam o cabo de maior seção. Nos circuitos com mais de
+    # MAX_VAOS vãos entre o trafo e o fim da rede os vãos são encurtados, mantendo o comprimento
+    # elétrico de um circuito BT real (senão as quedas de tensão ficam irreais)
+    profundidade = _profundidades(pais)
+    comprimentos = gerador.uniform(0.025, 0.040, n_barras) * min(1.0, MAX_VAOS / max(profundidade.max(), 1))
+    for i in range(1, n_barras):
+        cabo = "Cabo2CA" if tamanhos[i] >= 4 else "Cabo4CA"
+        linhas.append(f"New Line.P{pais[i] + 1}_P{i + 1} phases=4 bus1=P{pais[i] + 1}.1.2.3.4 "
+                      f"bus2=P{i + 1}.1.2.3.4 length={comprimentos[i]:.4f} linecode={cabo}")
+
+    cargas, cargas_gd, geradores = [], [], []
+    contagem = np.zeros(n_barras, dtype=int)
+    for poste, tipo, kw, gd in consumidores:
+        contagem[poste] += 1
+        nome = f"P{poste + 1}_{contagem[poste]}"
+        if tipo == "tri":
+            nos, fases, conexao = LIGACAO_TRI, 3, "delta"
+        else:
+            nos, fases, conexao = gerador.choice(LIGACOES_MONO if tipo == "mono" else LIGACOES_BI), 1, "wye"
+        barra = f"P{poste + 1}.{nos}"
+        if gd:
+            cargas_gd.append(f"New Load.{nome} Bus1={barra} phases={fases} conn={conexao} Model=3 kV=0.22 "
+                             f"kW={kw * fator:.2f} pf=1.0 Vminpu=0.92 Vmaxpu=1.50 daily=CurvaGD_CARGA status=variable")
+            geradores.append(f"New Generator.{nome}_G Bus1={barra} kv=0.22 kw={kw * fator:.2f} pf=1 model=7 "
+                             f"daily=CurvaGD_GEN phases={fases} conn={conexao}")
+        else:
+            cargas.append(f"New Load.{nome} Bus1={barra} phases={fases} conn={conexao} Model=2 kV=0.22 "
+                          f"kW={kw * fator:.2f} pf=0.92 Vminpu=0.92 Vmaxpu=1.50 daily=CurvaCARGA status=variable")
+
+    linhas += ["", "// Alocação das cargas de unidades consumidoras"] + cargas + [""] + cargas_gd + [""] + geradores
+    linhas += ["", "// Alocação das cargas de iluminação pública (IP)"]
+    for poste in range(n_barras):
+        nos = gerador.choice(LIGACOES_BI)
+        linhas.append(f"New Load.P{poste + 1}_IP Bus1=P{poste + 1}.{nos} phases=1 conn=wye Model=5 kV=0.22 "
+                      f"kW={0.15 * fator:.3f} pf=1.0 Vminpu=0.92 Vmaxpu=1.50 daily=CurvaIP status=variable")
+
+    linhas += ["", "Set voltagebases=[13.8 0.22 ]", "Calcvoltagebases", ""]
+    return "\n".join(linhas)
+
+
+def gravar_alimentador(file_dss, **parametros):
+    # Grava o .dss (latin-1 e CRLF, como o circuito original) e copia o loadshapes.dss para a mesma pasta
+    pasta = os.path.dirname(os.path.abspath(file_dss))
+    os.makedirs(pasta, exist_ok=True)
+    arquivo_loadshapes = parametros.get("arquivo_loadshapes", "loadshapes.dss")
+    destino = os.path.join(pasta, arquivo_loadshapes)
+    if not os.path.exists(destino):
+        origem = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dssfiles", "loadshapes.dss")
+        shutil.copyfile(origem, destino)
+
+    with open(file_dss, "w", encoding="latin-1", newline="\r\n") as arquivo:
+        arquivo.write(gerar_alimentador(**parametros))
+    return os.path.abspath(file_dss)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python Circbt_Gerador.py <pasta de saída> [nº de barras ...]
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sinteticos')
+    tamanhos = [int(n) for n in sys.argv[2:]] or [10, 100, 1000, 10000]
+    for n in tamanhos:
+        arquivo = gravar_alimentador(os.path.join(pasta, f"circbt_sintetico_{n}.dss"), n_barras=n)
+        print(arquivo)
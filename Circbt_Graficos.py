@@ -0,0 +1,142 @@
+##########################################################
+##   Mapa de calor das tensões (barra x tempo)          ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Substitui o gráfico de uma curva por poste (plt.step + legenda) por uma
+# imagem barra x tempo, com a cor dada pela tensão e pelas faixas do PRODIST.
+# Quando há mais barras/passos do que pixels disponíveis, os blocos são
+# reduzidos ao valor mais crítico (o mais distante da faixa adequada), de modo
+# que violações curtas não desaparecem na redução.
+#
+# A figura é uma única imagem (imshow) do tamanho do eixo, sem um artista por
+# célula; os rótulos das barras só são escritos com até 40 barras. Com 5.000
+# barras x 1 ano em passos de 10 min (float32, ~1 GB), em uma máquina de 1
+# núcleo: ~0,25 s de redução (limitada pela leitura do array) e ~0,1 s de
+# desenho no Agg, ~0,45 s no total (ver __main__). Em máquinas mais lentas ou
+# ocupadas a redução cresce junto com a banda de memória e pode passar de 0,5 s.
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import LinearSegmentedColormap, Normalize
+from Circbt_Indicadores import FAIXAS_PRODIST
+
+# Cores das faixas (na ordem de NOMES_FAIXAS), do limite inferior para o superior de cada faixa
+CORES_FAIXAS = (
+    ("darkred", "lightcoral"),      # crítica inferior
+    ("orange", "yellow"),           # precária inferior
+    ("lightgreen", "seagreen"),     # adequada
+    ("yellow", "orange"),           # precária superior
+    ("lightcoral", "darkred"),      # crítica superior
+)
+
+BYTES_GRUPO = 1 << 20   # tamanho dos trechos da redução (cabe no cache L2)
+
+
+def mapa_cores_faixas(faixas=FAIXAS_PRODIST[127], vmin=100, vmax=140):
+    # Colormap contínuo dentro de cada faixa e com salto de cor nos limites do PRODIST
+    limites = [vmin] + [min(max(l, vmin), vmax) for l in faixas] + [vmax]
+    pontos = []
+    for (inicio, fim), (cor_inicio, cor_fim) in zip(zip(limites[:-1], limites[1:]), CORES_FAIXAS):
+        if fim > inicio:
+            pontos += [((inicio - vmin) / (vmax - vmin), cor_inicio), ((fim - vmin) / (vmax - vmin), cor_fim)]
+    return LinearSegmentedColormap.from_list("faixas_prodist", pontos), Normalize(vmin, vmax)
+
+
+def _blocos(n, n_max):
+    # Fator de redução e inícios dos blocos para caber n amostras em n_max pixels
+    fator = max(1, int(np.ceil(n / max(n_max, 1))))
+    return fator, np.arange(0, n, fator)
+
+
+def reduzir_pior_caso(tensoes, max_linhas, max_colunas, faixas=FAIXAS_PRODIST[127]):
+    # Reduz (barra x tempo) para no máximo max_linhas x max_colunas mantendo, em cada bloco,
+    # o valor mais distante do centro da faixa adequada (mínimo ou máximo do bloco)
+    tensoes = np.asarray(tensoes)
+    n_barras, n_passos = tensoes.shape
+    fator_barras, inicios_barras = _blocos(n_barras, max_linhas)
+    fator_tempo, inicios_tempo = _blocos(n_passos, max_colunas)
+    if fator_barras == 1 and fator_tempo == 1:
+        return tensoes
+
+    # Grupos de blocos de barras com ~BYTES_GRUPO: o mínimo e o máximo de cada grupo leem os dados
+    # do cache, e não duas vezes da memória (o custo da redução é a leitura do array de entrada)
+    centro = (faixas[1] + faixas[2]) / 2
+    imagem = np.empty((len(inicios_barras), len(inicios_tempo)), dtype=tensoes.dtype)
+    por_grupo = max(1, BYTES_GRUPO // (fator_barras * n_passos * tensoes.itemsize))
+    for i in range(0, len(inicios_barras), por_grupo):
+        trecho = tensoes[i * fator_barras:(i + por_grupo) * fator_barras]
+
+        # Barras primeiro (reshape sem cópia; o último bloco pode ser incompleto) e depois o tempo (reduceat)
+        completos = (len(trecho) // fator_barras) * fator_barras
+        minimos, maximos = [], []
+        if completos:
+            blocos = trecho[:completos].reshape(-1, fator_barras, n_passos)
+            minimos.append(np.fmin.reduce(blocos, axis=1))
+            maximos.append(np.fmax.reduce(blocos, axis=1))
+        if completos < len(trecho):
+            minimos.append(np.fmin.reduce(trecho[completos:], axis=0, keepdims=True))
+            maximos.append(np.fmax.reduce(trecho[completos:], axis=0, keepdims=True))
+        minimos = np.fmin.reduceat(np.concatenate(minimos), inicios_tempo, axis=1)
+        maximos = np.fmax.reduceat(np.concatenate(maximos), inicios_tempo, axis=1)
+        imagem[i:i + len(minimos)] = np.where(centro - minimos > maximos - centro, minimos, maximos)
+    return imagem
+
+
+def plotar_mapa_tensoes(tensoes, horas=None, barras=None, faixas=FAIXAS_PRODIST[127], ax=None,
+                        vmin=100, vmax=140, max_pixels=None, titulo=None):
+    # tensoes: array (barra x tempo), por exemplo dados.selecionar(monitores, [1])[:, 0]
+    tensoes = np.asarray(tensoes)
+    n_barras, n_passos = tensoes.shape
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(9, 6))
+    else:
+        fig = ax.figure
+
+    # Orçamento de pixels: área do eixo na figura (ou o valor informado)
+    if max_pixels is None:
+        caixa = ax.get_window_extent()
+        max_pixels = (int(caixa.height), int(caixa.width))
+    imagem = reduzir_pior_caso(tensoes, max_pixels[0], max_pixels[1], faixas)
+
+    # Eixo do tempo em horas (passo de 10 min quando não informado). Como no plt.step(where='post')
+    # dos REV, a amostra k ocupa o intervalo [horas[k], horas[k] + passo]
+    if horas is None:
+        horas = np.arange(n_passos) / 6
+    passo = horas[1] - horas[0] if n_passos > 1 else 1 / 6
+    extensao = (horas[0], horas[-1] + passo, n_barras - 0.5, -0.5)
+
+    cmap, norm = mapa_cores_faixas(faixas, vmin, vmax)
+    im = ax.imshow(imagem, aspect="auto", interpolation="nearest", cmap=cmap, norm=norm, extent=extensao)
+
+    barra_cores = fig.colorbar(im, ax=ax)
+    barra_cores.set_label('Tensão (V)', fontsize=13)
+    barra_cores.set_ticks([vmin] + [l for l in faixas if vmin < l < vmax] + [vmax])
+
+    ax.set_xlabel('Horário (h)', fontsize=13)
+    ax.set_ylabel('Poste', fontsize=13)
+    if barras is not None and n_barras <= 40:
+        ax.set_yticks(np.arange(n_barras))
+        ax.set_yticklabels(barras)
+    if horas[-1] - horas[0] <= 48:
+        ax.set_xticks(np.arange(np.floor(horas[0]), np.ceil(horas[-1] + passo - 1e-6) + 1, 2))
+    if titulo:
+        ax.set_title(titulo, fontsize=13)
+    return fig, ax, im
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib
+    matplotlib.use("Agg")
+
+    # Teste de desempenho: 5.000 barras x 1 ano em passos de 10 minutos
+    gerador = np.random.default_rng(0)
+    tensoes = (125 + 4 * gerador.standard_normal((5000, 365 * 144))).astype(np.float32)
+    horas = np.arange(tensoes.shape[1]) / 6
+
+    inicio = time.perf_counter()
+    fig, ax, im = plotar_mapa_tensoes(tensoes, horas)
+    fig.canvas.draw()
+    print(f"5000 barras x {tensoes.shape[1]} passos: {time.perf_counter() - inicio:.2f} s "
+          f"(imagem {im.get_array().shape})")
@@ -0,0 +1,219 @@
+##########################################################
+##   Capacidade de hospedagem de GD fotovoltaica        ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Para cada poste e ligação (fase A, B, C ou trifásica), encontra a maior
+# potência de GD fotovoltaica (kW, curva CurvaGD_GEN, como os Generator.*_G do
+# circuito) que pode ser acrescentada sem violar:
+#   - as faixas de tensão do PRODIST (tempo acima de 133 V e de 135 V, DRP/DRC);
+#   - a potência nominal do trafo;
+#   - o normamps dos cabos.
+# As tensões são julgadas barra a barra pelos limites do PRODIST, só nas faixas
+# que a barra ainda não viola no caso base: uma barra que já passa do DRP não
+# zera a capacidade do circuito todo, mas a GD não pode levá-la a violar também
+# o DRC. No trafo e nos cabos já sobrecarregados no caso base, a GD não pode
+# piorar a situação (o limite passa a ser o valor do caso base). As violações
+# do caso base são relatadas à parte (violacoes_base).
+#
+# A busca é incremental (a potência dobra até a primeira violação) seguida de
+# bisseção no intervalo encontrado. Cada processo compila o circuito uma única
+# vez; a GD é um Generator pré-criado que só tem barra e kW editados.
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import FAIXAS_PRODIST, SEM_AMOSTRA, classificar_faixas
+
+# Ligações da GD: nós da barra e nº de fases
+LIGACOES_FV = {
+    "A": ("1.4", 1),
+    "B": ("2.4", 1),
+    "C": ("3.4", 1),
+    "ABC": ("1.2.3.4", 3),
+}
+
+DRP_LIMITE = 3.0
+DRC_LIMITE = 0.5
+FOLGA = 1e-6   # diferenças numéricas em relação ao caso base não contam como violação (trafo e cabos)
+
+
+class CapacidadeHospedagem:
+    """Circuito compilado com a GD de teste e os limites de tensão, trafo e cabos."""
+
+    def __init__(self, sessao, faixas=FAIXAS_PRODIST[127], drp_limite=DRP_LIMITE, drc_limite=DRC_LIMITE,
+                 curva="CurvaGD_GEN"):
+        self.sessao = sessao
+        self.faixas = faixas
+        dss = sessao.dss
+
+        dss.transformers.name = sessao.trafo
+        self.kva_nominal = dss.transformers.kva
+        self.monitores_barras = list(sessao.monitores_barras.values())
+        self.monitores_linhas = [f"V_{linha}" for linha in sessao.lines]
+        self.normamps = np.array(sessao.normamps_linhas)
+
+        # GD de teste (mono e trifásica), desligadas
+        barra = next(iter(sessao.monitores_barras))
+        dss.text(f"New Generator.HC_FV1 Bus1={barra}.1.4 phases=1 conn=wye kv=0.127 kw=1 pf=1 model=7 "
+                 f"daily={curva} enabled=no")
+        dss.text(f"New Generator.HC_FV3 Bus1={barra}.1.2.3.4 phases=3 conn=wye kv=0.22 kw=1 pf=1 model=7 "
+                 f"daily={curva} enabled=no")
+
+        # Limites: os do PRODIST nas tensões; nos equipamentos, o nominal ou o do caso base, o que for maior
+        base = self.medir()
+        self.base = base
+        self.limites = {
+            "tensao_133": drp_limite,
+            "tensao_135": drc_limite,
+            "trafo": max(self.kva_nominal, base["trafo"]) * (1 + FOLGA),
+            "cabo": np.maximum(self.normamps, base["cabo"]) * (1 + FOLGA),
+        }
+        # Faixas de tensão já violadas no caso base (por barra): fora da verificação da GD
+        self.violadas_base = {
+            "tensao_133": base["tensao_133"] > drp_limite,
+            "tensao_135": base["tensao_135"] > drc_limite,
+        }
+
+    def violacoes_base(self):
+        # Violações já existentes no caso base, sem GD: uma linha por barra/equipamento e restrição
+        sessao = self.sessao
+        barras = list(sessao.monitores_barras)
+        linhas = []
+        for restricao, limite in (("tensao_133", self.limites["tensao_133"]),
+                                  ("tensao_135", self.limites["tensao_135"])):
+            for k in np.flatnonzero(self.violadas_base[restricao]):
+                linhas.append({"elemento": barras[k], "restricao": restricao,
+                               "valor": self.base[restricao][k], "limite": limite})
+        if self.base["trafo"] > self.kva_nominal:
+            linhas.append({"elemento": sessao.trafo, "restricao": "trafo", "valor": self.base["trafo"],
+                           "limite": self.kva_nominal})
+        for k in np.flatnonzero(self.base["cabo"] > self.normamps):
+            linhas.append({"elemento": sessao.lines[k], "restricao": "cabo", "valor": self.base["cabo"][k],
+                           "limite": self.normamps[k]})
+        return pd.DataFrame(linhas, columns=["elemento", "restricao", "valor", "limite"])
+
+    def medir(self):
+        # Grandezas limitadas: % do tempo acima de 133/135 V por barra (pior fase), S máx. do trafo, I máx. por linha
+        sessao = self.sessao
+        convergiu = sessao.resolver()
+        dados = extrair_monitores(sessao.dss)
+
+        faixas = classificar_faixas(dados.selecionar(self.monitores_barras, [1, 3, 5]), self.faixas)
+        validas = np.maximum(np.count_nonzero(faixas != SEM_AMOSTRA, axis=-1), 1)   # por barra e fase
+        p = dados.selecionar([f"P_{sessao.trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+        q = dados.selecionar([f"P_{sessao.trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+        correntes = dados.selecionar(self.monitores_linhas, ["I1", "I2", "I3"])
+        return {
+            "convergiu": bool(convergiu),
+            "tensao_133": (100 * np.count_nonzero((faixas == 3) | (faixas == 4), axis=-1) / validas).max(axis=1),
+            "tensao_135": (100 * np.count_nonzero(faixas == 4, axis=-1) / validas).max(axis=1),
+            "trafo": float(np.sqrt(p**2 + q**2).max()),
+            "cabo": np.nanmax(correntes, axis=(1, 2)),
+        }
+
+    def violacoes(self, kw, barra, ligacao):
+        # Restrições violadas com 'kw' de GD na barra/ligação ("" = nenhuma)
+        nos, fases = LIGACOES_FV[ligacao]
+        self.sessao.dss.text(f"Edit Generator.HC_FV{fases} Bus1={barra}.{nos} kw={kw} enabled=yes")
+        medidas = self.medir()
+
+        motivos = []
+        if not medidas["convergiu"]:
+            motivos.append("convergencia")
+        if any(np.any((medidas[faixa] > self.limites[faixa]) & ~self.violadas_base[faixa])
+               for faixa in ("tensao_133", "tensao_135")):
+            motivos.append("tensao")
+        if medidas["trafo"] > self.limites["trafo"]:
+            motivos.append("trafo")
+        if np.any(medidas["cabo"] > self.limites["cabo"]):
+            motivos.append("cabo")
+        return ",".join(motivos)
+
+    def buscar(self, barra, ligacao, passo_inicial=5.0, kw_limite=150.0, tolerancia=0.5):
+        # Busca incremental (dobrando a potência) até a primeira violação e bisseção no intervalo
+        avaliacoes = 0
+        viavel, inviavel, restricao = 0.0, None, ""
+        kw = passo_inicial
+        while inviavel is None and viavel < kw_limite:
+            kw = min(kw, kw_limite)
+            motivo = self.violacoes(kw, barra, ligacao)
+            avaliacoes += 1
+            if motivo:
+                inviavel, restricao = kw, motivo
+            else:
+                viavel, kw = kw, 2 * kw
+
+        while inviavel is not None and inviavel - viavel > tolerancia:
+            kw = (viavel + inviavel) / 2
+            motivo = self.violacoes(kw, barra, ligacao)
+            avaliacoes += 1
+            if motivo:
+                inviavel, restricao = kw, motivo
+            else:
+                viavel = kw
+
+        self.sessao.dss.text(f"Edit Generator.HC_FV{LIGACOES_FV[ligacao][1]} enabled=no")
+        return {"barra": barra, "ligacao": ligacao, "kw_max": viavel,
+                "restricao": restricao or "limite da busca", "avaliacoes": avaliacoes}
+
+############################
+### Execução em paralelo
+############################
+
+_capacidade = None
+
+
+def _iniciar_trabalhador(file_dss, stepsize, number, faixas):
+    global _capacidade
+    perfil.iniciar_trabalhador()
+    _capacidade = CapacidadeHospedagem(SessaoDSS(file_dss, modo="daily", stepsize=stepsize, number=number), faixas)
+
+
+def _buscar_barra(barra, ligacoes, parametros):
+    return [_capacidade.buscar(barra, ligacao, **parametros) for ligacao in ligacoes]
+
+
+def _barras_circuito():
+    return list(_capacidade.sessao.monitores_barras)
+
+
+def _violacoes_base():
+    return _capacidade.violacoes_base()
+
+
+def calcular_hospedagem(file_dss, barras=None, ligacoes=tuple(LIGACOES_FV), n_processos=None, stepsize="10m",
+                        number=144, faixas=FAIXAS_PRODIST[127], passo_inicial=5.0, kw_limite=150.0, tolerancia=0.5):
+    # Uma linha por (poste, ligação) com a potência máxima (kW) e a restrição que a limitou, e as
+    # violações do caso base (sem GD) em uma tabela à parte
+    file_dss = os.path.abspath(file_dss)
+    n_processos = n_processos or os.cpu_count()
+    parametros = {"passo_inicial": passo_inicial, "kw_limite": kw_limite, "tolerancia": tolerancia}
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                             initargs=(file_dss, stepsize, number, faixas)) as executor:
+        if barras is None:
+            barras = executor.submit(_barras_circuito).result()
+        df_base = executor.submit(_violacoes_base).result()
+        futuros = [executor.submit(_buscar_barra, barra, ligacoes, parametros) for barra in barras]
+        resultados = [r for futuro in futuros for r in futuro.result()]
+    return pd.DataFrame(resultados), df_base
+
+
+if __name__ == "__main__":
+    import time
+
+    perfil.ativar_pelo_ambiente()   # CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO (rastro de cada trabalhador)
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+
+    inicio = time.perf_counter()
+    df_hospedagem, df_base = calcular_hospedagem(file_dss)
+    print(f"Capacidade de hospedagem calculada em {time.perf_counter() - inicio:.1f} s")
+
+    print("Violações já existentes no caso base (sem GD):")
+    print(df_base.round(2).to_string(index=False))
+    print(df_hospedagem.pivot(index="barra", columns="ligacao", values="kw_max").round(1).to_string())
+    df_hospedagem.to_csv('capacidade_hospedagem.csv', index=False)
@@ -0,0 +1,107 @@
+##########################################################
+##   Indicadores de tensão em regime permanente (DRP)   ##
+##   Data: 18/10/2026   REV 2.0                         ##
+##########################################################
+
+# Cálculo vetorizado de DRP, DRC, percentis e ocupação das faixas de tensão
+# (PRODIST - Módulo 8) para arrays de qualquer dimensão, por exemplo
+# (cenários, barras, fases, tempo). O tempo é sempre o último eixo.
+
+import warnings
+import numpy as np
+from Circbt_Perfil import cronometrar
+
+# Limites das faixas por tensão nominal de fase (V):
+# (crítica inferior, precária inferior, precária superior, crítica superior)
+#   crítica  < lim[0] <= precária < lim[1] <= adequada <= lim[2] < precária <= lim[3] < crítica
+FAIXAS_PRODIST = {
+    127: (110, 117, 133, 135),   # sistema 220/127 V
+    220: (191, 202, 231, 233),   # sistema 380/220 V
+}
+
+# Ordem das faixas no histograma de ocupação
+NOMES_FAIXAS = ("critica_inferior", "precaria_inferior", "adequada", "precaria_superior", "critica_superior")
+
+# Índice das amostras não finitas (NaN: fase inexistente no monitor), fora do histograma
+SEM_AMOSTRA = 5
+
+# Limite do fator de desequilíbrio de tensão FD95% (%) para tensão nominal até 2,3 kV
+FD_LIMITE = 3.0
+
+# Canais de módulo e ângulo (graus) das fases A, B e C nos monitores de tensão (mode=0, forma polar)
+CANAIS_FASORES = [1, 2, 3, 4, 5, 6]
+
+_A = np.exp(2j * np.pi / 3)   # operador de rotação de 120°
+
+
+def classificar_faixas(tensoes, faixas=FAIXAS_PRODIST[127]):
+    # Índice da faixa de cada amostra (0 a 4, na ordem de NOMES_FAIXAS; SEM_AMOSTRA se não finita).
+    # 'faixas' pode ser uma tupla única ou um array (..., 4) com limites por barra/cenário.
+    tensoes = np.asarray(tensoes)
+    faixas = np.asarray(faixas, dtype=float)
+    lim = [faixas[..., k, np.newaxis] for k in range(4)]
+    indices = ((tensoes >= lim[0]).astype(np.int8) + (tensoes >= lim[1])
+               + (tensoes > lim[2]) + (tensoes > lim[3]))
+    indices[~np.isfinite(tensoes)] = SEM_AMOSTRA
+    return indices
+
+
+@cronometrar("indicadores")
+def calcular_indicadores(tensoes, faixas=FAIXAS_PRODIST[127], percentis=(1, 99)):
+    tensoes = np.asarray(tensoes, dtype=float)
+    forma = tensoes.shape[:-1]
+    n = tensoes.shape[-1]
+
+    # Histograma de ocupação das faixas em uma única passada (bincount com deslocamento por série);
+    # as amostras não finitas caem na 6ª posição, descartada, e não contam no total da série
+    indices = classificar_faixas(tensoes, faixas).reshape(-1, n)
+    deslocamento = 6 * np.arange(indices.shape[0])[:, np.newaxis]
+    histograma = np.bincount((indices + deslocamento).ravel(), minlength=6 * indices.shape[0])
+    histograma = histograma.reshape(forma + (6,))[..., :5]
+    validas = histograma.sum(axis=-1)
+
+    # Percentis calculados juntos (uma única ordenação parcial por série)
+    if validas.size and validas.min() == n:
+        valores_percentis = np.percentile(tensoes, percentis, axis=-1)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # séries sem amostras válidas -> NaN
+            valores_percentis = np.nanpercentile(tensoes, percentis, axis=-1)
+
+    def percentual(contagem):
+        return np.divide(100 * contagem, validas, out=np.full(forma, np.nan), where=validas > 0)
+
+    indicadores = {
+        "DRP": percentual(histograma[..., 1] + histograma[..., 3]),
+        "DRC": percentual(histograma[..., 0] + histograma[..., 4]),
+        "histograma": histograma,
+    }
+    for p, valores in zip(percentis, valores_percentis):
+        indicadores[f"P{p}"] = valores
+    return indicadores
+
+
+def fasores_tensao(valores):
+    # (..., 6, tempo) com (V1, VAngle1, V2, VAngle2, V3, VAngle3) -> fasores complexos (..., 3, tempo)
+    valores = np.asarray(valores)
+    return valores[..., 0::2, :] * np.exp(1j * np.deg2rad(valores[..., 1::2, :]))
+
+
+def fator_desequilibrio(fasores):
+    # FD% = 100 |V2| / |V1| (sequências negativa e positiva) em cada instante, com o eixo das fases
+    # em -2. A componente de sequência zero não entra, então tensões fase-terra ou fase-neutro servem.
+    va, vb, vc = fasores[..., 0, :], fasores[..., 1, :], fasores[..., 2, :]
+    positiva = va + _A * vb + _A**2 * vc
+    negativa = va + _A**2 * vb + _A * vc
+    return 100 * np.abs(negativa) / np.abs(positiva)
+
+
+@cronometrar("indicadores")
+def indicadores_desequilibrio(valores, percentil=95):
+    # valores: (..., 6, tempo) nos canais CANAIS_FASORES, ex. (barras, 6, tempo) ou (cenários, barras, 6, tempo)
+    fd = fator_desequilibrio(fasores_tensao(valores))
+    return {
+        "FD": fd,
+        f"FD{percentil}": np.percentile(fd, percentil, axis=-1),
+        "FD_max": fd.max(axis=-1),
+    }
@@ -0,0 +1,176 @@
+##########################################################
+##   Leitura dos Loadshapes com cache binário           ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Lê os 'New loadshape' de um arquivo .dss uma única vez e grava um arquivo
+# binário auxiliar (.npy, mapeável em memória) identificado pelo hash do
+# arquivo de origem. As execuções seguintes carregam o binário sem nenhum
+# parsing de texto.
+
+import os
+import re
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Expressões compiladas uma única vez (e não a cada linha)
+RE_NOME = re.compile(r"^\s*new\s+loadshape\.(\S+)", re.IGNORECASE)
+RE_NPTS = re.compile(r"\bnpts\s*=\s*(\d+)", re.IGNORECASE)
+RE_INTERVALO = re.compile(r"\b(interval|minterval|sinterval)\s*=\s*([\d.eE+-]+)", re.IGNORECASE)
+RE_MULT = re.compile(r"\bmult\s*=\s*[(\[{\"'](.*?)[)\]}\"']", re.IGNORECASE | re.DOTALL)
+RE_ARQUIVO = re.compile(rb"\bfile\s*=\s*([^\s)\]}\"']+)", re.IGNORECASE)
+
+PASTA_CACHE = "__cache__"
+
+
+class BibliotecaLoadshapes:
+    """Loadshapes em um array (loadshape x ponto), com npts e intervalo de cada curva."""
+
+    def __init__(self, nomes, valores, npts, minterval, hash_origem=None):
+        self.nomes = [str(nome) for nome in nomes]
+        self.valores = valores         # array 2D (curvas completadas com NaN até o maior npts)
+        self.npts = np.asarray(npts)
+        self.minterval = np.asarray(minterval, dtype=float)
+        self.hash_origem = hash_origem
+        self._indices = {nome.lower(): i for i, nome in enumerate(self.nomes)}
+
+    def __getitem__(self, nome):
+        i = self._indices[nome.lower()]
+        return self.valores[i, :self.npts[i]]
+
+    def __contains__(self, nome):
+        return nome.lower() in self._indices
+
+    def dataframe(self):
+        # Mesmo formato do DataFrame montado nos scripts REV (uma coluna por loadshape)
+        return pd.DataFrame({nome: pd.Series(self[nome]) for nome in self.nomes})
+
+############################
+### Parsing do arquivo .dss
+############################
+
+
+def _comandos(texto):
+    # Junta as linhas de continuação ('~' ou 'more') ao comando anterior e remove comentários
+    comandos = []
+    for linha in texto.splitlines():
+        linha = linha.split("!")[0].split("//")[0].strip()
+        if not linha:
+            continue
+        if linha[0] == "~" and comandos:
+            comandos[-1] += " " + linha[1:]
+        elif linha.lower().startswith("more ") and comandos:
+            comandos[-1] += " " + linha[5:]
+        else:
+            comandos.append(linha)
+    return comandos
+
+
+def _ler_mult(conteudo, pasta):
+    conteudo = conteudo.strip()
+    if conteudo.lower().startswith("file="):
+        # Multiplicadores em arquivo externo (um valor por linha ou separados por vírgula)
+        caminho = os.path.join(pasta, conteudo.split("=", 1)[1].strip())
+        with open(caminho) as arquivo:
+            return np.array(arquivo.read().replace(",", " ").split(), dtype=float)
+    return np.array(conteudo.replace(",", " ").split(), dtype=float)
+
+
+def ler_loadshapes_dss(file_dss):
+    pasta = os.path.dirname(os.path.abspath(file_dss))
+    with open(file_dss, encoding="latin-1") as arquivo:
+        texto = arquivo.read()
+
+    nomes, curvas, npts, minterval = [], [], [], []
+    for comando in _comandos(texto):
+        nome = RE_NOME.match(comando)
+        mult = RE_MULT.search(comando)
+        if not nome or not mult:
+            continue
+        valores = _ler_mult(mult.group(1), pasta)
+
+        # Intervalo em minutos (interval em horas, minterval em minutos, sinterval em segundos)
+        intervalo = RE_INTERVALO.search(comando)
+        if intervalo:
+            chave, valor = intervalo.group(1).lower(), float(intervalo.group(2))
+            valor = {"interval": valor * 60, "minterval": valor, "sinterval": valor / 60}[chave]
+        else:
+            valor = 60.0
+        n = RE_NPTS.search(comando)
+
+        nomes.append(nome.group(1))
+        curvas.append(valores)
+        npts.append(min(int(n.group(1)), len(valores)) if n else len(valores))
+        minterval.append(valor)
+
+    # Um único array 2D (curvas de tamanhos diferentes completadas com NaN)
+    valores = np.full((len(curvas), max((len(c) for c in curvas), default=0)), np.nan)
+    for i, curva in enumerate(curvas):
+        valores[i, :len(curva)] = curva
+    return BibliotecaLoadshapes(nomes, valores, npts, minterval)
+
+############################
+### Cache binário
+############################
+
+
+def hash_arquivo(file_dss):
+    # Hash do arquivo de origem e dos arquivos externos referenciados (mult=(file=...))
+    with open(file_dss, "rb") as arquivo:
+        conteudo = arquivo.read()
+    h = hashlib.sha256(conteudo)
+    pasta = os.path.dirname(os.path.abspath(file_dss))
+    for referencia in RE_ARQUIVO.findall(conteudo):
+        caminho = os.path.join(pasta, referencia.decode("latin-1"))
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as arquivo:
+                h.update(arquivo.read())
+    return h.hexdigest()[:16]
+
+
+def _caminhos_cache(file_dss, hash_origem):
+    pasta = os.path.join(os.path.dirname(os.path.abspath(file_dss)), PASTA_CACHE)
+    base = os.path.join(pasta, f"{os.path.basename(file_dss)}.{hash_origem}")
+    return pasta, base + ".valores.npy", base + ".meta.npy"
+
+
+def _gravar_npy(caminho, array):
+    # Gravação atômica (vários processos podem gerar o mesmo cache ao mesmo tempo)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        np.save(arquivo, array)
+    os.replace(temporario, caminho)
+
+
+def carregar_loadshapes(file_dss, usar_cache=True):
+    hash_origem = hash_arquivo(file_dss)
+    pasta, arquivo_valores, arquivo_meta = _caminhos_cache(file_dss, hash_origem)
+
+    if usar_cache and os.path.exists(arquivo_valores) and os.path.exists(arquivo_meta):
+        meta = np.load(arquivo_meta)
+        valores = np.load(arquivo_valores, mmap_mode="r")
+        return BibliotecaLoadshapes(meta["nome"], valores, meta["npts"], meta["minterval"], hash_origem)
+
+    biblioteca = ler_loadshapes_dss(file_dss)
+    biblioteca.hash_origem = hash_origem
+    if usar_cache:
+        os.makedirs(pasta, exist_ok=True)
+
+        # Remove caches antigos do mesmo arquivo (hash diferente)
+        prefixo = os.path.basename(file_dss) + "."
+        for nome in os.listdir(pasta):
+            if nome.startswith(prefixo) and hash_origem not in nome:
+                try:
+                    os.remove(os.path.join(pasta, nome))
+                except FileNotFoundError:
+                    pass
+
+        largura = max((len(n) for n in biblioteca.nomes), default=1)
+        meta = np.zeros(len(biblioteca.nomes), dtype=[("nome", f"U{largura}"), ("npts", "i8"), ("minterval", "f8")])
+        meta["nome"] = biblioteca.nomes
+        meta["npts"] = biblioteca.npts
+        meta["minterval"] = biblioteca.minterval
+        _gravar_npy(arquivo_valores, biblioteca.valores)
+        _gravar_npy(arquivo_meta, meta)
+    return biblioteca
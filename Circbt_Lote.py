@@ -0,0 +1,235 @@
+##########################################################
+##   Execução em lote de vários circuitos BT            ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Encontra todos os circuitos (.dss com "New Circuit") em uma árvore de pastas,
+# instrumenta cada um como nos REV (monitores de tensão nas barras das linhas e
+# de potência nos trafos, via SessaoDSS), resolve o fluxo em processos paralelos
+# e junta os indicadores de cada alimentador em uma única tabela.
+# Cada alimentador tem um tempo limite: o processo que passar do limite (ou que
+# for encerrado por erro do OpenDSS) é substituído por um novo, e o alimentador
+# é registrado com o erro, sem interromper os demais. Depois de um alimentador
+# com erro o processo também é substituído: um erro de compilação (ex. Redirect
+# inexistente) deixa o OpenDSS do processo inutilizável ("Actor terminated"),
+# inclusive para um novo DSS() no mesmo processo.
+
+import os
+import re
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+import numpy as np
+import pandas as pd
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import FAIXAS_PRODIST, FD_LIMITE
+from Circbt_Loadshapes import PASTA_CACHE
+from Circbt_Cache import indicadores_cenario
+
+RE_CIRCUITO = re.compile(rb"^\s*new\s+(?:object\s*=\s*)?circuit\.", re.IGNORECASE | re.MULTILINE)
+
+# Limites do PRODIST para os indicadores individuais (%)
+DRP_LIMITE = 3.0
+DRC_LIMITE = 0.5
+
+
+############################
+### Descoberta e avaliação
+############################
+
+
+def descobrir_alimentadores(pasta):
+    # Arquivos .dss que definem um circuito (os chamados por Redirect, como loadshapes.dss, ficam de fora)
+    alimentadores = []
+    for raiz, pastas, arquivos in os.walk(pasta):
+        pastas[:] = sorted(p for p in pastas if p != PASTA_CACHE and not p.startswith("."))
+        for nome in sorted(arquivos):
+            if not nome.lower().endswith(".dss"):
+                continue
+            caminho = os.path.join(raiz, nome)
+            with open(caminho, "rb") as arquivo:
+                if RE_CIRCUITO.search(arquivo.read()):
+                    alimentadores.append(os.path.abspath(caminho))
+    return alimentadores
+
+
+def faixas_circuito(sessao):
+    # Faixas do PRODIST pela tensão de fase do secundário do trafo (220/127 V ou 380/220 V)
+    dss = sessao.dss
+    dss.transformers.name = sessao.trafo
+    dss.transformers.wdg = 2
+    tensao_fase = dss.transformers.kv * 1000 / np.sqrt(3)
+    return FAIXAS_PRODIST[min(FAIXAS_PRODIST, key=lambda v: abs(v - tensao_fase))]
+
+
+def avaliar_alimentador(file_dss, modo="daily", stepsize="10m", number=144, dss=None):
+    inicio = time.perf_counter()
+    sessao = SessaoDSS(file_dss, modo=modo, stepsize=stepsize, number=number, dss=dss)
+    convergiu = sessao.resolver()
+    dados = extrair_monitores(sessao.dss)
+
+    faixas = faixas_circuito(sessao)
+    indicadores = indicadores_cenario(sessao, dados, sessao.trafo, faixas)
+    monitores = [sessao.monitores_barras[b] for b in indicadores["barras"]]
+    tensoes = dados.selecionar(monitores, [1, 3, 5])
+
+    sessao.dss.transformers.name = sessao.trafo
+    kva_nominal = sessao.dss.transformers.kva
+
+    # Pior fase de cada barra
+    drp = indicadores["DRP"].max(axis=1)
+    drc = indicadores["DRC"].max(axis=1)
+    resumo = {
+        "barras": len(monitores),
+        "cargas": len(sessao.loads),
+        "geradores": len(sessao.generators),
+        "convergiu": bool(convergiu),
+        "DRP_max": drp.max(),
+        "DRC_max": drc.max(),
+        "barras_DRP": int(np.count_nonzero(drp > DRP_LIMITE)),
+        "barras_DRC": int(np.count_nonzero(drc > DRC_LIMITE)),
+        "P1_min": indicadores["P1"].min(),
+        "P99_max": indicadores["P99"].max(),
+        "FD95_max": indicadores["FD95"].max(),
+        "barras_FD": int(np.count_nonzero(indicadores["FD95"] > FD_LIMITE)),
+        "V_min": float(np.nanmin(tensoes)),
+        "V_max": float(np.nanmax(tensoes)),
+        "kVA_nominal": kva_nominal,
+        "kVA_max": float(indicadores["kVA_max"]),
+        "carregamento_max": 100 * float(indicadores["kVA_max"]) / kva_nominal,
+        "kWh_trafo": float(indicadores["kWh_trafo"]),
+        "tempo_s": time.perf_counter() - inicio,
+    }
+    return resumo, sessao.dss
+
+
+############################
+### Processos trabalhadores
+############################
+
+
+def _trabalhador(conexao, modo, stepsize, number):
+    # Uma instância do OpenDSS por processo, reaproveitada entre os alimentadores até o primeiro erro
+    perfil.iniciar_trabalhador()
+    dss = None
+    while True:
+        file_dss = conexao.recv()
+        if file_dss is None:
+            break
+        try:
+            resumo, dss = avaliar_alimentador(file_dss, modo, stepsize, number, dss)
+            resumo["erro"] = ""
+        except Exception as erro:
+            # Processo encerrado após o erro (o motor do OpenDSS não se recupera): o lote cria outro
+            conexao.send({"convergiu": False, "erro": f"{type(erro).__name__}: {erro}"})
+            break
+        conexao.send(resumo)
+
+
+class _Processo:
+    """Processo trabalhador e o alimentador que está resolvendo (com o prazo)."""
+
+    def __init__(self, contexto, argumentos):
+        self.conexao, remota = contexto.Pipe()
+        self.processo = contexto.Process(target=_trabalhador, args=(remota,) + argumentos, daemon=True)
+        self.processo.start()
+        remota.close()
+        self.tarefa = None
+        self.prazo = None
+
+    def enviar(self, tarefa, file_dss, tempo_limite):
+        self.tarefa = tarefa
+        self.prazo = time.monotonic() + tempo_limite if tempo_limite else None
+        self.conexao.send(file_dss)
+
+    def encerrar(self, forcar=False):
+        if forcar:
+            self.processo.kill()
+        else:
+            try:
+                self.conexao.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.processo.join()
+        self.conexao.close()
+
+
+############################
+### Execução do lote
+############################
+
+
+def executar_lote(alimentadores, n_processos=None, tempo_limite=600, modo="daily", stepsize="10m",
+                  number=144, pasta_base=None):
+    # alimentadores: lista de arquivos .dss ou pasta (busca recursiva com descobrir_alimentadores)
+    if isinstance(alimentadores, str):
+        pasta_base = pasta_base or alimentadores
+        alimentadores = descobrir_alimentadores(alimentadores)
+    alimentadores = [os.path.abspath(a) for a in alimentadores]
+    n_processos = max(1, min(n_processos or os.cpu_count(), len(alimentadores)))
+
+    contexto = multiprocessing.get_context()
+    argumentos = (modo, stepsize, number)
+    pendentes = deque(range(len(alimentadores)))
+    resultados = [None] * len(alimentadores)
+    processos = [_Processo(contexto, argumentos) for _ in range(n_processos if alimentadores else 0)]
+
+    def substituir(p, erro=None):
+        # Processo travado, encerrado ou que acabou de reportar um erro: coloca outro no lugar
+        if erro is not None:
+            resultados[p.tarefa] = {"convergiu": False, "erro": erro}
+        p.encerrar(forcar=erro is not None)
+        processos[processos.index(p)] = _Processo(contexto, argumentos)
+
+    while pendentes or any(p.tarefa is not None for p in processos):
+        for p in processos:
+            if p.tarefa is None and pendentes:
+                tarefa = pendentes.popleft()
+                p.enviar(tarefa, alimentadores[tarefa], tempo_limite)
+
+        ocupados = [p for p in processos if p.tarefa is not None]
+        prazos = [p.prazo for p in ocupados if p.prazo is not None]
+        espera = max(0.0, min(prazos) - time.monotonic()) if prazos else None
+        prontos = wait([p.conexao for p in ocupados], timeout=espera)
+
+        for p in ocupados:
+            if p.conexao in prontos:
+                try:
+                    resultados[p.tarefa] = p.conexao.recv()
+                    if resultados[p.tarefa]["erro"]:
+                        substituir(p)
+                    else:
+                        p.tarefa = None
+                except (EOFError, OSError):
+                    substituir(p, f"Processo encerrado (código {p.processo.exitcode})")
+            elif p.prazo is not None and time.monotonic() >= p.prazo:
+                substituir(p, f"Tempo limite de {tempo_limite} s excedido")
+
+    for p in processos:
+        p.encerrar()
+
+    # Uma linha por alimentador (caminho relativo à pasta de busca, quando informada)
+    linhas = []
+    for file_dss, resultado in zip(alimentadores, resultados):
+        nome = os.path.relpath(file_dss, pasta_base) if pasta_base else file_dss
+        linhas.append({"alimentador": nome, **resultado})
+    colunas = ["alimentador", "barras", "cargas", "geradores", "convergiu", "DRP_max", "DRC_max",
+               "barras_DRP", "barras_DRC", "P1_min", "P99_max", "FD95_max", "barras_FD", "V_min", "V_max",
+               "kVA_nominal", "kVA_max", "carregamento_max", "kWh_trafo", "tempo_s", "erro"]
+    return pd.DataFrame(linhas).reindex(columns=colunas)
+
+
+if __name__ == "__main__":
+    import sys
+
+    perfil.ativar_pelo_ambiente()   # CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO (rastro de cada trabalhador)
+    # Uso: python Circbt_Lote.py <pasta com os circuitos> [tempo limite por alimentador em s]
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles')
+    tempo_limite = float(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    df_lote = executar_lote(pasta, tempo_limite=tempo_limite)
+    print(df_lote.round(2).to_string(index=False))
+    df_lote.to_csv('lote_alimentadores.csv', index=False)
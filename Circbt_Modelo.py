@@ -0,0 +1,345 @@
+##########################################################
+##   Modelo do circuito (.dss) em memória               ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Lê os arquivos .dss (seguindo os Redirect, ex. loadshapes.dss) para um modelo
+# em memória com uma tabela (DataFrame) de propriedades por classe de elemento:
+# linecodes, linhas, cargas, geradores, baterias, monitores, loadshapes etc.
+# As alterações são feitas em bloco sobre as tabelas (máscaras/filtros do
+# pandas), por exemplo escalar o kW de todas as cargas com daily=CurvaGD_CARGA
+# ou trocar o linecode das linhas de um caminho, e o modelo gera:
+#   - o script delta mínimo (Edit/New apenas das propriedades alteradas), que
+#     também pode ser aplicado a uma SessaoDSS (alterações desfeitas com desfazer);
+#   - o arquivo completo, com os Redirect incorporados (uma variante = um
+#     arquivo), mantendo o texto original (e os comentários) dos elementos não
+#     alterados.
+# Os valores ficam como texto, exatamente como no arquivo; as operações
+# numéricas convertem apenas a coluna envolvida. As variantes (copiar)
+# compartilham as tabelas até a primeira alteração de cada classe, e o delta
+# compara só as classes alteradas: milhares de variantes em poucos segundos.
+
+import os
+import re
+import numpy as np
+import pandas as pd
+
+RE_NEW = re.compile(r"^\s*new\s+(?:object\s*=\s*)?([\w-]+)\.(\S+)(.*)$", re.IGNORECASE | re.DOTALL)
+RE_REDIRECT = re.compile(r"^\s*redirect\s+(.+?)\s*$", re.IGNORECASE)
+RE_PROPRIEDADE = re.compile(r"([A-Za-z%][\w%.-]*)\s*=\s*(\([^)]*\)|\[[^\]]*\]|\{[^}]*\}|\"[^\"]*\"|'[^']*'|\S+)")
+
+# Classes com atalho no modelo (modelo.lines, modelo.loads, ...)
+CLASSES = {
+    "linecodes": "linecode",
+    "lines": "line",
+    "loads": "load",
+    "generators": "generator",
+    "storages": "storage",
+    "monitors": "monitor",
+    "loadshapes": "loadshape",
+}
+
+# Ordem das classes no delta: definições (linecode, loadshape) antes dos elementos que as usam
+ORDEM_CLASSES = ["linecode", "loadshape", "line", "load", "generator", "storage", "monitor"]
+
+
+def _sem_comentario(linha):
+    return linha.split("!")[0].split("//")[0].strip()
+
+
+def _formatar(valor):
+    return f"{valor:.6g}"
+
+
+class _Elemento:
+    """Entrada de um 'New' no arquivo: classe, nome, ordem das propriedades e texto original."""
+
+    def __init__(self, classe, nome, chaves, texto):
+        self.classe = classe   # como escrita no arquivo (ex. 'Load', 'loadshape')
+        self.nome = nome
+        self.chaves = chaves   # nomes das propriedades na ordem do arquivo
+        self.texto = texto     # linhas originais (com comentários e continuações)
+
+
+def _ler_entradas(file_dss, entradas, linhas_tabela):
+    # Entradas do arquivo em ordem: ("texto", linha) | ("redirect", linha) | ("elemento", _Elemento)
+    pasta = os.path.dirname(os.path.abspath(file_dss))
+    with open(file_dss, encoding="latin-1") as arquivo:
+        linhas = arquivo.read().splitlines()
+
+    ultimo = None
+    for linha in linhas:
+        comando = _sem_comentario(linha)
+        continuacao = comando[:1] == "~" or comando.lower().startswith("more ")
+        if continuacao and ultimo is not None:
+            # Linha de continuação: propriedades do último elemento
+            resto = comando[1:] if comando[0] == "~" else comando[5:]
+            _ler_propriedades(resto, ultimo, linhas_tabela)
+            ultimo.texto.append(linha)
+            continue
+
+        novo = RE_NEW.match(comando)
+        redirect = RE_REDIRECT.match(comando)
+        if novo:
+            ultimo = _Elemento(novo.group(1), novo.group(2), [], [linha])
+            linhas_tabela.setdefault(ultimo.classe.lower(), {})[ultimo.nome.lower()] = {}
+            _ler_propriedades(novo.group(3), ultimo, linhas_tabela)
+            entradas.append(("elemento", ultimo))
+        elif redirect:
+            ultimo = None
+            entradas.append(("redirect", linha))
+            _ler_entradas(os.path.join(pasta, redirect.group(1).strip("\"'")), entradas, linhas_tabela)
+        else:
+            ultimo = None
+            entradas.append(("texto", linha))
+
+
+def _ler_propriedades(texto, elemento, linhas_tabela):
+    propriedades = linhas_tabela[elemento.classe.lower()][elemento.nome.lower()]
+    for chave, valor in RE_PROPRIEDADE.findall(texto):
+        if chave.lower() not in propriedades:
+            elemento.chaves.append(chave)
+        propriedades[chave.lower()] = valor
+
+
+def ler_modelo_dss(file_dss):
+    entradas, linhas_tabela = [], {}
+    _ler_entradas(file_dss, entradas, linhas_tabela)
+    tabelas = {classe: pd.DataFrame.from_dict(linhas, orient="index", dtype=object)
+               for classe, linhas in linhas_tabela.items()}
+    return ModeloDSS(entradas, tabelas)
+
+
+class ModeloDSS:
+    """Circuito lido dos arquivos .dss: uma tabela de propriedades (texto) por classe de elemento."""
+
+    def __init__(self, entradas, tabelas, originais=None, elementos=None):
+        self.entradas = entradas
+        self.tabelas = tabelas   # classe (minúsculas) -> DataFrame (índice = nome em minúsculas)
+        self._originais = originais if originais is not None else {c: t.copy() for c, t in tabelas.items()}
+        self._elementos = dict(elementos) if elementos is not None else \
+            {(e.classe.lower(), e.nome.lower()): e for tipo, e in entradas if tipo == "elemento"}
+        self._proprias = set(tabelas) if originais is None else set()   # tabelas já copiadas por este modelo
+        self._alteradas = set()                                          # classes com alterações
+
+    def __getattr__(self, atributo):
+        # modelo.lines, modelo.loads, ... (tabela vazia se a classe não existir no arquivo)
+        if atributo in CLASSES:
+            return self.tabela(CLASSES[atributo])
+        raise AttributeError(atributo)
+
+    def tabela(self, classe, editar=False):
+        # editar=True: tabela própria deste modelo, para alterações diretas (entram no delta)
+        classe = classe.lower()
+        if classe not in self.tabelas:
+            self.tabelas[classe] = pd.DataFrame(dtype=object)
+            self._proprias.add(classe)
+        if editar:
+            if classe not in self._proprias:
+                self.tabelas[classe] = self.tabelas[classe].copy()
+                self._proprias.add(classe)
+            self._alteradas.add(classe)
+        return self.tabelas[classe]
+
+    def copiar(self):
+        # Variante (mesmo caso original como referência do delta); as tabelas são copiadas na 1ª alteração
+        variante = ModeloDSS(self.entradas, dict(self.tabelas), self._originais, self._elementos)
+        variante._alteradas = set(self._alteradas)
+        self._proprias = set()   # tabelas agora compartilhadas: este modelo também copia antes de alterar
+        return variante
+
+    ############################
+    ### Alterações em bloco
+    ############################
+    def selecionar(self, classe, nomes=None, **filtros):
+        # Máscara das linhas pelos nomes e por propriedade=valor (ou lista de valores), sem diferenciar maiúsculas
+        tabela = self.tabela(classe)
+        mascara = np.ones(len(tabela), dtype=bool)
+        if nomes is not None:
+            mascara &= tabela.index.isin([n.lower() for n in nomes])
+        for propriedade, valores in filtros.items():
+            valores = [valores] if isinstance(valores, str) else valores
+            coluna = tabela[propriedade.lower()] if propriedade.lower() in tabela else pd.Series(None, tabela.index)
+            mascara &= coluna.astype(str).str.lower().isin([str(v).lower() for v in valores]).to_numpy()
+        return mascara
+
+    def valores(self, classe, propriedade, nomes=None, **filtros):
+        tabela = self.tabela(classe)
+        mascara = self.selecionar(classe, nomes, **filtros)
+        return pd.to_numeric(tabela.loc[mascara, propriedade.lower()], errors="coerce").to_numpy(dtype=float)
+
+    def definir(self, classe, propriedade, valores, nomes=None, **filtros):
+        # Mesmo valor (ou um valor por linha selecionada) na propriedade; retorna o nº de linhas
+        tabela = self.tabela(classe, editar=True)
+        mascara = self.selecionar(classe, nomes, **filtros)
+        if np.ndim(valores) > 0:
+            valores = [v if isinstance(v, str) else _formatar(v) for v in valores]
+        elif not isinstance(valores, str):
+            valores = _formatar(valores)
+        coluna = propriedade.lower()
+        if coluna not in tabela:
+            tabela[coluna] = pd.Series(None, index=tabela.index, dtype=object)
+        tabela.loc[mascara, coluna] = valores
+        return int(mascara.sum())
+
+    def escalar(self, classe, propriedade, fator, nomes=None, **filtros):
+        # Ex.: modelo.escalar("load", "kw", 1.3, daily="CurvaGD_CARGA")
+        return self.definir(classe, propriedade, self.valores(classe, propriedade, nomes, **filtros) * fator,
+                            nomes, **filtros)
+
+    def substituir(self, classe, propriedade, antigo, novo, nomes=None):
+        # Ex.: modelo.substituir("line", "linecode", "Cabo4CA", "Cabo2CA", nomes=linhas_do_caminho)
+        return self.definir(classe, propriedade, novo, nomes, **{propriedade: antigo})
+
+    def adicionar(self, classe, nome, propriedades):
+        tabela = self.tabela(classe, editar=True)
+        for chave in propriedades:
+            if chave.lower() not in tabela:
+                tabela[chave.lower()] = pd.Series(None, index=tabela.index, dtype=object)
+        tabela.loc[nome.lower()] = pd.Series({chave.lower(): v if isinstance(v, str) else _formatar(v)
+                                              for chave, v in propriedades.items()}, dtype=object)
+        self._elementos.setdefault((classe.lower(), nome.lower()), _Elemento(classe, nome, list(propriedades), []))
+
+    def remover(self, classe, nomes):
+        tabela = self.tabela(classe, editar=True)
+        self.tabelas[classe.lower()] = tabela.drop(index=[n.lower() for n in nomes])
+
+    ############################
+    ### Delta e arquivo completo
+    ############################
+    def alteracoes(self):
+        # Lista de (comando, classe, nome, propriedades): "Edit" (só as alteradas), "New" (elementos
+        # adicionados) e "Disable" (elementos removidos do modelo)
+        resultado = []
+        for classe in self._ordem_classes():
+            tabela = self.tabelas[classe]
+            original = self._originais.get(classe, pd.DataFrame(dtype=object))
+            comuns = tabela.index.intersection(original.index)
+            colunas = tabela.columns.union(original.columns)
+            atual = tabela.reindex(index=comuns, columns=colunas).to_numpy(dtype=object)
+            anterior = original.reindex(index=comuns, columns=colunas).to_numpy(dtype=object)
+            vazios_atual, vazios_anterior = pd.isna(atual), pd.isna(anterior)
+            diferentes = (vazios_atual != vazios_anterior) | (~vazios_atual & ~vazios_anterior & (atual != anterior))
+            for i in np.flatnonzero(diferentes.any(axis=1)):
+                propriedades = {colunas[j]: tabela.at[comuns[i], colunas[j]] for j in np.flatnonzero(diferentes[i])}
+                resultado.append(("Edit", classe, comuns[i], propriedades))
+            for nome in tabela.index.difference(original.index, sort=False):
+                resultado.append(("New", classe, nome, self._propriedades(classe, nome)))
+            for nome in original.index.difference(tabela.index, sort=False):
+                resultado.append(("Disable", classe, nome, {"enabled": "no"}))
+        return resultado
+
+    def _ordem_classes(self):
+        # Classes alteradas em ORDEM_CLASSES; as demais na ordem em que aparecem no arquivo
+        arquivo = {}
+        for tipo, entrada in self.entradas:
+            if tipo == "elemento":
+                arquivo.setdefault(entrada.classe.lower(), len(arquivo))
+        def posicao(classe):
+            if classe in ORDEM_CLASSES:
+                return (0, ORDEM_CLASSES.index(classe))
+            return (1, arquivo.get(classe, len(arquivo)))
+        return sorted(self._alteradas, key=posicao)
+
+    def _propriedades(self, classe, nome):
+        # Propriedades atuais do elemento, na ordem do arquivo (as novas ao final)
+        linha = self.tabelas[classe].loc[nome]
+        elemento = self._elementos.get((classe, nome))
+        chaves = list(elemento.chaves) if elemento else []
+        usadas = {c.lower() for c in chaves}
+        chaves += [c for c in linha.index if c not in usadas]
+        return {chave: linha[chave.lower()] for chave in chaves
+                if chave.lower() in linha.index and not pd.isna(linha[chave.lower()])}
+
+    def _nome_elemento(self, classe, nome):
+        elemento = self._elementos.get((classe, nome))
+        return f"{elemento.classe}.{elemento.nome}" if elemento else f"{classe}.{nome}"
+
+    def _comando(self, comando, classe, nome, propriedades):
+        argumentos = " ".join(f"{chave}={valor}" for chave, valor in propriedades.items())
+        return f"{'Edit' if comando == 'Disable' else comando} {self._nome_elemento(classe, nome)} {argumentos}"
+
+    def script_delta(self):
+        # Comandos para levar o circuito original ao modelo atual (aplicar após o Compile do original)
+        return "\n".join(self._comando(*alteracao) for alteracao in self.alteracoes())
+
+    def texto_completo(self):
+        # Arquivo único: texto original nos elementos sem alteração, New regenerado nos alterados,
+        # elementos adicionados logo após o último da mesma classe e Redirect incorporados
+        alterados = {(classe, nome) for comando, classe, nome, _ in self.alteracoes() if comando == "Edit"}
+        novos = {}
+        for comando, classe, nome, propriedades in self.alteracoes():
+            if comando == "New":
+                novos.setdefault(classe, []).append(self._comando(comando, classe, nome, propriedades))
+
+        ultimos = {}
+        for i, (tipo, entrada) in enumerate(self.entradas):
+            if tipo == "elemento":
+                ultimos[entrada.classe.lower()] = i
+                ultimos[None] = i
+        for classe in novos:
+            ultimos.setdefault(classe, ultimos.get(None, len(self.entradas) - 1))
+
+        linhas = []
+        for i, (tipo, entrada) in enumerate(self.entradas):
+            if tipo == "redirect":
+                linhas.append(f"// {entrada.strip()} (incorporado abaixo)")
+            elif tipo == "texto":
+                linhas.append(entrada)
+            else:
+                chave = (entrada.classe.lower(), entrada.nome.lower())
+                if chave[1] not in self.tabelas[chave[0]].index:
+                    pass   # elemento removido do modelo
+                elif chave in alterados:
+                    linhas.append(self._comando("New", *chave, self._propriedades(*chave)))
+                else:
+                    linhas.extend(entrada.texto)
+            for classe, comandos in novos.items():
+                if ultimos[classe] == i:
+                    linhas.extend(comandos)
+        return "\n".join(linhas) + "\n"
+
+    def gravar(self, caminho, delta=False):
+        # Arquivo completo (padrão) ou apenas o script delta
+        with open(caminho, "w", encoding="latin-1") as arquivo:
+            arquivo.write(self.script_delta() + "\n" if delta else self.texto_completo())
+        return caminho
+
+    def aplicar_sessao(self, sessao):
+        # Aplica o delta a uma sessão compilada com o circuito original; retorna o nº de alterações
+        # (sessao.desfazer(n) volta ao caso original). Elementos novos exigem o arquivo completo.
+        alteracoes = self.alteracoes()
+        if any(comando == "New" for comando, *_ in alteracoes):
+            raise ValueError("Elementos adicionados ao modelo: compile o arquivo completo (gravar)")
+        for comando, classe, nome, propriedades in alteracoes:
+            sessao.editar(self._nome_elemento(classe, nome), propriedades)
+        return len(alteracoes)
+
+
+if __name__ == "__main__":
+    import time
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    modelo = ler_modelo_dss(file_dss)
+    print({atalho: len(getattr(modelo, atalho)) for atalho in CLASSES})
+
+    # Cargas com GD 30% maiores e cabos 4CA trocados por 2CA no caminho do poste P15 até o trafo
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    variante = modelo.copiar()
+    variante.escalar("load", "kw", 1.3, daily="CurvaGD_CARGA")
+    variante.substituir("line", "linecode", "Cabo4CA", "Cabo2CA", nomes=sessao.topologia.linhas_caminho("P15"))
+    print(variante.script_delta())
+
+    # Mil variantes (fator de escala das cargas com GD) e os respectivos scripts delta
+    inicio = time.perf_counter()
+    for fator in np.linspace(0.5, 2.0, 1000):
+        outra = modelo.copiar()
+        outra.escalar("load", "kw", fator, daily="CurvaGD_CARGA")
+        outra.script_delta()
+    print(f"1000 variantes em {time.perf_counter() - inicio:.2f} s")
+
+    # Delta aplicado à sessão (sem recompilar)
+    n = variante.aplicar_sessao(sessao)
+    sessao.resolver()
+    sessao.desfazer(n)
@@ -0,0 +1,120 @@
+##########################################################
+##   Extração em bloco dos monitores do OpenDSS         ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Lê o byte stream de cada monitor uma única vez e decodifica tudo em um
+# único array (monitor x canal x tempo), em vez de chamar monitor.channel()
+# para cada canal de cada monitor.
+
+import ctypes
+import numpy as np
+from Circbt_Perfil import cronometrar
+
+ASSINATURA_MONITOR = 43756   # int32 no início do byte stream dos monitores
+TAMANHO_CABECALHO = 16 + 256  # 4 x int32 (assinatura, versão, nº canais, modo) + texto do cabeçalho
+
+
+class DadosMonitores:
+    """Valores de todos os monitores em um array com eixos (monitor, canal, tempo)."""
+
+    eixos = ("monitor", "canal", "tempo")
+
+    def __init__(self, monitores, canais, modos, horas, dados):
+        self.monitores = monitores   # nomes dos monitores (eixo 0)
+        self.canais = canais         # nomes dos canais de cada monitor (eixo 1)
+        self.modos = modos           # modo de cada monitor (0 = tensões/correntes, 1 = potências, ...)
+        self.horas = horas           # instante de cada amostra em horas (eixo 2)
+        self.dados = dados
+        self._indices = {nome.lower(): i for i, nome in enumerate(monitores)}
+
+    def indice(self, monitor):
+        return self._indices[monitor.lower()]
+
+    def indice_canal(self, monitor, canal):
+        # Canal pelo número (1 = primeiro canal, como em monitor.channel) ou pelo nome ('V1', 'P1 (kW)', ...)
+        if isinstance(canal, str):
+            return self.canais[self.indice(monitor)].index(canal)
+        return canal - 1
+
+    def canal(self, monitor, canal):
+        return self.dados[self.indice(monitor), self.indice_canal(monitor, canal)]
+
+    def selecionar(self, monitores, canais):
+        # Sub-array (monitores x canais x tempo) para um mesmo conjunto de canais
+        indices = [self.indice(m) for m in monitores]
+        colunas = [self.indice_canal(monitores[0], c) for c in canais]
+        return self.dados[np.ix_(indices, colunas)]
+
+    def __getitem__(self, monitor):
+        return self.dados[self.indice(monitor)]
+
+
+def _ler_byte_stream(monitor):
+    # Leitura direta do VARIANT retornado pelo OpenDSS (o py_dss_interface converte
+    # o byte stream em uma lista de bytes, o que é lento para monitores grandes)
+    funcao = getattr(getattr(monitor, "_dss_obj", None), "MonitorsV", None)
+    if funcao is None:
+        return b"".join(monitor.byte_stream)
+    ponteiro = ctypes.c_void_p()
+    tipo = ctypes.c_long()
+    tamanho = ctypes.c_long()
+    funcao(1, ctypes.byref(ponteiro), ctypes.byref(tipo), ctypes.byref(tamanho))
+    if not ponteiro.value:
+        return b""
+    return ctypes.string_at(ponteiro, tamanho.value)
+
+
+def decodificar_cabecalho(bruto):
+    assinatura, versao, n_canais, modo = np.frombuffer(bruto, dtype="<i4", count=4)
+    if assinatura != ASSINATURA_MONITOR:
+        raise ValueError("Byte stream de monitor inválido")
+    texto = bruto[16:TAMANHO_CABECALHO].split(b"\x00")[0].decode("latin-1")
+    nomes = [c.strip() for c in texto.split(",")[2:]] if texto else []
+    return int(n_canais), int(modo), nomes
+
+
+def decodificar_registros(bruto, n_canais):
+    # Cada registro: hora, segundos e os n canais, todos em float32
+    return np.frombuffer(bruto, dtype="<f4", offset=TAMANHO_CABECALHO).reshape(-1, 2 + n_canais)
+
+
+def monitores_ativos(dss):
+    # Monitores habilitados: o OpenDSS não remove monitores, e os das baterias desfeitas ficam desabilitados
+    ativos = []
+    for nome in dss.monitors.names:
+        dss.circuit.set_active_element(f"Monitor.{nome}")
+        if dss.cktelement.is_enabled:
+            ativos.append(nome)
+    return ativos
+
+
+@cronometrar("extracao")
+def extrair_monitores(dss, nomes=None):
+    monitor = dss.monitors
+    nomes = nomes or monitores_ativos(dss)
+
+    # Uma leitura de byte stream por monitor
+    brutos, cabecalhos = [], []
+    for nome in nomes:
+        monitor.name = nome
+        bruto = _ler_byte_stream(monitor)
+        n_canais, modo, canais = decodificar_cabecalho(bruto)
+        if len(canais) != n_canais:
+            # O cabeçalho textual não vem preenchido em algumas versões do OpenDSS
+            canais = [c.strip() for c in monitor.header]
+        brutos.append(bruto)
+        cabecalhos.append((n_canais, modo, canais))
+
+    # Decodificação para um único array contíguo (canais ausentes ficam como NaN)
+    registros = [decodificar_registros(b, c[0]) for b, c in zip(brutos, cabecalhos)]
+    n_max = max(c[0] for c in cabecalhos)
+    n_amostras = max(len(r) for r in registros)
+    dados = np.full((len(nomes), n_max, n_amostras), np.nan, dtype=np.float32)
+    for i, r in enumerate(registros):
+        dados[i, :r.shape[1] - 2, :len(r)] = r[:, 2:].T
+
+    maior = max(registros, key=len)
+    horas = maior[:, 0] + maior[:, 1] / 3600
+
+    return DadosMonitores(list(nomes), [c[2] for c in cabecalhos], [c[1] for c in cabecalhos], horas, dados)
@@ -0,0 +1,207 @@
+##########################################################
+##   Monte Carlo da penetração de veículos elétricos    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Sorteia carregadores de VE (curvas CurvaVE_Slow, CurvaVE_Fast_1 e
+# CurvaVE_Fast_2 do loadshapes.dss) entre as unidades consumidoras, com fase
+# e tipo aleatórios, para vários níveis de penetração. Cada realização tem a
+# sua própria semente (semente base, nível, índice), de modo que os resultados
+# não dependem da divisão do trabalho entre os processos.
+#
+# Para reduzir o custo por realização, cada processo compila o circuito uma
+# única vez e cria um carregador desligado por unidade consumidora (mono e
+# trifásico). Em cada realização apenas os carregadores que mudaram são
+# editados (Edit ... enabled=yes/no) antes do solve.
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Monitores import extrair_monitores
+from Circbt_Indicadores import FAIXAS_PRODIST, CANAIS_FASORES, calcular_indicadores, indicadores_desequilibrio
+
+# Tipos de carregador: curva diária, potência (kW), nº de fases e probabilidade de sorteio
+TIPOS_VE = {
+    "lento": {"curva": "CurvaVE_Slow", "kw": 3.7, "fases": 1, "probabilidade": 0.6},
+    "rapido_1": {"curva": "CurvaVE_Fast_1", "kw": 22.0, "fases": 3, "probabilidade": 0.2},
+    "rapido_2": {"curva": "CurvaVE_Fast_2", "kw": 22.0, "fases": 3, "probabilidade": 0.2},
+}
+
+# Cargas que representam unidades consumidoras (a IP fica de fora)
+CURVAS_CONSUMIDORES = ("curvacarga", "curvagd_carga")
+
+DRP_LIMITE = 3.0
+DRC_LIMITE = 0.5
+
+
+class EstudoVE:
+    """Circuito compilado com um carregador VE (desligado) por unidade consumidora."""
+
+    def __init__(self, sessao, tipos=TIPOS_VE, faixas=FAIXAS_PRODIST[127], sobrecarga_admissivel=1.2):
+        self.sessao = sessao
+        self.tipos = tipos
+        self.faixas = faixas
+        dss = sessao.dss
+
+        # Unidades consumidoras e as suas barras
+        self.consumidores = []
+        for carga in sessao.loads:
+            dss.loads.name = carga
+            if dss.loads.daily.lower() in CURVAS_CONSUMIDORES:
+                dss.circuit.set_active_element(f"Load.{carga}")
+                self.consumidores.append((carga, dss.cktelement.bus_names[0].split(".")[0]))
+
+        # Trafo, limites dos cabos e monitores usados nos indicadores
+        dss.transformers.name = sessao.trafo
+        self.kva_nominal = dss.transformers.kva
+        self.sobrecarga_admissivel = sobrecarga_admissivel
+        self.passo_h = dss.solution.step_size / 3600
+        self.monitores_barras = list(sessao.monitores_barras.values())
+        self.monitores_linhas = [f"V_{linha}" for linha in sessao.lines]
+        self.normamps = np.array(sessao.normamps_linhas)
+
+        # Carregadores pré-criados e desligados (um monofásico e um trifásico por consumidor)
+        for k, (_, barra) in enumerate(self.consumidores):
+            dss.text(f"New Load.VE1_{k} Bus1={barra}.1.4 phases=1 conn=wye Model=1 kV=0.127 kW=1 pf=1.0 "
+                     f"Vminpu=0.92 Vmaxpu=1.50 daily=CurvaVE_Slow status=variable enabled=no")
+            dss.text(f"New Load.VE3_{k} Bus1={barra}.1.2.3.4 phases=3 conn=wye Model=1 kV=0.22 kW=1 pf=1.0 "
+                     f"Vminpu=0.92 Vmaxpu=1.50 daily=CurvaVE_Fast_1 status=variable enabled=no")
+        self._ativos = {}   # elemento -> propriedades aplicadas na realização anterior
+
+    def sortear(self, penetracao, gerador):
+        # Carregadores da realização: {elemento: propriedades}. penetracao = fração dos consumidores com VE
+        nomes = list(self.tipos)
+        probabilidades = np.array([self.tipos[n]["probabilidade"] for n in nomes], dtype=float)
+        n_ve = int(round(penetracao * len(self.consumidores)))
+        escolhidos = gerador.choice(len(self.consumidores), n_ve, replace=False)
+        tipos = gerador.choice(len(nomes), n_ve, p=probabilidades / probabilidades.sum())
+        fases = gerador.integers(1, 4, n_ve)
+
+        carregadores = {}
+        for k, t, fase in zip(escolhidos, tipos, fases):
+            tipo = self.tipos[nomes[t]]
+            barra = self.consumidores[k][1]
+            if tipo["fases"] == 1:
+                carregadores[f"Load.VE1_{k}"] = f"Bus1={barra}.{fase}.4 kW={tipo['kw']} daily={tipo['curva']}"
+            else:
+                carregadores[f"Load.VE3_{k}"] = f"kW={tipo['kw']} daily={tipo['curva']}"
+        return carregadores
+
+    def aplicar(self, carregadores):
+        # Só os carregadores que mudaram desde a realização anterior são editados
+        dss = self.sessao.dss
+        for elemento in self._ativos.keys() - carregadores.keys():
+            dss.text(f"Edit {elemento} enabled=no")
+        for elemento, propriedades in carregadores.items():
+            if self._ativos.get(elemento) != propriedades:
+                dss.text(f"Edit {elemento} {propriedades} enabled=yes")
+        self._ativos = carregadores
+
+    def avaliar(self):
+        sessao = self.sessao
+        convergiu = sessao.resolver()
+        dados = extrair_monitores(sessao.dss)
+
+        # DRP/DRC da pior fase de cada barra
+        indicadores = calcular_indicadores(dados.selecionar(self.monitores_barras, [1, 3, 5]), self.faixas,
+                                           percentis=())
+        drp = indicadores["DRP"].max(axis=1)
+        drc = indicadores["DRC"].max(axis=1)
+        fd95 = indicadores_desequilibrio(dados.selecionar(self.monitores_barras, CANAIS_FASORES))["FD95"]
+
+        # Carregamento do trafo
+        ptotal = dados.selecionar([f"P_{sessao.trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+        qtotal = dados.selecionar([f"P_{sessao.trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+        stotal = np.sqrt(ptotal**2 + qtotal**2)
+
+        # Carregamento das linhas (maior corrente de fase no dia / normamps)
+        correntes = dados.selecionar(self.monitores_linhas, ["I1", "I2", "I3"])
+        carregamento = 100 * np.nanmax(correntes, axis=(1, 2)) / self.normamps
+
+        return {
+            "convergiu": bool(convergiu),
+            "DRP_max": drp.max(),
+            "DRC_max": drc.max(),
+            "barras_DRP": int(np.count_nonzero(drp > DRP_LIMITE)),
+            "barras_DRC": int(np.count_nonzero(drc > DRC_LIMITE)),
+            "FD95_max": fd95.max(),
+            "kVA_max": stotal.max(),
+            "horas_sobrecarga": np.count_nonzero(stotal > self.kva_nominal) * self.passo_h,
+            "horas_sobrecarga_admissivel": np.count_nonzero(stotal > self.sobrecarga_admissivel * self.kva_nominal)
+                                           * self.passo_h,
+            "carregamento_linhas_max": carregamento.max(),
+            "linhas_sobrecarregadas": int(np.count_nonzero(carregamento > 100)),
+        }
+
+    def realizacao(self, penetracao, semente, indice):
+        # Semente própria da realização: reprodutível independentemente do processo que a executa
+        gerador = np.random.default_rng([semente, int(round(1e6 * penetracao)), indice])
+        carregadores = self.sortear(penetracao, gerador)
+        self.aplicar(carregadores)
+        resultado = {"penetracao": penetracao, "realizacao": indice, "n_ve": len(carregadores)}
+        resultado.update(self.avaliar())
+        return resultado
+
+############################
+### Execução em paralelo
+############################
+
+_estudo = None
+
+
+def _iniciar_trabalhador(file_dss, stepsize, number, tipos):
+    global _estudo
+    perfil.iniciar_trabalhador()
+    _estudo = EstudoVE(SessaoDSS(file_dss, modo="daily", stepsize=stepsize, number=number), tipos)
+
+
+def _executar_realizacoes(tarefas):
+    return [_estudo.realizacao(*tarefa) for tarefa in tarefas]
+
+
+def executar_monte_carlo(file_dss, penetracoes=(0.0, 0.1, 0.2, 0.3, 0.5), n_realizacoes=1000, semente=0,
+                         n_processos=None, tipos=TIPOS_VE, stepsize="10m", number=144, tamanho_lote=256):
+    # Uma linha por realização (nível de penetração x índice)
+    tarefas = [(p, semente, r) for p in penetracoes for r in range(n_realizacoes)]
+    n_processos = n_processos or os.cpu_count()
+    tamanho = max(1, min(tamanho_lote, len(tarefas) // (4 * n_processos)))
+    lotes = [tarefas[i:i + tamanho] for i in range(0, len(tarefas), tamanho)]
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                             initargs=(os.path.abspath(file_dss), stepsize, number, tipos)) as executor:
+        resultados = [r for lote in executor.map(_executar_realizacoes, lotes) for r in lote]
+    return pd.DataFrame(resultados)
+
+
+def resumir_monte_carlo(df_realizacoes, percentis=(5, 50, 95)):
+    # Distribuição de cada indicador por nível de penetração e probabilidade de violação
+    indicadores = ["DRP_max", "DRC_max", "FD95_max", "kVA_max", "horas_sobrecarga", "carregamento_linhas_max"]
+    grupos = df_realizacoes.groupby("penetracao")
+    resumo = pd.DataFrame({"realizacoes": grupos.size()})
+    for indicador in indicadores:
+        resumo[f"{indicador}_media"] = grupos[indicador].mean()
+        for p in percentis:
+            resumo[f"{indicador}_P{p}"] = grupos[indicador].quantile(p / 100)
+    resumo["prob_DRP"] = grupos["DRP_max"].apply(lambda v: (v > DRP_LIMITE).mean())
+    resumo["prob_DRC"] = grupos["DRC_max"].apply(lambda v: (v > DRC_LIMITE).mean())
+    resumo["prob_sobrecarga_trafo"] = grupos["horas_sobrecarga"].apply(lambda v: (v > 0).mean())
+    resumo["prob_sobrecarga_linhas"] = grupos["linhas_sobrecarregadas"].apply(lambda v: (v > 0).mean())
+    resumo["nao_convergiu"] = grupos["convergiu"].apply(lambda v: (~v).sum())
+    return resumo.reset_index()
+
+
+if __name__ == "__main__":
+    import time
+
+    perfil.ativar_pelo_ambiente()   # CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO (rastro de cada trabalhador)
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+
+    inicio = time.perf_counter()
+    df_realizacoes = executar_monte_carlo(file_dss, penetracoes=(0.0, 0.1, 0.2, 0.3, 0.5), n_realizacoes=200)
+    print(f"{len(df_realizacoes)} realizações em {time.perf_counter() - inicio:.1f} s")
+
+    df_resumo = resumir_monte_carlo(df_realizacoes)
+    print(df_resumo.round(2).T.to_string())
+    df_realizacoes.to_csv('montecarlo_ve.csv', index=False)
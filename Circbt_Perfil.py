@@ -0,0 +1,308 @@
+##########################################################
+##   Instrumentação das etapas e chamadas ao OpenDSS    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Conta e cronometra as etapas do fluxo (compile, monitores, solve, extração,
+# indicadores, ...) e cada chamada à interface do OpenDSS (dss.text agrupado
+# pelo comando, ex. "dss.text(new monitor)", propriedades e métodos de
+# dss.lines, dss.monitors, ...). Opcionalmente grava um rastro no formato
+# Trace Event (JSON), que pode ser aberto no chrome://tracing ou no Perfetto.
+#
+# Desativada (padrão), etapa() devolve um objeto vazio reaproveitado e
+# envolver_dss() devolve o próprio objeto DSS: o custo fica desprezível e os
+# ganchos podem ficar no código de produção.
+#
+# Importar o módulo não ativa nada. Ativação explícita nos pontos de entrada:
+# perfil.ativar(rastro=True) no código, ou perfil.ativar_pelo_ambiente() nos
+# scripts, que lê as variáveis de ambiente
+#   CIRCBT_PERFIL=1                  contagens e tempos (perfil.resumo())
+#   CIRCBT_PERFIL_RASTRO=arquivo     idem + rastro gravado no arquivo ao final do processo
+# A configuração ativa fica no ambiente, de onde os processos trabalhadores a
+# leem: iniciar_trabalhador() no initializer do pool ativa a instrumentação no
+# processo e grava o rastro dele (arquivo.<pid>.json) quando o trabalhador é
+# encerrado (finalizador do multiprocessing; os trabalhadores não executam atexit).
+
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+import multiprocessing.util
+import pandas as pd
+
+
+class _Registro:
+    """Tempos acumulados por (categoria, nome) e eventos do rastro."""
+
+    def __init__(self):
+        self.ativo = False
+        self.rastro = False
+        self.max_eventos = 0
+        self.arquivo = None      # rastro gravado ao final do processo principal
+        self.zerar()
+
+    def zerar(self):
+        self.acumulados = {}
+        self.eventos = []
+        self.descartados = 0
+
+    def registrar(self, categoria, nome, inicio, duracao):
+        acumulado = self.acumulados.get((categoria, nome))
+        if acumulado is None:
+            self.acumulados[(categoria, nome)] = [1, duracao]
+        else:
+            acumulado[0] += 1
+            acumulado[1] += duracao
+        if self.rastro:
+            if len(self.eventos) < self.max_eventos:
+                self.eventos.append((categoria, nome, inicio, duracao, threading.get_ident()))
+            else:
+                self.descartados += 1
+
+
+_registro = _Registro()
+
+MAX_EVENTOS = 2_000_000
+
+
+def ativar(rastro=False, max_eventos=MAX_EVENTOS, arquivo=None):
+    # arquivo: rastro gravado ao final do processo (e um arquivo.<pid>.json por trabalhador)
+    _registro.ativo = True
+    _registro.rastro = rastro or arquivo is not None
+    _registro.max_eventos = max_eventos
+    os.environ["CIRCBT_PERFIL"] = "1"
+    os.environ["CIRCBT_PERFIL_PID"] = str(os.getpid())
+    if arquivo is not None:
+        arquivo = os.path.abspath(arquivo)
+        os.environ["CIRCBT_PERFIL_RASTRO"] = arquivo
+        if _registro.arquivo is None:
+            atexit.register(_gravar_ao_sair)
+        _registro.arquivo = arquivo
+
+
+def ativar_pelo_ambiente():
+    # Pontos de entrada (scripts): ativação pelas variáveis CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO
+    if os.environ.get("CIRCBT_PERFIL_RASTRO"):
+        ativar(arquivo=os.environ["CIRCBT_PERFIL_RASTRO"])
+    elif os.environ.get("CIRCBT_PERFIL", "0") not in ("", "0"):
+        ativar()
+    return _registro.ativo
+
+
+def iniciar_trabalhador():
+    # Initializer dos pools (antes de criar a SessaoDSS): mesma configuração do processo principal
+    # (nada a fazer se o processo principal não chamou ativar, ou no próprio processo principal)
+    if os.environ.get("CIRCBT_PERFIL_PID") in (None, str(os.getpid())):
+        return
+    arquivo = os.environ.get("CIRCBT_PERFIL_RASTRO") or None
+    _registro.zerar()   # eventos herdados do processo principal (fork)
+    _registro.arquivo = None
+    _registro.ativo = True
+    _registro.rastro = arquivo is not None
+    _registro.max_eventos = MAX_EVENTOS
+    if arquivo is not None:
+        base, extensao = os.path.splitext(arquivo)
+        multiprocessing.util.Finalize(None, _gravar_eventos, args=(f"{base}.{os.getpid()}{extensao}",),
+                                      exitpriority=10)
+
+
+def desativar():
+    _registro.ativo = False
+    _registro.rastro = False
+    for variavel in ("CIRCBT_PERFIL", "CIRCBT_PERFIL_RASTRO", "CIRCBT_PERFIL_PID"):
+        os.environ.pop(variavel, None)
+
+
+def ativo():
+    return _registro.ativo
+
+
+def zerar():
+    _registro.zerar()
+
+############################
+### Etapas
+############################
+
+
+class _Etapa:
+    """Cronômetro de uma etapa (usado com 'with')."""
+
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        _registro.registrar("etapa", self.nome, self.inicio, time.perf_counter() - self.inicio)
+
+
+class _EtapaNula:
+    """Etapa com a instrumentação desativada: não faz nada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+def etapa(nome):
+    # with perfil.etapa("solve"): ...
+    return _Etapa(nome) if _registro.ativo else _ETAPA_NULA
+
+
+def cronometrar(nome):
+    # Decorador: a função inteira é registrada como a etapa 'nome'
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _registro.ativo:
+                return funcao(*args, **kwargs)
+            with _Etapa(nome):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+############################
+### Chamadas ao OpenDSS
+############################
+
+
+def _nome_comando(comando):
+    # "New Monitor.V_P1_P2 element=..." -> "new monitor" || "Set mode=daily" -> "set mode"
+    partes = comando.split(None, 2)
+    if not partes:
+        return ""
+    verbo = partes[0].lower()
+    if len(partes) > 1 and verbo in ("new", "edit", "set", "?", "disable", "enable", "remove"):
+        return f"{verbo} {partes[1].split('.')[0].split('=')[0].lower()}"
+    return verbo
+
+
+class _InterfaceInstrumentada:
+    """Envolve uma interface do py_dss_interface (dss.lines, dss.monitors, ...) contando e cronometrando os acessos."""
+
+    def __init__(self, objeto, nome):
+        object.__setattr__(self, "_objeto", objeto)
+        object.__setattr__(self, "_nome", nome)
+
+    def __getattr__(self, atributo):
+        if atributo.startswith("_") or not _registro.ativo:
+            return getattr(self._objeto, atributo)
+        inicio = time.perf_counter()
+        valor = getattr(self._objeto, atributo)
+        if callable(valor):
+            return self._cronometrar(atributo, valor)
+        # Propriedade: a leitura é a própria chamada ao OpenDSS
+        _registro.registrar("dss", f"{self._nome}.{atributo}", inicio, time.perf_counter() - inicio)
+        return valor
+
+    def _cronometrar(self, atributo, metodo):
+        nome = f"{self._nome}.{atributo}"
+
+        def chamada(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                _registro.registrar("dss", nome, inicio, time.perf_counter() - inicio)
+        return chamada
+
+    def __setattr__(self, atributo, valor):
+        if not _registro.ativo:
+            setattr(self._objeto, atributo, valor)
+            return
+        inicio = time.perf_counter()
+        setattr(self._objeto, atributo, valor)
+        _registro.registrar("dss", f"{self._nome}.{atributo}=", inicio, time.perf_counter() - inicio)
+
+
+class DSSInstrumentado(_InterfaceInstrumentada):
+    """Objeto DSS com as chamadas registradas (dss.text por comando, sub-interfaces por propriedade/método)."""
+
+    def __init__(self, dss):
+        super().__init__(dss, "dss")
+        object.__setattr__(self, "_interfaces", {})
+
+    def __getattr__(self, atributo):
+        valor = getattr(self._objeto, atributo)
+        if atributo.startswith("_"):
+            return valor
+        if atributo == "text":
+            return self._texto
+        if callable(valor):
+            return _InterfaceInstrumentada.__getattr__(self, atributo)
+        # Sub-interfaces (lines, monitors, solution, ...) também são envolvidas
+        if atributo not in self._interfaces:
+            self._interfaces[atributo] = _InterfaceInstrumentada(valor, atributo)
+        return self._interfaces[atributo]
+
+    def _texto(self, comando):
+        if not _registro.ativo:
+            return self._objeto.text(comando)
+        inicio = time.perf_counter()
+        try:
+            return self._objeto.text(comando)
+        finally:
+            _registro.registrar("dss", f"dss.text({_nome_comando(comando)})", inicio, time.perf_counter() - inicio)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._objeto, atributo, valor)
+
+
+def envolver_dss(dss):
+    # Com a instrumentação desativada o objeto é usado diretamente (custo zero)
+    if not _registro.ativo or isinstance(dss, DSSInstrumentado):
+        return dss
+    return DSSInstrumentado(dss)
+
+############################
+### Relatórios
+############################
+
+
+def total_chamadas(categoria="dss"):
+    return sum(n for (c, _), (n, _) in _registro.acumulados.items() if c == categoria)
+
+
+def resumo():
+    # Uma linha por etapa/tipo de chamada, em ordem decrescente de tempo total
+    linhas = [{"categoria": c, "nome": nome, "chamadas": n, "tempo_total_s": t, "tempo_medio_us": 1e6 * t / n}
+              for (c, nome), (n, t) in _registro.acumulados.items()]
+    df = pd.DataFrame(linhas, columns=["categoria", "nome", "chamadas", "tempo_total_s", "tempo_medio_us"])
+    return df.sort_values(["categoria", "tempo_total_s"], ascending=[False, False], ignore_index=True)
+
+
+def gravar_rastro(arquivo):
+    # Formato Trace Event (eventos completos "X", tempos em microssegundos)
+    pid = os.getpid()
+    eventos = [{"name": nome, "cat": categoria, "ph": "X", "ts": 1e6 * inicio, "dur": 1e6 * duracao,
+                "pid": pid, "tid": tid} for categoria, nome, inicio, duracao, tid in _registro.eventos]
+    eventos.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"circbt {pid}"}})
+    with open(arquivo, "w") as f:
+        json.dump({"traceEvents": eventos, "displayTimeUnit": "ms",
+                   "otherData": {"eventos_descartados": _registro.descartados}}, f)
+    return arquivo
+
+
+def _gravar_eventos(arquivo):
+    if _registro.eventos:
+        gravar_rastro(arquivo)
+
+
+def _gravar_ao_sair():
+    # atexit do processo principal (ativar com arquivo)
+    if _registro.arquivo is not None:
+        _gravar_eventos(_registro.arquivo)
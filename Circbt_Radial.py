@@ -0,0 +1,475 @@
+##########################################################
+##   Fluxo de potência radial a 4 fios (NumPy)          ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Varredura inversa/direta (backward/forward sweep) trifásica com neutro,
+# montada a partir do circuito já compilado no OpenDSS (linhas, cargas,
+# geradores, trafo e reator de aterramento). Todos os passos de tempo (ou
+# cenários) são resolvidos juntos em um único array (lote x barra x condutor),
+# sem nenhuma chamada ao OpenDSS durante as iterações.
+#
+# Modelos representados (mesmas equações do OpenDSS):
+#   - cargas model=1 (PQ), 2 (Z), 3 (P cte, Q quadrático) e 5 (I cte), com a
+#     transição para impedância abaixo de Vminpu / acima de Vmaxpu;
+#   - geradores model=7 (PQ com corrente limitada abaixo de Vminpu);
+#   - linhas pela matriz série completa (Yprim), trafo pela impedância de curto
+#     referida ao secundário e neutro aterrado pelo reator da barra do trafo.
+# Storages e capacitores não são representados.
+#
+# Tolerância: comparado ao fluxo diário do OpenDSS (144 passos), a diferença
+# máxima nas tensões de fase das barras fica abaixo de TOLERANCIA_OPENDSS.
+
+import numpy as np
+
+NO_TERRA = -1              # nó 0 da barra (referência)
+TOLERANCIA_OPENDSS = 0.01  # V, diferença máxima aceita na verificação contra o OpenDSS
+
+# Modelos de elemento usados internamente (cargas: model do OpenDSS || geradores: 7)
+MODELO_PQ = 1
+MODELO_Z = 2
+MODELO_MOTOR = 3
+MODELO_I = 5
+MODELO_GERADOR = 7
+
+
+def _barra_nos(nome_barra):
+    # 'p2.1.3.4' -> ('p2', [1, 3, 4])
+    partes = nome_barra.lower().split(".")
+    return partes[0], [int(n) for n in partes[1:]]
+
+
+def _yprim(dss, elemento):
+    dss.circuit.set_active_element(elemento)
+    y = np.asarray(dss.cktelement.y_prim, dtype=float)
+    n = int(round(np.sqrt(len(y) // 2)))
+    return (y[0::2] + 1j * y[1::2]).reshape(n, n)
+
+
+def _ramos_elemento(nos, fases, delta, kv):
+    # Ramos (nó a, nó b, tensão base) de uma carga/gerador conforme a conexão do OpenDSS
+    if fases == 1:
+        # Monofásico: entre o 1º e o 2º nó informados (ou entre o 1º nó e a terra)
+        b = nos[1] if len(nos) > 1 else 0
+        return [(nos[0], b, kv * 1000)]
+    if delta:
+        return [(nos[k], nos[(k + 1) % fases], kv * 1000) for k in range(fases)]
+    neutro = nos[fases] if len(nos) > fases else 0
+    return [(nos[k], neutro, kv * 1000 / np.sqrt(3)) for k in range(fases)]
+
+
+class ModeloRadial:
+    """Circuito radial 4 fios em arrays NumPy para a varredura inversa/direta."""
+
+    def __init__(self, dss, trafo):
+        # trafo: nome do trafo MT/BT (ex. sessao.trafo)
+        self._montar_fonte(dss, trafo)
+        self._montar_linhas(dss)
+        self._montar_elementos(dss)
+
+    ############################
+    ### Montagem a partir do DSS
+    ############################
+    def _montar_fonte(self, dss, trafo):
+        dss.transformers.name = trafo
+        dss.circuit.set_active_element(f"Transformer.{trafo}")
+        self.raiz, _ = _barra_nos(dss.cktelement.bus_names[1])
+
+        dss.transformers.wdg = 1
+        kv_at, tap_at, r_at = dss.transformers.kv, dss.transformers.tap, dss.transformers.r
+        dss.transformers.wdg = 2
+        kv_bt, tap_bt, r_bt = dss.transformers.kv, dss.transformers.tap, dss.transformers.r
+        kva = dss.transformers.kva
+
+        # Impedância de curto do trafo (por fase, referida ao secundário)
+        zbase = kv_bt**2 * 1000 / kva
+        self.z_trafo = (r_at + r_bt + 1j * dss.transformers.xhl) / 100 * zbase
+
+        # Tensão em vazio no secundário a partir da fonte (equivalente de Thevenin na barra de AT)
+        dss.vsources.name = dss.vsources.names[0]
+        relacao = (kv_bt * tap_bt) / (kv_at * tap_at)
+        z1_fonte = (float(dss.text(f"? Vsource.{dss.vsources.name}.R1"))
+                    + 1j * float(dss.text(f"? Vsource.{dss.vsources.name}.X1")))
+        self.z_trafo += z1_fonte * relacao**2
+        modulo = dss.vsources.pu * dss.vsources.base_kv * 1000 * relacao / np.sqrt(3)
+        angulo = np.radians(dss.vsources.angle_deg - 30)   # Dyn1: secundário atrasado 30°
+        self.e_fonte = modulo * np.exp(1j * (angulo - np.radians([0, 120, 240])))
+
+        # Reator de aterramento do neutro na barra do trafo (nó 4 -> terra)
+        self.z_aterramento = 0
+        if dss.reactors.count > 0:
+            for nome in dss.reactors.names:
+                dss.circuit.set_active_element(f"Reactor.{nome}")
+                b1, n1 = _barra_nos(dss.cktelement.bus_names[0])
+                b2, n2 = _barra_nos(dss.cktelement.bus_names[1])
+                if b1 == b2 == self.raiz and n2 == [0]:
+                    self.z_aterramento = 1 / _yprim(dss, f"Reactor.{nome}")[0, 0]
+
+    def _montar_linhas(self, dss):
+        # Percurso a partir do secundário do trafo: cada barra recebe a linha que a alimenta
+        ligacoes = {}
+        for nome in dss.lines.names:
+            dss.circuit.set_active_element(f"Line.{nome}")
+            b1, n1 = _barra_nos(dss.cktelement.bus_names[0])
+            b2, n2 = _barra_nos(dss.cktelement.bus_names[1])
+            ligacoes.setdefault(b1, []).append((nome, b1, n1, b2, n2))
+            ligacoes.setdefault(b2, []).append((nome, b1, n1, b2, n2))
+
+        self.barras = [self.raiz]
+        pai, profundidade, linha_barra = [-1], [0], [None]
+        z_ramos = [np.zeros((4, 4), dtype=complex)]
+        indices = {self.raiz: 0}
+        k = 0
+        while k < len(self.barras):
+            barra = self.barras[k]
+            for nome, b1, n1, b2, n2 in ligacoes.get(barra, []):
+                filho, nos_pai, nos_filho = (b2, n1, n2) if b1 == barra else (b1, n2, n1)
+                if filho in indices:
+                    if linha_barra[indices[filho]] != nome and indices[filho] != pai[k]:
+                        raise ValueError(f"Circuito não radial (malha na linha {nome})")
+                    continue
+                if nos_pai != nos_filho:
+                    raise ValueError(f"Linha {nome}: condutores com nós diferentes nas duas barras")
+
+                # Matriz série da linha (Yprim = [[Ys, -Ys], [-Ys, Ys]] + shunt) nos nós 1 a 4
+                y = _yprim(dss, f"Line.{nome}")
+                n = len(nos_pai)
+                z = np.zeros((4, 4), dtype=complex)
+                posicoes = np.array(nos_pai) - 1
+                z[np.ix_(posicoes, posicoes)] = np.linalg.inv(-y[:n, n:])
+
+                indices[filho] = len(self.barras)
+                self.barras.append(filho)
+                pai.append(k)
+                profundidade.append(profundidade[k] + 1)
+                linha_barra.append(nome)
+                z_ramos.append(z)
+            k += 1
+
+        self.indices = indices
+        self.pai = np.array(pai)
+        self.profundidade = np.array(profundidade)
+        self.linhas = linha_barra              # linha que alimenta cada barra (None na raiz)
+        self.z_ramos = np.array(z_ramos)
+        self.niveis = [np.flatnonzero(self.profundidade == p) for p in range(1, self.profundidade.max() + 1)]
+
+    def _montar_elementos(self, dss):
+        nomes, barra, no_a, no_b, vbase, s_nominal = [], [], [], [], [], []
+        modelo, vmin, vmax, vlow, curva = [], [], [], [], []
+        self.curvas = []
+
+        def adicionar(elemento, nos, fases, delta, kv, kw, kvar, mod, vmn, vmx, vlw, nome_curva):
+            b, nos_barra = _barra_nos(nos)
+            if not nos_barra:
+                nos_barra = list(range(1, fases + 1))
+            if b not in self.indices:
+                raise ValueError(f"{elemento}: barra {b} fora do circuito radial")
+            if nome_curva and nome_curva.lower() not in self.curvas:
+                self.curvas.append(nome_curva.lower())
+            ramos = _ramos_elemento(nos_barra, fases, delta, kv)
+            for a, n_b, vb in ramos:
+                nomes.append(elemento)
+                barra.append(self.indices[b])
+                no_a.append(a - 1)
+                no_b.append(n_b - 1 if n_b > 0 else NO_TERRA)
+                vbase.append(vb)
+                s_nominal.append((kw + 1j * kvar) * 1000 / len(ramos))
+                modelo.append(mod)
+                vmin.append(vmn)
+                vmax.append(vmx)
+                vlow.append(vlw)
+                curva.append(self.curvas.index(nome_curva.lower()) if nome_curva else -1)
+
+        # Cargas
+        if dss.loads.count > 0:
+            dss.loads.first()
+            for _ in range(dss.loads.count):
+                nome = dss.loads.name
+                dss.circuit.set_active_element(f"Load.{nome}")
+                if dss.cktelement.is_enabled:
+                    adicionar(f"Load.{nome}", dss.cktelement.bus_names[0], dss.cktelement.num_phases,
+                              bool(dss.loads.is_delta), dss.loads.kv, dss.loads.kw, dss.loads.kvar,
+                              dss.loads.model, dss.loads.vmin_pu, dss.loads.vmax_pu,
+                              float(dss.text(f"? Load.{nome}.vlowpu")), dss.loads.daily)
+                dss.loads.next()
+
+        # Geradores (convenção de carga com potência negativa). kW/kvar nominais lidos pela
+        # propriedade: após um solve, generators.kw retorna o despacho do último passo
+        if dss.generators.count > 0:
+            dss.generators.first()
+            for _ in range(dss.generators.count):
+                nome = dss.generators.name
+                dss.circuit.set_active_element(f"Generator.{nome}")
+                if dss.cktelement.is_enabled:
+                    delta = dss.text(f"? Generator.{nome}.conn").lower().startswith("d")
+                    adicionar(f"Generator.{nome}", dss.cktelement.bus_names[0], dss.cktelement.num_phases,
+                              delta, dss.generators.kv, -float(dss.text(f"? Generator.{nome}.kw")),
+                              -float(dss.text(f"? Generator.{nome}.kvar")),
+                              MODELO_GERADOR, float(dss.text(f"? Generator.{nome}.vminpu")),
+                              float(dss.text(f"? Generator.{nome}.vmaxpu")), 0.0,
+                              dss.text(f"? Generator.{nome}.daily"))
+                dss.generators.next()
+
+        self.elementos = nomes
+        self.barra_elemento = np.array(barra, dtype=int)
+        self.no_a = np.array(no_a, dtype=int)
+        self.no_b = np.array(no_b, dtype=int)
+        self.vbase = np.array(vbase)
+        self.s_nominal = np.array(s_nominal, dtype=complex)
+        self.modelo = np.array(modelo, dtype=int)
+        self.vmin = np.array(vmin)
+        self.vmax = np.array(vmax)
+        self.vlow = np.array(vlow)
+        self.curva = np.array(curva, dtype=int)
+        self.grupos = [(mod, np.flatnonzero(self.modelo == mod)) for mod in np.unique(self.modelo)]
+
+        # Multiplicadores das curvas (pontos e intervalo em horas) para montar os passos de tempo
+        self.pontos_curvas = []
+        for nome in self.curvas:
+            dss.loadshapes.name = nome
+            self.pontos_curvas.append((np.asarray(dss.loadshapes.p_mult, dtype=float),
+                                       dss.loadshapes.hr_interval))
+
+    ############################
+    ### Cargas ao longo do tempo
+    ############################
+    def multiplicadores(self, n_passos, passo_h, hora_inicial=0.0):
+        # Multiplicador de cada curva em cada passo (curvas x passos), com a mesma regra do
+        # OpenDSS: passo k resolvido na hora (k + 1) * passo, ponto round(hora / intervalo)
+        horas = hora_inicial + passo_h * np.arange(1, n_passos + 1)
+        mult = np.ones((len(self.curvas) + 1, n_passos))   # última linha: elementos sem curva
+        for i, (pontos, intervalo) in enumerate(self.pontos_curvas):
+            indice = np.rint(horas / intervalo).astype(int) % len(pontos)
+            mult[i] = pontos[indice - 1]
+        return mult
+
+    def potencias(self, mult):
+        # Potência de cada ramo de elemento em cada passo (lote x ramos)
+        return mult[self.curva].T * self.s_nominal
+
+    ############################
+    ### Varredura inversa/direta
+    ############################
+    def _coeficientes(self, s):
+        # Termos que dependem só da potência (calculados uma vez por resolução).
+        # Internamente os arrays são (ramos x lote): o lote fica no eixo contíguo.
+        s = np.ascontiguousarray(s.T)
+        vbase, vmin, vmax, vlow = (x[:, np.newaxis] for x in (self.vbase, self.vmin, self.vmax, self.vlow))
+        corrente_cte = (self.modelo == MODELO_I)[:, np.newaxis]
+        yeq = np.conj(s) / vbase**2
+        i_low = yeq * vlow * vbase
+        i_95 = yeq * vmin * vbase / np.where(corrente_cte, vmin, vmin**2)
+        return {
+            "s": s,
+            "yeq": yeq,
+            "i_low": i_low,
+            "m95": (i_95 - i_low) / np.where(vmin > vlow, (vmin - vlow) * vbase, 1),
+            "y105": yeq / np.where(corrente_cte, vmax, vmax**2),
+            "limite": np.abs(s) / (vmin * vbase),
+        }
+
+    def _correntes_elementos(self, v, coef):
+        # Corrente de cada ramo (do nó a para o nó b) para a tensão v entre os nós,
+        # calculada só nas linhas de cada modelo
+        corrente = np.empty_like(v)
+        for mod, linhas in self.grupos:
+            vg = v[linhas]
+            yeq = coef["yeq"][linhas]
+            if mod == MODELO_Z:
+                corrente[linhas] = yeq * vg
+                continue
+
+            s = coef["s"][linhas]
+            vmag = np.abs(vg)
+            if mod == MODELO_GERADOR:
+                # Gerador model=7: corrente limitada ao valor em Vminpu (mantendo o ângulo)
+                ig = np.conj(s / vg)
+                limite = coef["limite"][linhas]
+                acima = np.abs(ig) > limite
+                if acima.any():
+                    ig[acima] *= limite[acima] / np.abs(ig[acima])
+                corrente[linhas] = ig
+                continue
+
+            vbase = self.vbase[linhas, np.newaxis]
+            if mod == MODELO_MOTOR:
+                ig = np.conj(s.real / vg) + 1j * yeq.imag * vg
+            elif mod == MODELO_I:
+                ig = np.conj(s) / vbase * vg / vmag
+            else:
+                ig = np.conj(s / vg)
+
+            # Faixa inferior: interpolação linear da corrente entre Vlowpu (Z cte) e Vminpu
+            inferior = vmag <= self.vmin[linhas, np.newaxis] * vbase
+            if inferior.any():
+                vlow = np.broadcast_to(self.vlow[linhas, np.newaxis] * vbase, vg.shape)[inferior]
+                vm, vi = vmag[inferior], vg[inferior]
+                interpolada = (coef["i_low"][linhas][inferior] + coef["m95"][linhas][inferior] * (vm - vlow)) / vm * vi
+                ig[inferior] = np.where(vm <= vlow, yeq[inferior] * vi, interpolada)
+
+            # Faixa superior: impedância constante que mantém a continuidade em Vmaxpu
+            superior = vmag > self.vmax[linhas, np.newaxis] * vbase
+            if superior.any():
+                ig[superior] = coef["y105"][linhas][superior] * vg[superior]
+            corrente[linhas] = ig
+        return corrente
+
+    def _somas_ordenadas(self, destinos):
+        # Ordenação para somar linhas por destino com np.add.reduceat (mais rápido que np.add.at)
+        ordem = np.argsort(destinos, kind="stable")
+        unicos, inicios = np.unique(destinos[ordem], return_index=True)
+        return ordem, unicos, inicios
+
+    def _estrutura(self):
+        # Nós de cada ramo de elemento (último nó = terra) e ordenações das somas por nó e por nível
+        n_barras = len(self.barras)
+        idx_a = self.barra_elemento * 4 + self.no_a
+        idx_b = np.where(self.no_b >= 0, self.barra_elemento * 4 + self.no_b, n_barras * 4)
+        ordem, nos_injecao, inicios = self._somas_ordenadas(np.concatenate([idx_a, idx_b]))
+        somas_niveis = [(nivel[o], self.pai[nivel][o][i], i)
+                        for nivel in self.niveis
+                        for o, _, i in [self._somas_ordenadas(self.pai[nivel])]]
+        return idx_a, idx_b, ordem, nos_injecao, inicios, somas_niveis
+
+    def _varrer(self, injecao, somas_niveis, e_fonte, v_novo):
+        # Uma varredura para injeções nodais fixas (barra*4 + nó, lote; última linha = terra):
+        # preenche v_novo e devolve as correntes dos trechos (linear nas injeções com e_fonte = 0)
+        n_barras, n_lote = len(self.barras), injecao.shape[1]
+        corrente_terra = injecao[-1]
+        i_ramos = injecao[:-1].reshape(n_barras, 4, n_lote).copy()
+
+        # Varredura inversa: corrente de cada trecho = carga da barra + trechos a jusante
+        for filhos, pais, inicios_nivel in reversed(somas_niveis):
+            i_ramos[pais] += np.add.reduceat(i_ramos[filhos], inicios_nivel)
+
+        # Varredura direta: secundário do trafo e quedas nos trechos
+        v_novo[0, 3] = self.z_aterramento * corrente_terra
+        v_novo[0, :3] = v_novo[0, 3] + e_fonte - self.z_trafo * i_ramos[0, :3]
+        for nivel in self.niveis:
+            v_novo[nivel] = v_novo[self.pai[nivel]] - np.einsum("nij,njb->nib", self.z_ramos[nivel],
+                                                                 i_ramos[nivel])
+        return i_ramos
+
+    def resolver(self, s, tolerancia=1e-4, max_iteracoes=100, tensoes_iniciais=None):
+        # s: potências dos ramos dos elementos (lote x ramos), ver potencias()
+        # tensoes_iniciais: ponto de partida (lote x barra x 4), ex. a solução de um caso próximo
+        s = np.atleast_2d(s)
+        n_lote, n_barras = s.shape[0], len(self.barras)
+        coef = self._coeficientes(s)
+        idx_a, idx_b, ordem, nos_injecao, inicios, somas_niveis = self._estrutura()
+
+        # Tensões nodais (barra*4 + nó, lote) com uma linha extra para a terra (sempre 0 V).
+        # Tensão inicial (padrão): fonte em vazio em todas as barras (neutro em 0 V)
+        vnos = np.zeros((n_barras * 4 + 1, n_lote), dtype=complex)
+        v = vnos[:-1].reshape(n_barras, 4, n_lote)
+        if tensoes_iniciais is None:
+            v[:, :3] = self.e_fonte[:, np.newaxis]
+        else:
+            v[...] = np.moveaxis(np.broadcast_to(tensoes_iniciais, (n_lote, n_barras, 4)), 0, -1)
+        v_novo = np.empty_like(v)
+        injecao = np.zeros_like(vnos)
+        convergiu = False
+        for iteracao in range(1, max_iteracoes + 1):
+            # Correntes dos elementos e injeções nodais (entra no nó a, sai no nó b)
+            corrente = self._correntes_elementos(vnos[idx_a] - vnos[idx_b], coef)
+            injecao[nos_injecao] = np.add.reduceat(np.concatenate([corrente, -corrente])[ordem], inicios)
+            i_ramos = self._varrer(injecao, somas_niveis, self.e_fonte[:, np.newaxis], v_novo)
+
+            erro = np.abs(v_novo - v).max()
+            v[...] = v_novo
+            if erro < tolerancia:
+                convergiu = True
+                break
+
+        # Resultados no formato (lote, barra, nó)
+        v = np.moveaxis(v, -1, 0)
+        i_ramos = np.moveaxis(i_ramos, -1, 0)
+        return ResultadoRadial(self, v, i_ramos, convergiu, iteracao)
+
+    def correntes_elementos(self, tensoes, s):
+        # Corrente de cada ramo de elemento (lote x ramos) com as tensões nodais dadas (lote x barra x 4)
+        # e as potências s (lote x ramos), sem iterar
+        tensoes, s = np.reshape(tensoes, (-1, len(self.barras), 4)), np.atleast_2d(s)
+        idx_a, idx_b = self._estrutura()[:2]
+        vnos = np.concatenate([tensoes.reshape(len(tensoes), -1).T, np.zeros((1, len(tensoes)))])
+        return self._correntes_elementos(vnos[idx_a] - vnos[idx_b], self._coeficientes(s)).T
+
+    def resposta_linear(self, barras, no_a, no_b):
+        # Tensões nodais e correntes dos trechos (lote x barra x 4) com a fonte em curto e 1 A entrando
+        # no nó a e saindo no nó b (NO_TERRA: terra) da barra, um caso por item: superpostas às de uma
+        # solução, dão o efeito de mudar as correntes dos elementos dessa solução (sem iterar)
+        barras, no_a, no_b = (np.asarray(x, dtype=int) for x in (barras, no_a, no_b))
+        n_lote, n_barras = len(barras), len(self.barras)
+        casos = np.arange(n_lote)
+        injecao = np.zeros((n_barras * 4 + 1, n_lote), dtype=complex)
+        np.add.at(injecao, (barras * 4 + no_a, casos), 1)
+        np.add.at(injecao, (np.where(no_b >= 0, barras * 4 + no_b, n_barras * 4), casos), -1)
+        v = np.empty((n_barras, 4, n_lote), dtype=complex)
+        i_ramos = self._varrer(injecao, self._estrutura()[-1], 0, v)
+        return np.moveaxis(v, -1, 0), np.moveaxis(i_ramos, -1, 0)
+
+    def resolver_passos(self, n_passos, passo_h, hora_inicial=0.0, **kwargs):
+        return self.resolver(self.potencias(self.multiplicadores(n_passos, passo_h, hora_inicial)), **kwargs)
+
+
+class ResultadoRadial:
+    """Tensões nodais (lote x barra x nó 1..4) e correntes nos trechos da varredura radial."""
+
+    def __init__(self, modelo, tensoes, correntes, convergiu, iteracoes):
+        self.modelo = modelo
+        self.tensoes = tensoes       # complexas, nó para a terra (como os monitores do OpenDSS)
+        self.correntes = correntes   # corrente do trecho que alimenta cada barra (na raiz: saída do trafo)
+        self.convergiu = convergiu
+        self.iteracoes = iteracoes
+
+    def tensoes_barra(self, barra):
+        # Módulo das tensões de fase (lote x 3) de uma barra
+        return np.abs(self.tensoes[:, self.modelo.indices[barra.lower()], :3])
+
+    def tensoes_fase_neutro(self):
+        # Módulo das tensões fase-neutro (lote x barra x 3)
+        return np.abs(self.tensoes[:, :, :3] - self.tensoes[:, :, 3:])
+
+    def potencia_trafo(self):
+        # Potência fornecida pela fonte interna do trafo (lote x 3 fases), em kW + j kvar
+        return self.modelo.e_fonte * np.conj(self.correntes[:, 0, :3]) / 1000
+
+
+def comparar_opendss(sessao, tolerancia=TOLERANCIA_OPENDSS):
+    # Resolve o fluxo diário no OpenDSS e na varredura radial e compara as tensões de fase
+    # de todas as barras monitoradas. Retorna (diferença máxima em V, modelo, resultado).
+    from Circbt_Monitores import extrair_monitores
+
+    dss = sessao.dss
+    sessao.resolver()
+    dados = extrair_monitores(dss)
+
+    modelo = ModeloRadial(dss, sessao.trafo)
+    resultado = modelo.resolver_passos(dss.solution.number, dss.solution.step_size / 3600)
+
+    diferenca = 0.0
+    for barra, monitor in sessao.monitores_barras.items():
+        v_dss = dados.selecionar([monitor], [1, 3, 5])[0].T
+        v_radial = resultado.tensoes_barra(barra)[:v_dss.shape[0]]
+        diferenca = max(diferenca, np.abs(v_dss - v_radial).max())
+
+    if diferenca > tolerancia:
+        raise ValueError(f"Varredura radial difere do OpenDSS em {diferenca:.4f} V (tolerância {tolerancia} V)")
+    return diferenca, modelo, resultado
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+
+    diferenca, modelo, resultado = comparar_opendss(sessao)
+    print(f"Diferença máxima para o OpenDSS: {diferenca:.4f} V ({resultado.iteracoes} iterações)")
+
+    # Um ano de passos de 10 minutos em uma única chamada
+    inicio = time.perf_counter()
+    resultado = modelo.resolver_passos(365 * 144, 1 / 6)
+    print(f"365 x 144 passos: {time.perf_counter() - inicio:.2f} s (convergiu: {resultado.convergiu})")
@@ -0,0 +1,310 @@
+##########################################################
+##   Geração de relatórios gráficos em lote (sem tela)  ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Renderiza os gráficos dos scripts REV (tensões do poste, kW, kvar e kVA no
+# trafo e loadshapes) para N cenários sem plt.show(): as figuras são criadas
+# uma única vez por processo com o backend Agg (sem pyplot e sem interface
+# gráfica) e, a cada cenário, só os dados das curvas são trocados. Os cenários
+# são divididos entre processos e um índice (CSV e HTML) lista os arquivos.
+
+import os
+import re
+import html
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.image import imsave
+
+PAINEIS = ("tensoes", "kw", "kvar", "kva", "loadshapes")
+
+
+def _nome_arquivo(nome):
+    return re.sub(r"[^\w.-]+", "_", str(nome)).strip("_") or "cenario"
+
+
+def _ajustar_limites(ax, limites, *series):
+    # Mesmos limites fixos dos REV, ampliados apenas quando os dados saem deles
+    # (painel sem curvas, ex. sem loadshapes: apenas os limites fixos)
+    valores = [np.ravel(s) for s in series if s is not None and np.size(s)]
+    valores = np.concatenate(valores) if valores else np.empty(0)
+    valores = valores[np.isfinite(valores)]
+    inferior = min(limites[0], valores.min()) if valores.size else limites[0]
+    superior = max(limites[1], valores.max()) if valores.size else limites[1]
+    ax.set_ylim(inferior, superior)
+
+
+class PaineisCenario:
+    """Figuras dos gráficos dos REV criadas uma vez e reaproveitadas em todos os cenários."""
+
+    def __init__(self, dpi=100):
+        self.dpi = dpi
+        self.figuras = {}
+        self._dinamicos = {}   # artistas que mudam por cenário (curvas, título, legenda das curvas)
+        self._fundos = {}      # imagem de fundo já renderizada de cada painel (eixos, faixas, rótulos)
+        self._criar_tensoes()
+        self._criar_potencia("kw", 'Potência Ativa (kW)', 'red', (-30, 120))
+        self._criar_potencia("kvar", 'Potência Reativa (kvar)', 'red', (0, 30))
+        self._criar_potencia("kva", 'Potência Aparente (kVA)', 'black', (0, 150))
+        self._criar_loadshapes()
+
+        # Faixas de carregamento do trafo (mesmas dos REV)
+        ax = self.figuras["kva"][1]
+        ax.axhspan(0, 75, color='lightgreen', alpha=0.3)     # Limite carregamento nominal
+        ax.axhspan(75, 90, color='yellow', alpha=0.3)        # Sobrecarga admissível
+        ax.axhspan(90, 1e4, color='lightcoral', alpha=0.3)   # Limite máximo de sobrecarga
+
+        for painel, (fig, ax, linhas, limites) in self.figuras.items():
+            self._dinamicos[painel] = [ax.title] + linhas
+            for artista in self._dinamicos[painel]:
+                artista.set_animated(True)
+
+    ############################
+    ### Criação das figuras
+    ############################
+    def _figura(self, figsize=(6, 6)):
+        # Margens fixas (sem tight_layout a cada gravação, que redesenha a figura inteira)
+        fig = Figure(figsize=figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        fig.subplots_adjust(left=0.16, right=0.96, bottom=0.11, top=0.93)
+        ax = fig.add_subplot()
+        ax.grid(True, linestyle='--')
+        ax.set_xlabel('Horário (h)', fontsize=15)
+        ax.tick_params(axis='x', labelsize=12)
+        ax.tick_params(axis='y', labelsize=12)
+        return fig, ax
+
+    def _criar_tensoes(self):
+        fig, ax = self._figura()
+        linhas = [ax.step([], [], where='post', label=f'Fase {fase}', color=cor)[0]
+                  for fase, cor in zip("ABC", ('red', 'blue', 'green'))]
+        ax.axhspan(117, 133, color='lightgreen', alpha=0.3)  # Faixa de tensão adequada
+        ax.axhspan(133, 135, color='yellow', alpha=0.3)      # Faixa de tensão precária
+        ax.axhspan(110, 117, color='yellow', alpha=0.3)      # Faixa de tensão precária
+        ax.axhspan(135, 1e4, color='lightcoral', alpha=0.3)  # Faixa de tensão crítica
+        ax.axhspan(0, 110, color='lightcoral', alpha=0.3)    # Faixa de tensão crítica
+        ax.set_ylabel('Tensão (V)', fontsize=15)
+        ax.legend(fontsize=11, loc='upper right')
+        self.figuras["tensoes"] = (fig, ax, linhas, (105, 140))
+
+    def _criar_potencia(self, painel, rotulo, cor, limites):
+        fig, ax = self._figura()
+        linha = ax.step([], [], where='post', color=cor)[0]
+        ax.set_ylabel(rotulo, fontsize=15)
+        self.figuras[painel] = (fig, ax, [linha], limites)
+
+    def _criar_loadshapes(self):
+        fig, ax = self._figura(figsize=(8, 6))
+        ax.set_ylabel('Potência Ativa (pu)', fontsize=15)
+        self.figuras["loadshapes"] = (fig, ax, [], (-1, 1))
+
+    ############################
+    ### Atualização e gravação
+    ############################
+    def atualizar(self, cenario):
+        horas = np.asarray(cenario["horas"])
+        fim = horas[-1] + (horas[1] - horas[0] if len(horas) > 1 else 1)
+        for painel in PAINEIS:
+            fig, ax, linhas, limites = self.figuras[painel]
+            if painel == "tensoes":
+                series = list(cenario.get("tensoes", []))
+            elif painel == "loadshapes":
+                series = self._atualizar_loadshapes(cenario.get("loadshapes") or {})
+                horas_curvas = [np.arange(len(s)) * 24 / len(s) for s in series]
+            else:
+                series = [cenario.get(painel)]
+
+            for k, linha in enumerate(linhas):
+                if k < len(series) and series[k] is not None:
+                    x = horas_curvas[k] if painel == "loadshapes" else horas
+                    linha.set_data(x, series[k])
+                    linha.set_visible(True)
+                else:
+                    linha.set_visible(False)
+
+            _ajustar_limites(ax, limites, *series)
+            fim_eixo = 24 if painel == "loadshapes" else max(24, fim)
+            if ax.get_xlim() != (0, fim_eixo):
+                ax.set_xlim(0, fim_eixo)
+                ax.set_xticks(np.arange(0, fim_eixo + 1, 2))
+            ax.set_title(str(cenario["nome"]), fontsize=13)
+
+    def _atualizar_loadshapes(self, loadshapes):
+        # Uma curva por loadshape (linhas criadas sob demanda e reaproveitadas depois)
+        fig, ax, linhas, limites = self.figuras["loadshapes"]
+        while len(linhas) < len(loadshapes):
+            linha = ax.step([], [], where='post')[0]
+            linha.set_animated(True)
+            linhas.append(linha)
+        nomes = list(loadshapes)
+        if nomes and [l.get_label() for l in linhas[:len(nomes)]] != nomes:
+            for linha, nome in zip(linhas, nomes):
+                linha.set_label(nome)
+            ax.legend(handles=linhas[:len(nomes)], fontsize=10, loc='upper left')
+        self._dinamicos["loadshapes"] = [ax.title] + linhas
+        return [np.asarray(loadshapes[n], dtype=float) for n in nomes]
+
+    def _gravar_png(self, painel, caminho):
+        # Fundo renderizado uma vez por conjunto de limites dos eixos; a cada cenário só as
+        # curvas e o título são desenhados por cima (blit) antes de gravar a imagem
+        fig, ax = self.figuras[painel][:2]
+        legenda = ax.get_legend()
+        chave = (ax.get_xlim(), ax.get_ylim(), tuple(t.get_text() for t in legenda.get_texts()) if legenda else ())
+        canvas = fig.canvas
+        if self._fundos.get(painel, (None,))[0] != chave:
+            canvas.draw()
+            self._fundos[painel] = (chave, canvas.copy_from_bbox(fig.bbox))
+        else:
+            canvas.restore_region(self._fundos[painel][1])
+        for artista in self._dinamicos[painel]:
+            if artista.get_visible():
+                fig.draw_artist(artista)
+        # Compressão rápida do PNG: a codificação zlib padrão custa mais que o próprio desenho
+        imsave(caminho, np.asarray(canvas.buffer_rgba()), format="png", dpi=self.dpi,
+               pil_kwargs={"compress_level": 1})
+
+    def _gravar_vetorial(self, painel, caminho, formato):
+        # Formatos vetoriais (svg, pdf) não usam o fundo em bitmap: figura completa
+        fig = self.figuras[painel][0]
+        for artista in self._dinamicos[painel]:
+            artista.set_animated(False)
+        try:
+            fig.savefig(caminho, format=formato, dpi=self.dpi)
+        finally:
+            for artista in self._dinamicos[painel]:
+                artista.set_animated(True)
+
+    def salvar(self, pasta, prefixo, formatos=("png",)):
+        arquivos = []
+        for painel in PAINEIS:
+            for formato in formatos:
+                arquivo = f"{prefixo}_{painel}.{formato}"
+                caminho = os.path.join(pasta, arquivo)
+                if formato == "png":
+                    self._gravar_png(painel, caminho)
+                else:
+                    self._gravar_vetorial(painel, caminho, formato)
+                arquivos.append((painel, formato, arquivo))
+        return arquivos
+
+############################
+### Execução em lote
+############################
+
+# Figuras de cada processo trabalhador (criadas uma vez no initializer)
+_paineis = None
+_pasta = None
+_formatos = None
+
+
+def _iniciar_trabalhador(pasta, formatos, dpi):
+    global _paineis, _pasta, _formatos
+    _paineis = PaineisCenario(dpi)
+    _pasta = pasta
+    _formatos = formatos
+
+
+def _renderizar(cenario):
+    _paineis.atualizar(cenario)
+    prefixo = _nome_arquivo(cenario["nome"])
+    return [{'cenario': cenario["nome"], 'painel': painel, 'formato': formato, 'arquivo': arquivo}
+            for painel, formato, arquivo in _paineis.salvar(_pasta, prefixo, _formatos)]
+
+
+def _gravar_indice(df, pasta):
+    df.to_csv(os.path.join(pasta, "indice.csv"), index=False)
+
+    # Índice HTML: uma linha por cenário, um link/miniatura por painel
+    linhas = []
+    for cenario, grupo in df.groupby('cenario', sort=False):
+        celulas = []
+        for painel in PAINEIS:
+            arquivos = grupo[grupo['painel'] == painel]
+            if arquivos.empty:
+                celulas.append("<td></td>")
+                continue
+            principal = arquivos.iloc[0]['arquivo']
+            links = " ".join(f'<a href="{html.escape(a)}">{html.escape(f)}</a>'
+                             for a, f in zip(arquivos['arquivo'], arquivos['formato']))
+            celulas.append(f'<td><img src="{html.escape(principal)}" width="240"><br>{links}</td>')
+        linhas.append(f"<tr><th>{html.escape(str(cenario))}</th>{''.join(celulas)}</tr>")
+    cabecalho = "".join(f"<th>{p}</th>" for p in PAINEIS)
+    with open(os.path.join(pasta, "index.html"), "w", encoding="utf-8") as arquivo:
+        arquivo.write("<html><head><meta charset='utf-8'><title>Relatório de cenários</title></head><body>\n"
+                      f"<table border='1'><tr><th>cenário</th>{cabecalho}</tr>\n" + "\n".join(linhas)
+                      + "\n</table></body></html>\n")
+
+
+def renderizar_cenarios(cenarios, pasta_saida, formatos=("png",), n_processos=None, dpi=100):
+    # cenarios: lista de dicionários com 'nome', 'horas', 'tensoes' (3 x tempo), 'kw', 'kvar',
+    # 'kva' e opcionalmente 'loadshapes' (nome -> multiplicadores), ver cenario_da_sessao()
+    os.makedirs(pasta_saida, exist_ok=True)
+    formatos = tuple(formatos)
+    n_processos = n_processos or os.cpu_count()
+
+    if n_processos == 1 or len(cenarios) <= 1:
+        _iniciar_trabalhador(pasta_saida, formatos, dpi)
+        resultados = [_renderizar(c) for c in cenarios]
+    else:
+        lote = max(1, len(cenarios) // (4 * n_processos))
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                                 initargs=(pasta_saida, formatos, dpi)) as executor:
+            resultados = list(executor.map(_renderizar, cenarios, chunksize=lote))
+
+    df = pd.DataFrame([linha for r in resultados for linha in r],
+                      columns=['cenario', 'painel', 'formato', 'arquivo'])
+    _gravar_indice(df, pasta_saida)
+    return df
+
+
+def cenario_da_sessao(sessao, nome, barra, loadshapes=None, trafo=None):
+    # Dados de um cenário já resolvido na sessão, no formato esperado por renderizar_cenarios
+    # (trafo: padrão o da sessão)
+    trafo = trafo or sessao.trafo
+    from Circbt_Monitores import extrair_monitores
+
+    dss = sessao.dss
+    monitor_v = sessao.monitor_barra(barra)
+    dados = extrair_monitores(dss, [monitor_v, f"P_{trafo}"])
+    p = dados.selecionar([f"P_{trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+    q = dados.selecionar([f"P_{trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+    return {
+        'nome': nome,
+        'horas': np.arange(len(p)) * dss.solution.step_size / 3600,
+        'tensoes': dados.selecionar([monitor_v], [1, 3, 5])[0],
+        'kw': p,
+        'kvar': q,
+        'kva': np.sqrt(p**2 + q**2),
+        'loadshapes': loadshapes,
+    }
+
+
+if __name__ == "__main__":
+    import time
+    from Circbt_Sessao import SessaoDSS
+    from Circbt_Loadshapes import carregar_loadshapes
+
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    file_dss = os.path.join(pasta, 'dssfiles/circbtfull_storage.dss')
+    file_dss_loadshapes = os.path.join(pasta, 'dssfiles/loadshapes.dss')
+    pasta_saida = os.path.join(pasta, 'relatorios')
+
+    biblioteca = carregar_loadshapes(file_dss_loadshapes)
+    loadshapes = {nome: np.asarray(biblioteca[nome]) for nome in biblioteca.nomes}
+
+    # Cenários: sem bateria e bateria de 20 kW / 110 kWh em cada poste
+    sessao = SessaoDSS(file_dss)
+    sessao.resolver()
+    cenarios = [cenario_da_sessao(sessao, "sem_bateria", "P7", loadshapes)]
+    for poste in [f"P{i}" for i in range(2, 16)]:
+        sessao.adicionar_bateria(poste, 20, 110)
+        sessao.resolver()
+        cenarios.append(cenario_da_sessao(sessao, f"bateria_{poste}", poste, loadshapes))
+        sessao.desfazer()
+
+    inicio = time.perf_counter()
+    df = renderizar_cenarios(cenarios, pasta_saida, formatos=("png", "svg"))
+    print(f"{len(cenarios)} cenários, {len(df)} arquivos em {time.perf_counter() - inicio:.2f} s -> {pasta_saida}")
@@ -0,0 +1,234 @@
+##########################################################
+##   Armazenamento colunar dos resultados de cenários   ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Substitui os CSVs de uma coluna (kW_total.csv, kvar_total.csv, kVA_total.csv)
+# por uma pasta de resultados em formato colunar binário (.npy). Cada gravação
+# cria uma "parte" (subpasta) de forma atômica, contendo:
+#   parametros.npy   array estruturado, um cenário por linha (poste, kW, kWh, SOC, ...)
+#   colunas.npy      nomes das grandezas gravadas
+#   horas.npy        instante de cada amostra
+#   c0000.npy ...    uma grandeza por arquivo (cenário x tempo)
+# A leitura abre apenas os arquivos das colunas pedidas (mapeados em memória) e
+# copia apenas as linhas dos cenários selecionados. Processos em paralelo gravam
+# partes diferentes, sem bloqueio e sem sobrescrever resultados anteriores.
+
+import os
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+PREFIXO_PARTE = "parte-"
+
+
+def _dtype_parametro(valores):
+    presentes = [v for v in valores if v is not None]
+    if presentes and all(isinstance(v, (bool, np.bool_)) for v in presentes):
+        tipo = "?"
+    elif presentes and all(isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_))
+                           for v in presentes):
+        tipo = "i8"
+    elif presentes and all(isinstance(v, (int, float, np.integer, np.floating)) for v in presentes):
+        tipo = "f8"
+    else:
+        return f"U{max([1] + [len(str(v)) for v in presentes])}"
+    # Parâmetro ausente em algum cenário: numérico com NaN
+    return "f8" if len(presentes) < len(valores) else tipo
+
+
+def tabela_parametros(parametros):
+    # Lista de dicionários (um por cenário) -> array estruturado
+    nomes = list(dict.fromkeys(k for p in parametros for k in p))
+    dtype = [(n, _dtype_parametro([p.get(n) for p in parametros])) for n in nomes]
+    tabela = np.zeros(len(parametros), dtype=dtype)
+    for nome, tipo in dtype:
+        vazio = "" if tipo.startswith("U") else np.nan
+        tabela[nome] = [vazio if p.get(nome) is None else p[nome] for p in parametros]
+    return tabela
+
+
+def gravar_parte(pasta, parametros, colunas, horas=None):
+    # parametros: lista de dicionários (um por cenário)
+    # colunas: nome da grandeza -> array (cenário x tempo)
+    nomes = list(colunas)
+    valores = []
+    for nome in nomes:
+        v = np.asarray(colunas[nome])
+        if v.shape[0] != len(parametros):
+            raise ValueError(f"Coluna {nome}: {v.shape[0]} linhas para {len(parametros)} cenários")
+        valores.append(v.reshape(len(parametros), -1))
+
+    # A parte é montada em uma pasta temporária e renomeada no final (os leitores só
+    # enxergam partes completas). O nome inclui o processo para gravações em paralelo.
+    os.makedirs(pasta, exist_ok=True)
+    nome_parte = f"{PREFIXO_PARTE}{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    temporaria = os.path.join(pasta, f".{nome_parte}.tmp")
+    os.makedirs(temporaria)
+
+    np.save(os.path.join(temporaria, "parametros.npy"), tabela_parametros(parametros))
+    np.save(os.path.join(temporaria, "colunas.npy"), np.array(nomes, dtype=str))
+    for k, v in enumerate(valores):
+        np.save(os.path.join(temporaria, f"c{k:04d}.npy"), v)
+    if horas is not None:
+        np.save(os.path.join(temporaria, "horas.npy"), np.asarray(horas, dtype=float))
+
+    os.rename(temporaria, os.path.join(pasta, nome_parte))
+    return nome_parte
+
+
+def gravar_cenario(pasta, parametros, colunas, horas=None):
+    # Atalho para um único cenário (colunas: nome -> série no tempo)
+    return gravar_parte(pasta, [parametros], {n: np.asarray(v)[np.newaxis] for n, v in colunas.items()}, horas)
+
+
+def colunas_cenario(dados, trafo):
+    # Todas as grandezas monitoradas de um cenário (DadosMonitores), uma coluna por
+    # 'monitor.canal', e os totais do trafo (ex. sessao.trafo) usados nos gráficos (kW_total, kvar_total, kVA_total)
+    colunas = {}
+    for i, monitor in enumerate(dados.monitores):
+        for k, canal in enumerate(dados.canais[i]):
+            colunas[f"{monitor}.{canal}"] = dados.dados[i, k]
+
+    ptotal = dados.selecionar([f"P_{trafo}"], [1, 3, 5])[0].sum(axis=0, dtype=float)
+    qtotal = dados.selecionar([f"P_{trafo}"], [2, 4, 6])[0].sum(axis=0, dtype=float)
+    colunas["kW_total"] = ptotal
+    colunas["kvar_total"] = qtotal
+    colunas["kVA_total"] = np.sqrt(ptotal**2 + qtotal**2)
+    return colunas
+
+
+class EscritorResultados:
+    """Acumula cenários em memória e grava uma parte a cada 'por_parte' cenários."""
+
+    def __init__(self, pasta, por_parte=64):
+        self.pasta = pasta
+        self.por_parte = por_parte
+        self.partes = []
+        self._parametros = []
+        self._colunas = []
+        self._horas = None
+
+    def adicionar(self, parametros, colunas, horas=None):
+        # Cenários com outras colunas ou outro nº de amostras vão para uma nova parte
+        if self._colunas:
+            anterior = self._colunas[0]
+            if list(anterior) != list(colunas) or any(np.shape(anterior[n]) != np.shape(colunas[n]) for n in colunas):
+                self.gravar()
+        self._parametros.append(parametros)
+        self._colunas.append(colunas)
+        self._horas = horas if horas is not None else self._horas
+        if len(self._parametros) >= self.por_parte:
+            self.gravar()
+
+    def gravar(self):
+        if not self._parametros:
+            return None
+        colunas = {n: np.stack([c[n] for c in self._colunas]) for n in self._colunas[0]}
+        parte = gravar_parte(self.pasta, self._parametros, colunas, self._horas)
+        self.partes.append(parte)
+        self._parametros, self._colunas, self._horas = [], [], None
+        return parte
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.gravar()
+
+
+class ArmazemResultados:
+    """Leitura seletiva (colunas x cenários) de uma pasta de resultados."""
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self._cache_parametros = {}
+        self._cache_colunas = {}
+
+    def partes(self):
+        if not os.path.isdir(self.pasta):
+            return []
+        return sorted(n for n in os.listdir(self.pasta)
+                      if n.startswith(PREFIXO_PARTE) and os.path.isdir(os.path.join(self.pasta, n)))
+
+    def _indices_colunas(self, parte):
+        if parte not in self._cache_colunas:
+            nomes = np.load(os.path.join(self.pasta, parte, "colunas.npy"))
+            self._cache_colunas[parte] = {str(n).lower(): k for k, n in enumerate(nomes)}
+        return self._cache_colunas[parte]
+
+    def parametros(self):
+        # Parâmetros de todos os cenários (com a parte e a linha de origem de cada um)
+        tabelas = []
+        for parte in self.partes():
+            if parte not in self._cache_parametros:
+                df = pd.DataFrame(np.load(os.path.join(self.pasta, parte, "parametros.npy")))
+                df['parte'] = parte
+                df['linha'] = np.arange(len(df))
+                self._cache_parametros[parte] = df
+            tabelas.append(self._cache_parametros[parte])
+        if not tabelas:
+            return pd.DataFrame(columns=['parte', 'linha'])
+        return pd.concat(tabelas, ignore_index=True)
+
+    def colunas(self):
+        nomes = {}
+        for parte in self.partes():
+            for n in np.load(os.path.join(self.pasta, parte, "colunas.npy")):
+                nomes.setdefault(str(n).lower(), str(n))
+        return list(nomes.values())
+
+    def horas(self, parte=None):
+        parte = parte or self.partes()[0]
+        arquivo = os.path.join(self.pasta, parte, "horas.npy")
+        return np.load(arquivo) if os.path.exists(arquivo) else None
+
+    def selecionar(self, filtro=None):
+        # filtro: dicionário {parâmetro: valor ou lista de valores} ou função (DataFrame -> máscara)
+        df = self.parametros()
+        if filtro is None or df.empty:
+            return df
+        if callable(filtro):
+            return df[filtro(df)].reset_index(drop=True)
+        mascara = np.ones(len(df), dtype=bool)
+        for nome, valor in filtro.items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            mascara &= df[nome].isin(valores).to_numpy()
+        return df[mascara].reset_index(drop=True)
+
+    def ler(self, colunas, filtro=None):
+        # Retorna (parâmetros dos cenários selecionados, {coluna: array cenário x tempo}).
+        # Só os arquivos das colunas pedidas são abertos, e só as linhas selecionadas são copiadas.
+        # Os nomes das colunas não diferenciam maiúsculas (o OpenDSS devolve os monitores em minúsculas).
+        selecionados = self.selecionar(filtro)
+        blocos = {c: [] for c in colunas}
+        for parte, grupo in selecionados.groupby('parte', sort=False):
+            linhas = grupo['linha'].to_numpy()
+            indices = self._indices_colunas(parte)
+            for c in colunas:
+                if c.lower() in indices:
+                    arquivo = os.path.join(self.pasta, parte, f"c{indices[c.lower()]:04d}.npy")
+                    blocos[c].append(np.asarray(np.load(arquivo, mmap_mode="r")[linhas]))
+                else:
+                    blocos[c].append(None)
+
+        valores = {}
+        for c, partes in blocos.items():
+            presentes = [b for b in partes if b is not None]
+            if not presentes:
+                if selecionados.empty:
+                    valores[c] = np.full((0, 0), np.nan)
+                    continue
+                raise KeyError(f"Coluna {c} não encontrada em {self.pasta}")
+            # Partes sem a coluna (ou com menos amostras) são completadas com NaN
+            n_tempo = max(b.shape[1] for b in presentes)
+            tipo = np.result_type(*presentes, np.float32)
+            saida = []
+            for b, (_, grupo) in zip(partes, selecionados.groupby('parte', sort=False)):
+                bloco = np.full((len(grupo), n_tempo), np.nan, dtype=tipo)
+                if b is not None:
+                    bloco[:, :b.shape[1]] = b
+                saida.append(bloco)
+            valores[c] = np.concatenate(saida)
+        return selecionados, valores
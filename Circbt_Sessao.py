@@ -0,0 +1,263 @@
+##########################################################
+##   Sessão de simulação do circuito secundário (BT)    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Compila o circuito uma única vez, instrumenta os monitores e permite
+# aplicar/desfazer alterações de cenário (baterias, edições de elementos)
+# e resolver novamente o fluxo diário sem recompilar o arquivo .dss.
+
+import os
+import py_dss_interface
+from Circbt_Perfil import cronometrar, envolver_dss
+from Circbt_Topologia import TopologiaCircuito
+
+# Ligações das baterias: nós da barra, nº de fases e tensão nominal (kV)
+LIGACOES_BATERIA = {
+    "A": ("1.4", 1, 0.127),
+    "B": ("2.4", 1, 0.127),
+    "C": ("3.4", 1, 0.127),
+    "ABC": ("1.2.3.4", 3, 0.22),
+}
+
+
+def _normalizar(valor):
+    # 20, 20.0 e "20" representam o mesmo valor de propriedade
+    try:
+        return repr(float(valor))
+    except (TypeError, ValueError):
+        return str(valor).strip().lower()
+
+
+class SessaoDSS:
+    """Circuito compilado uma vez e reutilizado em vários cenários."""
+
+    def __init__(self, file_dss, modo="daily", stepsize="10m", number=144, dss=None, trafo=None):
+        # O caminho é resolvido antes de criar o DSS (o py_dss_interface altera o diretório corrente)
+        self.file_dss = os.path.abspath(file_dss)
+        self.modo = modo
+        self.stepsize = stepsize
+        self.number = number
+        self._trafo = trafo      # trafo MT/BT (None -> primeiro trafo do circuito)
+
+        if dss is None:
+            dss = py_dss_interface.DSS()
+            dss.dssinterface.allow_forms = False   ## Ativa/Desativa as telas e plots do DSS
+        self.dss = envolver_dss(dss)   # chamadas registradas quando Circbt_Perfil está ativo
+
+        self._deltas = []        # pilha de alterações aplicadas sobre o caso base
+        self._criados = set()    # elementos criados pela sessão (reaproveitados via Edit)
+        self._soc_inicial = {}   # %stored a ser restaurado antes de cada solve
+        self._adicionados = {}   # propriedades dos elementos criados/reativados pela sessão
+
+        self.compilar()
+
+    ############################
+    ### Compilação do caso base
+    ############################
+    def compilar(self):
+        self.carregar_circuito()
+        self.instrumentar()
+
+        # Snapshot do estado base: SOC inicial das baterias já existentes no arquivo
+        dss = self.dss
+        self._soc_inicial = {}
+        if dss.storages.count > 0:
+            for nome in dss.storages.names:
+                self._soc_inicial[f"storage.{nome}"] = self.consultar(f"Storage.{nome}", "%stored")
+
+    @cronometrar("compile")
+    def carregar_circuito(self):
+        # Compile do arquivo e ajustes da solução (sem monitores)
+        dss = self.dss
+        resultado = dss.text(f"Compile [{self.file_dss}]").strip()
+        if resultado:
+            # O Compile só devolve texto em caso de erro (Redirect inexistente, propriedade inválida, ...)
+            raise ValueError(f"{self.file_dss}: erro do OpenDSS na compilação: {resultado}")
+        dss.text(f"Set mode={self.modo}")
+        dss.text(f"Set stepsize={self.stepsize}")
+        dss.text(f"Set number={self.number}")
+
+        self._deltas = []
+        self._criados = set()
+        self._adicionados = {}
+        self.monitores_baterias = {}   # elemento Storage -> monitor de estado (kWh, kWOut, kWIn)
+
+        # Explorando os atributos do circuito
+        self.lines = dss.lines.names
+        self.transformers = dss.transformers.names
+        self.loads = dss.loads.names
+        self.generators = dss.generators.names
+        if dss.transformers.count == 0:
+            raise ValueError(f"{self.file_dss}: circuito sem transformador")
+        self.trafo = self._trafo or self.transformers[0]
+
+        # Índice da topologia (pais, profundidade, barras e cargas a jusante), refeito a cada compilação
+        self.topologia = TopologiaCircuito(dss, self.trafo)
+
+    @cronometrar("monitores")
+    def instrumentar(self):
+        dss = self.dss
+
+        # Adicionando um EnergyMeter no início do circuito (primário do trafo)
+        dss.text(f"New EnergyMeter.ETRAFO element= Transformer.{self.trafo} terminal=1")
+
+        # Adicionando medidores de potência e tensão no transformador
+        for i in self.transformers:
+            dss.text(f"New Monitor.P_{i} element =Transformer.{i} terminal=1 mode=1 ppolar=no")   # mode = 1 -> medição de potências || ppolar=no -> forma retangular (P+jQ)
+            dss.text(f"New Monitor.V_{i} element =Transformer.{i} terminal=2 mode=0 ppolar=yes")  # mode = 0 -> medição de tensões || ppolar=yes -> forma polar (mod/ang)
+
+        # Adicionando medidores de tensão nas barras (usando o terminal 2 das linhas)
+        dss.text(f"New Monitor.V_P0_P1 element =Transformer.{self.trafo} terminal=2 mode=0")
+        for i in self.lines:
+            dss.text(f"New Monitor.V_{i} element =Line.{i} terminal=2 mode=0")  # mode = 0 -> medição de tensões (V1..V4) e correntes (I1..I4, I4 = neutro)
+
+        self._mapear_barras()
+
+    def _mapear_barras(self):
+        # Associação barra -> monitor de tensão (secundário do trafo e barra 2 de cada linha)
+        # e capacidade de corrente (normamps) de cada linha, na ordem de self.lines
+        dss = self.dss
+        self.monitores_barras = {}
+        self.normamps_linhas = []
+        dss.circuit.set_active_element(f"Transformer.{self.trafo}")
+        self.monitores_barras[dss.cktelement.bus_names[1].split(".")[0]] = "V_P0_P1"
+        for i in self.lines:
+            dss.lines.name = i
+            self.monitores_barras[dss.lines.bus2.split(".")[0]] = f"V_{i}"
+            self.normamps_linhas.append(dss.lines.norm_amps)
+
+    def monitor_barra(self, barra):
+        return self.monitores_barras[barra.lower()]
+
+    ############################
+    ### Alterações de cenário
+    ############################
+    def consultar(self, elemento, propriedade):
+        return self.dss.text(f"? {elemento}.{propriedade}").strip()
+
+    def editar(self, elemento, propriedades):
+        # Guarda os valores anteriores para permitir desfazer a alteração
+        anteriores = {prop: self.consultar(elemento, prop) for prop in propriedades}
+        if "%stored" in anteriores and elemento.lower() in self._soc_inicial:
+            # O %stored consultado reflete o fim do último solve, não o SOC inicial do cenário
+            anteriores["%stored"] = self._soc_inicial[elemento.lower()]
+        self._deltas.append(("editar", elemento, anteriores))
+        self._aplicar_edicao(elemento, propriedades)
+
+    def adicionar_bateria(self, poste, kwrated, kwhrated, socbat=0, curva="CurvaBAT", nome=None, fases="ABC",
+                          monitorar=False):
+        # fases: "ABC" (trifásica) ou "A"/"B"/"C" (monofásica) || monitorar: cria o monitor de estado
+        nome = nome or f"Bateria{poste}"
+        elemento = f"Storage.{nome}"
+        nos, n_fases, kv = LIGACOES_BATERIA[fases]
+        propriedades = {
+            "phases": n_fases,   # antes de bus1: o Edit de uma unidade reaproveitada muda o nº de fases
+            "bus1": f"{poste}.{nos}",
+            "kv": kv,
+            "conn": "wye",
+            "kwrated": kwrated,
+            "kwhrated": kwhrated,
+            "%stored": socbat,
+            "dispmode": "follow",
+            "daily": curva,
+        }
+
+        # Bateria já criada anteriormente na sessão: reaproveita o elemento via Edit
+        if elemento.lower() in self._criados:
+            self._aplicar_edicao(elemento, {**propriedades, "enabled": "yes"})
+        else:
+            self._aplicar_comando("New", elemento, propriedades)
+            self._criados.add(elemento.lower())
+        if monitorar and elemento.lower() not in self.monitores_baterias:
+            monitor = f"Monitor.E_{nome}"
+            if monitor.lower() in self._criados:
+                self.dss.text(f"Edit {monitor} enabled=yes")
+            else:
+                # mode = 3 -> variáveis de estado do Storage (energia armazenada e potências de saída/entrada)
+                self.dss.text(f"New {monitor} element={elemento} terminal=1 mode=3")
+                self._criados.add(monitor.lower())
+            self.monitores_baterias[elemento.lower()] = f"E_{nome}"
+
+        self._deltas.append(("adicionar", elemento, self._soc_inicial.get(elemento.lower())))
+        self._adicionados[elemento.lower()] = propriedades
+        self._soc_inicial[elemento.lower()] = socbat
+        return elemento
+
+    def adicionar_frota(self, frota, prefixo="Frota"):
+        # Várias baterias de uma vez, com monitor de estado em cada uma. frota: lista de unidades
+        # {"barra", "kwrated", "kwhrated", "socbat", "fases", "curva"} (as três últimas opcionais).
+        # A k-ésima unidade é sempre o elemento Storage.{prefixo}{k}, reaproveitado entre frotas;
+        # desfazer(len(frota)) remove a frota toda.
+        return [self.adicionar_bateria(unidade["barra"], unidade["kwrated"], unidade["kwhrated"],
+                                       unidade.get("socbat", 0), unidade.get("curva", "CurvaBAT"),
+                                       nome=f"{prefixo}{k}", fases=unidade.get("fases", "ABC"), monitorar=True)
+                for k, unidade in enumerate(frota, start=1)]
+
+    def desfazer(self, n=None):
+        # Desfaz as n últimas alterações (todas, se n=None), voltando ao caso base
+        n = len(self._deltas) if n is None else n
+        for _ in range(n):
+            acao, elemento, valor = self._deltas.pop()
+            if acao == "editar":
+                self._aplicar_edicao(elemento, valor)
+            else:
+                self._aplicar_edicao(elemento, {"enabled": "no"})
+                monitor = self.monitores_baterias.pop(elemento.lower(), None)
+                if monitor is not None:
+                    # O OpenDSS não remove monitores: desabilitado, fica fora da extração e da chave do cache
+                    self.dss.text(f"Edit Monitor.{monitor} enabled=no")
+                if valor is None:
+                    self._soc_inicial.pop(elemento.lower(), None)
+                else:
+                    self._soc_inicial[elemento.lower()] = valor
+
+    def estado_cenario(self):
+        # Descrição canônica das alterações aplicadas sobre o caso base (valores atuais, e não os
+        # anteriores guardados para desfazer). O %stored vem do SOC inicial, e não da consulta ao DSS.
+        alteracoes = []
+        for acao, elemento, valor in self._deltas:
+            if acao == "editar":
+                propriedades = {prop: self.consultar(elemento, prop) for prop in valor}
+            else:
+                propriedades = self._adicionados[elemento.lower()]
+            alteracoes.append((acao, elemento.lower(), sorted((prop.lower(), _normalizar(v))
+                                                              for prop, v in propriedades.items()
+                                                              if prop.lower() != "%stored")))
+        soc = sorted((elemento, _normalizar(v)) for elemento, v in self._soc_inicial.items())
+        return alteracoes, soc
+
+    def _aplicar_edicao(self, elemento, propriedades):
+        self._aplicar_comando("Edit", elemento, propriedades)
+        if "%stored" in propriedades and elemento.lower().startswith("storage."):
+            self._soc_inicial[elemento.lower()] = propriedades["%stored"]
+
+    def _aplicar_comando(self, comando, elemento, propriedades):
+        args = " ".join(f"{prop}={valor}" for prop, valor in propriedades.items())
+        self.dss.text(f"{comando} {elemento} {args}")
+
+    ############################
+    ### Execução do fluxo diário
+    ############################
+    def resetar_monitores(self):
+        self.dss.monitors.reset_all()
+        self.dss.meters.reset_all()
+
+    def preparar(self):
+        dss = self.dss
+        self.resetar_monitores()
+
+        # Restaurando o SOC inicial das baterias (o solve anterior altera o %stored)
+        for elemento, soc in self._soc_inicial.items():
+            dss.text(f"Edit {elemento} %stored={soc}")
+
+        # Voltando ao início do período de simulação
+        dss.solution.hour = 0
+        dss.solution.seconds = 0
+        dss.solution.number = self.number
+
+    @cronometrar("solve")
+    def resolver(self):
+        self.preparar()
+        self.dss.solution.solve()
+        return self.dss.solution.converged
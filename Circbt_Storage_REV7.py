@@ -0,0 +1,376 @@
+##########################################################
+##   Modelagem de circuito secundário de distribuição   ##
+##   Data: 18/10/2026   REV 7.0                         ##
+##   by Prof. José Rubens Macedo Junior (LADEE/UFU)     ##
+##########################################################
+
+import os
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Indicadores import calcular_indicadores
+from Circbt_Loadshapes import carregar_loadshapes
+from Circbt_Graficos import plotar_mapa_tensoes
+from Circbt_Resultados import gravar_cenario, colunas_cenario
+from Circbt_Cache import CacheSimulacoes, resolver_com_cache, pasta_cache_padrao
+from Circbt_Frota import tabela_unidades
+
+############################
+### Simulação no OpenDSS ###
+############################
+
+### Chamando o dss file ###
+file_dss = os.path.join(os.path.dirname(__file__), 'dssfiles/circbtfull_storage.dss') ## Chama o dss principal usando a os
+file_dss_loadshapes = os.path.join(os.path.dirname(__file__), 'dssfiles/loadshapes.dss') ## Chama o dss principal usando a os
+
+########################################################################
+# Adicionando baterias ao circuito
+########################################################################
+
+bateria = "n"    # definição de inclusão ou não das baterias em um determinado poste (s=sim n=não)
+socbat = 0       # definição do SOC inicial das baterias (0 a 100%)
+
+# Frota de baterias: uma unidade por item (barra, kW, kWh, SOC inicial, ligação "ABC" ou "A"/"B"/"C" e curva)
+frota = [
+    {"barra": "P7", "kwrated": 20, "kwhrated": 110, "socbat": socbat, "fases": "ABC", "curva": "CurvaBAT"},
+]
+
+# Primeira unidade: poste cujas tensões são plotadas
+poste_bat1 = frota[0]["barra"]
+kwrated_bat1 = frota[0]["kwrated"]
+kwhrated_bat1 = frota[0]["kwhrated"]
+
+#################################################################
+#  DataFrame com os valores dos Loadshapes (cache binário em dssfiles/__cache__)
+#################################################################
+loadshapes_biblioteca = carregar_loadshapes(file_dss_loadshapes)
+
+# Criação do DataFrame
+df = loadshapes_biblioteca.dataframe()
+
+# Criando o novo loadshape CurvaGD = CurvaGD_CARGA - CurvaGD_GEN
+curva_gd_carga = df['CurvaGD_CARGA']
+curva_gd_gen = df['CurvaGD_GEN']
+curva_gd = curva_gd_carga + (-curva_gd_gen)
+
+# Adicionando o novo loadshape ao DataFrame
+df['CurvaGD'] = curva_gd
+
+# Extraindo os valores de CurvaCARGA em um novo vetor
+values1 = df['CurvaCARGA'].tolist()
+values2 = df['CurvaGD'].tolist()
+values3 = df['CurvaIP'].tolist()
+values4 = df['CurvaBAT'].tolist()
+values5 = df['CurvaVE_Fast_1'].tolist()
+values6 = df['CurvaVE_Fast_2'].tolist()
+values7 = df['CurvaVE_Slow'].tolist()
+
+############################
+### Executando o DSS #######
+############################
+
+# Instrumentação das etapas (opcional): CIRCBT_PERFIL=1 ou CIRCBT_PERFIL_RASTRO=arquivo
+perfil.ativar_pelo_ambiente()
+
+# Compila o circuito e cria os monitores uma única vez (EnergyMeter, P_/V_ do trafo e V_ das linhas)
+sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+dss = sessao.dss
+lines = sessao.lines
+
+# Inserindo a frota de baterias no circuito (todas as unidades de uma vez, com monitores de estado)
+elementos_frota = sessao.adicionar_frota(frota) if bateria == "s" else []
+
+# Dando Solve no circuito e extraindo todos os monitores de uma vez (array monitor x canal x tempo).
+# Cenário idêntico a um já simulado (mesmo circuito, loadshapes, ajustes e bateria) vem do cache
+# em dssfiles/__cache__/simulacoes, sem novo solve
+cache_simulacoes = CacheSimulacoes(pasta_cache_padrao(file_dss))
+dados_monitores, _ = resolver_com_cache(sessao, cache_simulacoes)
+
+##### Extraindo dados do monitor do poste escolhido para conexão da bateria (monitor da linha que alimenta a barra)
+monitor_v = dados_monitores[sessao.monitor_barra(poste_bat1)]
+monitor_v_a = monitor_v[0]  # Supondo Va = canal1
+monitor_v_b = monitor_v[2]  # Supondo Vb = canal3
+monitor_v_c = monitor_v[4]  # Supondo Vc = canal5
+time_minutes = np.arange(0, len(monitor_v_a) * 10, 10)  # Criando um array de tempo
+time_hours = time_minutes / 60  # Convertendo o tempo de minutos para horas
+
+# Extraindo dados do monitor TRAFO
+monitor_p = dados_monitores[f"P_{sessao.trafo}"]
+monitor_p_a = monitor_p[0]  # Supondo Pa = canal1
+monitor_p_b = monitor_p[2]  # Supondo Pb = canal3
+monitor_p_c = monitor_p[4]  # Supondo Pc = canal5
+monitor_q_a = monitor_p[1]  # Supondo Qa = canal2
+monitor_q_b = monitor_p[3]  # Supondo Qb = canal4
+monitor_q_c = monitor_p[5]  # Supondo Qc = canal6
+
+# Calculando a potência ativa, reativa e aparente total
+monitor_ptotal = (monitor_p_a + monitor_p_b + monitor_p_c)
+monitor_qtotal = (monitor_q_a + monitor_q_b + monitor_q_c)
+monitor_stotal = np.sqrt(monitor_ptotal**2 + monitor_qtotal**2)
+
+## Calculando DRP e DRC (fases A, B e C de uma só vez)
+indicadores = calcular_indicadores([monitor_v_a, monitor_v_b, monitor_v_c])
+DRP_A, DRP_B, DRP_C = indicadores["DRP"]
+DRC_A, DRC_B, DRC_C = indicadores["DRC"]
+
+# Percentil 99% e 1%
+percentil_1_a, percentil_1_b, percentil_1_c = indicadores["P1"]
+percentil_99_a, percentil_99_b, percentil_99_c = indicadores["P99"]
+
+print('************ Indicadores de tensão em regime permanente **************')
+print('                Fase A        Fase B       Fase C')
+print(f'DRP             {DRP_A:0.2f}%         {DRP_B:0.2f}%        {DRP_C:0.2f}%')
+print(f'DRC             {DRC_A:0.2f}%         {DRC_B:0.2f}%        {DRC_C:0.2f}%')
+print(f'P99%            {percentil_99_a:0.2f}        {percentil_99_b:0.2f}       {percentil_99_c:0.2f}')
+print(f'P1%             {percentil_1_a:0.2f}        {percentil_1_b:0.2f}       {percentil_1_c:0.2f}')
+print('**********************************************************************')
+
+# SOC e energia de cada unidade da frota
+if elementos_frota:
+    df_frota = tabela_unidades(sessao, dados_monitores, frota, elementos_frota, sessao.dss.solution.step_size / 3600)
+    print(df_frota.round(2).to_string(index=False))
+
+# Indicadores de todas as barras monitoradas (barras x fases)
+monitores_barras = ["V_P0_P1"] + [f"V_{line}" for line in lines]
+indicadores_barras = calcular_indicadores(dados_monitores.selecionar(monitores_barras, [1, 3, 5]))
+df_indicadores = pd.DataFrame({'monitor': monitores_barras})
+for indice in ("DRP", "DRC", "P1", "P99"):
+    for k, fase in enumerate("ABC"):
+        df_indicadores[f'{indice}_{fase}'] = indicadores_barras[indice][:, k]
+print(df_indicadores.round(2).to_string(index=False))
+
+# Convertendo dados para DataFrames
+df1 = pd.DataFrame({
+    'tempo': time_hours,
+    'Tensao_Va': monitor_v_a,
+    'Tensao_Vb': monitor_v_b,
+    'Tensao_Vc': monitor_v_c
+})
+df2 = pd.DataFrame({
+    'tempo': time_hours,
+    'kW_total': monitor_ptotal,
+})
+df3 = pd.DataFrame({
+    'tempo': time_hours,
+    'kvar_total': monitor_qtotal,
+})
+df4 = pd.DataFrame({
+    'tempo': time_hours,
+    'kVA_total': monitor_stotal,
+})
+
+######## PLOTAGEM DE GRÁFICOS ########################################################################
+
+# Plotando resultados de tensão
+plt.figure(figsize=(6, 6))
+plt.step(df1['tempo'], df1['Tensao_Va'], label='Fase A', color='red')
+plt.step(df1['tempo'], df1['Tensao_Vb'], label='Fase B', color='blue')
+plt.step(df1['tempo'], df1['Tensao_Vc'], label='Fase C', color='green')
+plt.axhspan(117, 133, color='lightgreen', alpha=0.3)  # Faixa de tensão adequada
+plt.axhspan(133, 135, color='yellow', alpha=0.3)  # Faixa de tensão precária
+plt.axhspan(110, 117, color='yellow', alpha=0.3)  # Faixa de tensão precária
+plt.axhspan(135, 150, color='lightcoral', alpha=0.3)  # Faixa de tensão precária
+plt.axhspan(0, 110, color='lightcoral', alpha=0.3)  # Faixa de tensão precária
+plt.xlabel('Horário (h)', fontsize=15)
+plt.ylabel('Tensão (V)', fontsize=15)
+#plt.title('(b)', fontsize=20)
+plt.legend(fontsize=11, loc='upper right')
+plt.tick_params(axis='x', labelsize=12)
+plt.tick_params(axis='y', labelsize=12)
+plt.grid(True, linestyle='--')
+plt.ylim(105, 140)
+plt.xlim(0, 24)
+plt.xticks(np.arange(0, 25, 2))
+plt.show()
+
+# Plotando resultados de potência ativa no trafo
+plt.figure(figsize=(6, 6))
+plt.step(df2['tempo'], df2['kW_total'], color='red')
+plt.xlabel('Horário (h)', fontsize=15)
+plt.ylabel('Potência Ativa (kW)', fontsize=15)
+plt.tick_params(axis='x', labelsize=12)
+plt.tick_params(axis='y', labelsize=12)
+plt.grid(True, linestyle='--')
+plt.ylim(-30, 120)
+plt.xlim(0, 24)
+plt.xticks(np.arange(0, 25, 2))
+plt.show()
+
+# Plotando resultados de potência reativa no trafo
+plt.figure(figsize=(6, 6))
+plt.step(df3['tempo'], df3['kvar_total'], color='red')
+plt.xlabel('Horário (h)', fontsize=15)
+plt.ylabel('Potência Reativa (kvar)', fontsize=15)
+plt.tick_params(axis='x', labelsize=12)
+plt.tick_params(axis='y', labelsize=12)
+plt.grid(True, linestyle='--')
+plt.ylim(0, 30)
+plt.xlim(0, 24)
+plt.xticks(np.arange(0, 25, 2))
+plt.show()
+
+# Plotando resultados de potência aparente no trafo
+plt.figure(figsize=(6, 6))
+plt.step(df4['tempo'], df4['kVA_total'], color='black')
+plt.xlabel('Horário (h)', fontsize=15)
+plt.ylabel('Potência Aparente (kVA)', fontsize=15)
+plt.tick_params(axis='x', labelsize=12)
+plt.tick_params(axis='y', labelsize=12)
+plt.grid(True, linestyle='--')
+plt.axhspan(0, 75, color='lightgreen', alpha=0.3)  # Limite carregamento nominal
+plt.axhspan(75, 90, color='yellow', alpha=0.3)    # Sobrecarga admissível
+plt.axhspan(90, 200, color='lightcoral', alpha=0.3)  # Limite máximo de sobrecarga
+plt.ylim(0, 150)
+plt.xlim(0, 24)
+plt.xticks(np.arange(0, 25, 2))
+plt.show()
+
+#### Gravando o cenário no armazém de resultados (pasta resultados/, formato colunar binário)
+# Todas as grandezas monitoradas + kW_total, kvar_total e kVA_total, identificadas pelos parâmetros
+# do cenário. Cada execução acrescenta uma parte nova (nada é sobrescrito). Leitura: PlotaPowers.py
+pasta_resultados = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+parametros_cenario = {
+    'poste': poste_bat1,
+    'kwrated': kwrated_bat1,
+    'kwhrated': kwhrated_bat1,
+    'socbat': socbat,
+    'com_bateria': bateria == "s",
+}
+gravar_cenario(pasta_resultados, parametros_cenario, colunas_cenario(dados_monitores, sessao.trafo), time_hours)
+
+
+######## PLOTAGEM DOS LOADSHAPES ########################################################################
+
+# Criar um array para o eixo x representando o tempo em horas
+time_hours = [i * 10 / 60 for i in range(144)]  # 144 valores, cada um representando 10 minutos
+
+# Criar a figura e os subplots
+fig, axs = plt.subplots(2, 2, figsize=(10, 8))
+
+# Definir os ticks do eixo x
+xticks = range(0, 25, 2)
+
+# Tamanho da fonte
+font_size = 16
+tick_size = 14
+
+# Plotar o primeiro gráfico
+axs[0, 0].step(time_hours, values1, where='post', color='blue')  # Usar gráfico de degrau
+axs[0, 0].set_title('(a) Carga sem GD', fontsize=font_size)
+axs[0, 0].set_xlabel('Horário (h)', fontsize=font_size)
+axs[0, 0].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[0, 0].grid(True, linestyle='--')
+axs[0, 0].set_xticks(xticks)
+axs[0, 0].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Plotar o segundo gráfico
+axs[0, 1].step(time_hours, values2, where='post', color='red')  # Usar gráfico de degrau
+axs[0, 1].set_title('(b) Carga com GD', fontsize=font_size)
+axs[0, 1].set_xlabel('Horário (h)', fontsize=font_size)
+axs[0, 1].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[0, 1].grid(True, linestyle='--')
+axs[0, 1].set_xticks(xticks)
+axs[0, 1].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Plotar o terceiro gráfico
+axs[1, 0].step(time_hours, values3, where='post', color='green')  # Usar gráfico de degrau
+axs[1, 0].set_title('(c) Carga de iluminação pública', fontsize=font_size)
+axs[1, 0].set_xlabel('Horário (h)', fontsize=font_size)
+axs[1, 0].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[1, 0].grid(True, linestyle='--')
+axs[1, 0].set_xticks(xticks)
+axs[1, 0].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Plotar o quarto gráfico
+axs[1, 1].step(time_hours, values4, where='post', color='purple')  # Usar gráfico de degrau
+axs[1, 1].set_title('(d) Carga e descarga das baterias', fontsize=font_size)
+axs[1, 1].set_xlabel('Horário (h)', fontsize=font_size)
+axs[1, 1].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[1, 1].grid(True, linestyle='--')
+axs[1, 1].set_xticks(xticks)
+axs[1, 1].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Ajustar o layout
+plt.tight_layout()
+plt.show()
+
+
+##### Plotagem dos LOADSHAPES dos carregamento de veículos elétricos ############################
+
+# Criar a figura e os subplots
+fig, axs = plt.subplots(3, 1, figsize=(5, 10))
+
+# Definir os ticks do eixo x
+xticks = range(0, 25, 2)
+
+# Tamanho da fonte
+font_size = 14
+tick_size = 12
+
+# Plotar o primeiro gráfico
+axs[0].step(time_hours, values5, where='post', color='blue')  # Usar gráfico de degrau
+axs[0].set_title('(a) Recarga rápida tipo 1', fontsize=font_size)
+axs[0].set_xlabel('Horário (h)', fontsize=font_size)
+axs[0].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[0].grid(True, linestyle='--')
+axs[0].set_xticks(xticks)
+axs[0].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Plotar o segundo gráfico
+axs[1].step(time_hours, values6, where='post', color='red')  # Usar gráfico de degrau
+axs[1].set_title('(b) Recarga rápida tipo 2', fontsize=font_size)
+axs[1].set_xlabel('Horário (h)', fontsize=font_size)
+axs[1].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[1].grid(True, linestyle='--')
+axs[1].set_xticks(xticks)
+axs[1].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Plotar o terceiro gráfico
+axs[2].step(time_hours, values7, where='post', color='green')  # Usar gráfico de degrau
+axs[2].set_title('(c) Recarga lenta', fontsize=font_size)
+axs[2].set_xlabel('Horário (h)', fontsize=font_size)
+axs[2].set_ylabel('Potência Ativa (pu)', fontsize=font_size)
+axs[2].grid(True, linestyle='--')
+axs[2].set_xticks(xticks)
+axs[2].tick_params(axis='both', which='major', labelsize=tick_size)
+
+# Ajustar o layout
+plt.tight_layout()
+plt.show()
+
+
+######## NOVA PLOTAGEM DAS TENSÕES DOS POSTES AO LONGO DE 24 HORAS ########################################
+
+Fase_desejada = 1     # Fase A = 1, Fase B = 3 e Fase C = 5
+
+if Fase_desejada == 1:
+     fase_escolhida = "A"
+     item = "(a)"
+if Fase_desejada == 3:
+     fase_escolhida = "B"
+     item = "(b)"
+if Fase_desejada == 5:
+     fase_escolhida = "C"
+     item = "(c)"
+
+# Inicializando um DataFrame para armazenar as tensões de todos os postes
+df_tensoes_postes = pd.DataFrame({'tempo': time_hours})
+
+##### Tensões de todas as barras monitoradas, na ordem da rede a partir do trafo (índice de topologia
+##### montado do bus1/bus2 das linhas, sem depender do nome das linhas)
+for barra in sessao.topologia.barras_ordenadas(sessao.monitores_barras):
+    tensao_fase = dados_monitores.canal(sessao.monitores_barras[barra], Fase_desejada)  # Supondo Va = canal1
+    df_tensoes_postes[barra.upper()] = tensao_fase
+
+# Mapa de calor das tensões de todos os postes (poste x tempo, cores das faixas do PRODIST).
+# Uma imagem no lugar de uma curva por poste: continua legível com milhares de barras
+postes = list(df_tensoes_postes.columns[1:])  # Pulando a coluna 'tempo'
+fig, ax, im = plotar_mapa_tensoes(df_tensoes_postes[postes].to_numpy().T, time_hours, postes,
+                                  titulo=f'{item} Tensões da fase {fase_escolhida} em todos os postes')
+plt.tight_layout()
+plt.show()
+
+
+
@@ -0,0 +1,217 @@
+##########################################################
+##   Topologia do circuito (barras, linhas e cargas)    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Índice da topologia montado a partir do bus1/bus2 das linhas e das barras
+# do trafo (e não do nome das linhas), uma vez por compilação:
+#   - adjacência em arrays (formato CSR: vizinhos e linhas de cada barra);
+#   - barras em ordem de busca em largura a partir do secundário do trafo, com
+#     o vetor de pais (pai[k] < k), a profundidade e a linha que alimenta cada
+#     barra, e o caminho até a fonte;
+#   - ordem em profundidade (pré-ordem), em que as barras a jusante de cada
+#     barra ocupam um intervalo contíguo: os conjuntos de cargas/geradores a
+#     jusante são fatias de um array, e as somas a jusante saem de uma soma
+#     acumulada.
+# Tudo em O(N). As barras sem ligação com o trafo ficam fora do índice
+# (em isoladas). Em redes com malha, a árvore é a da busca em largura e as
+# linhas que fecham as malhas ficam em malhas (a sessão não deixa de compilar).
+
+import numpy as np
+
+
+def _barra(nome_barra):
+    # 'p2.1.3.4' -> 'p2'
+    return nome_barra.split(".")[0].lower()
+
+
+class TopologiaCircuito:
+    """Índice radial das barras do circuito compilado (adjacência, pais, profundidade e jusante)."""
+
+    def __init__(self, dss, trafo):
+        # trafo: nome do trafo MT/BT (a sessão passa sessao.trafo)
+        # Barras e linhas do circuito
+        nomes_linhas = dss.lines.names
+        extremos = []
+        for nome in nomes_linhas:
+            dss.lines.name = nome
+            extremos.append((_barra(dss.lines.bus1), _barra(dss.lines.bus2)))
+        dss.circuit.set_active_element(f"Transformer.{trafo}")
+        barras_trafo = [_barra(b) for b in dss.cktelement.bus_names]
+        self.fonte = barras_trafo[0]   # barra do primário do trafo
+        raiz = barras_trafo[-1]        # barra do secundário (início da rede BT)
+
+        todas = list(dict.fromkeys([raiz] + [b for par in extremos for b in par]))
+        numero = {barra: i for i, barra in enumerate(todas)}
+        origem = np.array([numero[b1] for b1, _ in extremos], dtype=int)
+        destino = np.array([numero[b2] for _, b2 in extremos], dtype=int)
+
+        # Adjacência (CSR) das barras na numeração de leitura
+        n = len(todas)
+        pontas = np.concatenate([origem, destino])
+        vizinhos = np.concatenate([destino, origem])
+        linhas = np.tile(np.arange(len(extremos)), 2)
+        ordem = np.argsort(pontas, kind="stable")
+        inicio = np.zeros(n + 1, dtype=int)
+        np.cumsum(np.bincount(pontas, minlength=n), out=inicio[1:])
+        vizinhos, linhas = vizinhos[ordem], linhas[ordem]
+
+        # Busca em largura a partir do secundário do trafo
+        pai_leitura = np.full(n, -1)
+        linha_leitura = np.full(n, -1)
+        visitado = np.zeros(n, dtype=bool)
+        visitado[0] = True
+        fechadas = set()
+        fila = [0]
+        for barra in fila:
+            for j in range(inicio[barra], inicio[barra + 1]):
+                vizinho, linha = vizinhos[j], linhas[j]
+                if linha == linha_leitura[barra]:
+                    continue
+                if visitado[vizinho]:
+                    fechadas.add(int(linha))
+                    continue
+                visitado[vizinho] = True
+                pai_leitura[vizinho] = barra
+                linha_leitura[vizinho] = linha
+                fila.append(vizinho)
+
+        # Renumeração na ordem da busca (índice 0 = secundário do trafo)
+        fila = np.array(fila)
+        novo = np.full(n, -1)
+        novo[fila] = np.arange(len(fila))
+        self.barras = [todas[i] for i in fila]
+        self.indices = {barra: k for k, barra in enumerate(self.barras)}
+        self.isoladas = [todas[i] for i in np.flatnonzero(~visitado)]
+        self.linhas = nomes_linhas
+        self.malhas = [nomes_linhas[linha] for linha in sorted(fechadas)]   # linhas fora da árvore radial
+        self.pai = np.where(pai_leitura[fila] >= 0, novo[pai_leitura[fila]], -1)
+        self.linha_pai = linha_leitura[fila]    # índice em self.linhas da linha que alimenta a barra (-1 na raiz)
+        self.profundidade = np.zeros(len(fila), dtype=int)
+        for k in range(1, len(fila)):
+            self.profundidade[k] = self.profundidade[self.pai[k]] + 1
+
+        # Adjacência na numeração da busca (apenas barras ligadas ao trafo)
+        ligada = visitado[pontas[ordem]]
+        self.adj_inicio = np.zeros(len(fila) + 1, dtype=int)
+        np.cumsum(np.bincount(novo[pontas[ordem][ligada]], minlength=len(fila)), out=self.adj_inicio[1:])
+        reordenar = np.argsort(novo[pontas[ordem][ligada]], kind="stable")
+        self.adj_vizinhos = novo[vizinhos[ligada]][reordenar]
+        self.adj_linhas = linhas[ligada][reordenar]
+
+        self._montar_preordem()
+        self._montar_elementos(dss)
+
+    def _montar_preordem(self):
+        # Pré-ordem (busca em profundidade): as barras a jusante de k são preordem[entrada[k]:saida[k]]
+        n = len(self.barras)
+        filhos_inicio = np.zeros(n + 1, dtype=int)
+        np.cumsum(np.bincount(self.pai[1:], minlength=n), out=filhos_inicio[1:])
+        filhos = np.argsort(self.pai[1:], kind="stable") + 1
+
+        tamanho = np.ones(n, dtype=int)
+        for k in range(n - 1, 0, -1):
+            tamanho[self.pai[k]] += tamanho[k]
+
+        self.entrada = np.zeros(n, dtype=int)
+        for k in range(n):
+            # Filhos ocupam intervalos consecutivos logo após a barra
+            posicao = self.entrada[k] + 1
+            for filho in filhos[filhos_inicio[k]:filhos_inicio[k + 1]]:
+                self.entrada[filho] = posicao
+                posicao += tamanho[filho]
+        self.saida = self.entrada + tamanho
+        self.preordem = np.empty(n, dtype=int)
+        self.preordem[self.entrada] = np.arange(n)
+
+    def _montar_elementos(self, dss):
+        # Cargas e geradores em ordem de pré-ordem da barra: os de jusante de k são uma fatia contígua
+        self.elementos = {}
+        for tipo, colecao in (("cargas", dss.loads), ("geradores", dss.generators)):
+            nomes = colecao.names if colecao.count > 0 else []
+            barra = []
+            for nome in nomes:
+                colecao.name = nome
+                barra.append(self.indices.get(_barra(dss.cktelement.bus_names[0]), -1))
+            barra = np.array(barra, dtype=int)
+            ligados = np.flatnonzero(barra >= 0)
+            ordem = ligados[np.argsort(self.entrada[barra[ligados]], kind="stable")]
+            posicoes = self.entrada[barra[ordem]]
+            self.elementos[tipo] = {
+                "nomes": list(nomes),
+                "barra": barra,                                   # índice da barra de cada elemento (-1: isolada)
+                "ordem": ordem,                                   # elementos em pré-ordem da barra
+                "inicio": np.searchsorted(posicoes, np.arange(len(self.barras) + 1)),
+            }
+
+    ############################
+    ### Consultas
+    ############################
+    def indice(self, barra):
+        return self.indices[_barra(barra)]
+
+    def vizinhos(self, barra):
+        k = self.indice(barra)
+        return [self.barras[v] for v in self.adj_vizinhos[self.adj_inicio[k]:self.adj_inicio[k + 1]]]
+
+    def caminho(self, barra):
+        # Barras da barra até o secundário do trafo (inclusive)
+        k = self.indice(barra)
+        caminho = [k]
+        while self.pai[k] >= 0:
+            k = self.pai[k]
+            caminho.append(k)
+        return [self.barras[k] for k in caminho]
+
+    def linhas_caminho(self, barra):
+        # Linhas percorridas da barra até o trafo
+        return [self.linhas[self.linha_pai[self.indice(b)]] for b in self.caminho(barra)[:-1]]
+
+    def jusante(self, barra):
+        # Barras a jusante (incluindo a própria barra), em pré-ordem
+        k = self.indice(barra)
+        return [self.barras[j] for j in self.preordem[self.entrada[k]:self.saida[k]]]
+
+    def elementos_jusante(self, barra, tipo="cargas"):
+        # Cargas (ou geradores) ligados à barra ou a jusante dela
+        elementos = self.elementos[tipo]
+        k = self.indice(barra)
+        fatia = elementos["ordem"][elementos["inicio"][self.entrada[k]]:elementos["inicio"][self.saida[k]]]
+        return [elementos["nomes"][i] for i in fatia]
+
+    def somar_jusante(self, valores):
+        # valores: (barra, ...) na ordem de self.barras -> soma de cada barra com as de jusante
+        valores = np.asarray(valores, dtype=float)
+        acumulado = np.zeros((len(self.barras) + 1,) + valores.shape[1:])
+        np.cumsum(valores[self.preordem], axis=0, out=acumulado[1:])
+        return acumulado[self.saida] - acumulado[self.entrada]
+
+    def somar_elementos(self, valores, tipo="cargas"):
+        # valores: (elemento, ...) na ordem de dss.loads/dss.generators -> total por barra (sem jusante)
+        valores = np.asarray(valores, dtype=float)
+        barra = self.elementos[tipo]["barra"]
+        total = np.zeros((len(self.barras),) + valores.shape[1:])
+        np.add.at(total, barra[barra >= 0], valores[barra >= 0])
+        return total
+
+    def barras_ordenadas(self, monitores_barras=None):
+        # Barras em pré-ordem (ramais contíguos, para gráficos); opcionalmente só as que têm monitor
+        ordem = [self.barras[k] for k in self.preordem]
+        if monitores_barras is None:
+            return ordem
+        return [barra for barra in ordem if barra in monitores_barras]
+
+
+if __name__ == "__main__":
+    import os
+    from Circbt_Sessao import SessaoDSS
+
+    file_dss = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dssfiles/circbtfull_storage.dss')
+    sessao = SessaoDSS(file_dss, modo="daily", stepsize="10m", number=144)
+    topologia = sessao.topologia
+
+    for barra in topologia.barras_ordenadas():
+        k = topologia.indice(barra)
+        print(f"{'  ' * topologia.profundidade[k]}{barra:<6} cargas a jusante: "
+              f"{len(topologia.elementos_jusante(barra))}")
+    print("Caminho P15 -> trafo:", " - ".join(topologia.caminho("P15")))
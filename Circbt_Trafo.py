@@ -0,0 +1,136 @@
+##########################################################
+##   Modelo térmico e perda de vida do transformador    ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Temperaturas do topo do óleo e do ponto mais quente do enrolamento a partir
+# da série de potência aparente (kVA), pelo modelo exponencial da IEEE C57.91
+# (cláusula 7), e envelhecimento da isolação: fator de aceleração (FAA), fator
+# equivalente no período (FEQA) e perda de vida em horas e em %.
+#
+# Os cálculos são vetorizados: s_kva pode ter qualquer forma (..., tempo), ex.
+# (cenário, trafo, tempo), e todas as séries são processadas juntas. A resposta
+# de 1ª ordem é calculada em blocos de passos com uma multiplicação de matrizes
+# (em vez de um laço passo a passo), o que permite séries anuais de muitos
+# cenários em poucos segundos. O estado final pode ser passado para o bloco
+# seguinte (simulações longas em blocos, como em Circbt_Anual).
+
+import numpy as np
+
+# Trafo de distribuição em óleo mineral, resfriamento ONAN (valores típicos da IEEE C57.91)
+PARAMETROS_ONAN = {
+    "elevacao_oleo": 55.0,              # elevação do topo do óleo sobre o ambiente, carga nominal (°C)
+    "gradiente_ponto_quente": 25.0,     # elevação do ponto mais quente sobre o topo do óleo, carga nominal (°C)
+    "relacao_perdas": 5.0,              # perdas em carga / perdas em vazio, carga nominal
+    "n": 0.8,                           # expoente do óleo
+    "m": 0.8,                           # expoente do enrolamento
+    "constante_oleo_h": 3.0,            # constante de tempo do óleo (h)
+    "constante_enrolamento_h": 4 / 60,  # constante de tempo do enrolamento (h)
+    "ponto_quente_referencia": 110.0,   # temperatura de referência do envelhecimento (°C)
+    "vida_normal_h": 180000.0,          # vida normal da isolação (h)
+}
+
+TAMANHO_BLOCO = 256
+
+
+def _filtro_primeira_ordem(entrada, a, inicial, bloco=TAMANHO_BLOCO):
+    # y[t] = a * y[t-1] + (1 - a) * u[t] para todas as séries (linhas) de uma vez.
+    # Em cada bloco de L passos: y = u @ M.T + y_anterior * a^(1..L), com M[j, k] = (1 - a) a^(j-k), k <= j
+    n_series, n_passos = entrada.shape
+    saida = np.empty((n_series, n_passos))
+    j = np.arange(bloco)
+    expoentes = j[:, np.newaxis] - j[np.newaxis, :]
+    matriz = np.where(expoentes >= 0, (1 - a) * a ** np.maximum(expoentes, 0), 0.0)
+    potencias = a ** (j + 1)
+
+    anterior = np.asarray(inicial, dtype=float)
+    for inicio in range(0, n_passos, bloco):
+        u = entrada[:, inicio:inicio + bloco]
+        L = u.shape[1]
+        saida[:, inicio:inicio + L] = u @ matriz[:L, :L].T + anterior[:, np.newaxis] * potencias[:L]
+        anterior = saida[:, inicio + L - 1]
+    return saida
+
+
+def _fator_decaimento(passo_h, constante_h):
+    return float(np.exp(-passo_h / constante_h)) if constante_h > 0 else 0.0
+
+
+def temperaturas_trafo(s_kva, kva_nominal, passo_h, temperatura_ambiente=30.0, parametros=PARAMETROS_ONAN,
+                       estado=None, periodico=False):
+    # Topo do óleo e ponto mais quente (°C), com a forma de s_kva, e o estado final (elevações do óleo
+    # e do ponto quente) para continuar em um próximo bloco. kva_nominal tem a forma de s_kva sem o eixo
+    # do tempo (ou escalar); temperatura_ambiente: escalar, perfil (tempo,) ou array com a forma de s_kva.
+    # Sem estado inicial, parte do regime permanente da primeira amostra; periodico=True repete a série
+    # uma vez antes (curvas diárias que se repetem, ex. nas varreduras).
+    s_kva = np.asarray(s_kva, dtype=float)
+    forma = s_kva.shape
+    carga = (s_kva / np.asarray(kva_nominal, dtype=float)[..., np.newaxis]).reshape(-1, forma[-1])
+    ambiente = np.broadcast_to(np.asarray(temperatura_ambiente, dtype=float), forma).reshape(-1, forma[-1])
+
+    # Elevações finais (regime permanente) para a carga de cada passo
+    r = parametros["relacao_perdas"]
+    elevacao_oleo_final = parametros["elevacao_oleo"] * ((carga**2 * r + 1) / (r + 1)) ** parametros["n"]
+    elevacao_ponto_quente_final = parametros["gradiente_ponto_quente"] * carga ** (2 * parametros["m"])
+
+    a_oleo = _fator_decaimento(passo_h, parametros["constante_oleo_h"])
+    a_enrolamento = _fator_decaimento(passo_h, parametros["constante_enrolamento_h"])
+    if estado is None:
+        estado = (elevacao_oleo_final[:, 0], elevacao_ponto_quente_final[:, 0])
+        if periodico:
+            estado = (_filtro_primeira_ordem(elevacao_oleo_final, a_oleo, estado[0])[:, -1],
+                      _filtro_primeira_ordem(elevacao_ponto_quente_final, a_enrolamento, estado[1])[:, -1])
+    else:
+        estado = tuple(np.broadcast_to(np.asarray(e, dtype=float).ravel(), (carga.shape[0],)) for e in estado)
+
+    elevacao_oleo = _filtro_primeira_ordem(elevacao_oleo_final, a_oleo, estado[0])
+    elevacao_ponto_quente = _filtro_primeira_ordem(elevacao_ponto_quente_final, a_enrolamento, estado[1])
+    topo_oleo = ambiente + elevacao_oleo
+    ponto_quente = topo_oleo + elevacao_ponto_quente
+
+    estado_final = (elevacao_oleo[:, -1].reshape(forma[:-1]), elevacao_ponto_quente[:, -1].reshape(forma[:-1]))
+    return topo_oleo.reshape(forma), ponto_quente.reshape(forma), estado_final
+
+
+def fator_envelhecimento(ponto_quente, referencia=PARAMETROS_ONAN["ponto_quente_referencia"]):
+    # FAA: velocidade de envelhecimento em relação à do ponto quente de referência (papel termoestabilizado)
+    return np.exp(15000 / (referencia + 273) - 15000 / (np.asarray(ponto_quente) + 273))
+
+
+def envelhecimento_trafo(s_kva, kva_nominal, passo_h, temperatura_ambiente=30.0, parametros=PARAMETROS_ONAN,
+                         estado=None, periodico=False):
+    # Séries de temperatura e FAA e os indicadores do período (um valor por série)
+    topo_oleo, ponto_quente, estado_final = temperaturas_trafo(s_kva, kva_nominal, passo_h, temperatura_ambiente,
+                                                               parametros, estado, periodico)
+    faa = fator_envelhecimento(ponto_quente, parametros["ponto_quente_referencia"])
+    perda_vida_h = faa.sum(axis=-1) * passo_h
+    return {
+        "topo_oleo": topo_oleo,
+        "ponto_quente": ponto_quente,
+        "FAA": faa,
+        "FEQA": faa.mean(axis=-1),
+        "topo_oleo_max": topo_oleo.max(axis=-1),
+        "ponto_quente_max": ponto_quente.max(axis=-1),
+        "perda_vida_h": perda_vida_h,
+        "perda_vida_pct": 100 * perda_vida_h / parametros["vida_normal_h"],
+        "estado": estado_final,
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    # Um ano (passos de 10 min) de 100 cenários de carga de um trafo de 75 kVA, ambiente com ciclo diário
+    passo_h = 10 / 60
+    horas = np.arange(365 * 144) * passo_h
+    gerador = np.random.default_rng(0)
+    perfil = 45 + 35 * np.clip(np.sin(2 * np.pi * (horas - 12) / 24), 0, None)
+    s_kva = perfil * gerador.uniform(0.8, 1.4, (100, 1)) + gerador.normal(0, 3, (100, len(horas)))
+    ambiente = 25 + 5 * np.sin(2 * np.pi * (horas - 9) / 24)
+
+    inicio = time.perf_counter()
+    resultado = envelhecimento_trafo(np.abs(s_kva), 75.0, passo_h, ambiente)
+    print(f"{s_kva.size} amostras em {time.perf_counter() - inicio:.2f} s")
+    print(f"Ponto quente máx.: {resultado['ponto_quente_max'].min():.1f} a {resultado['ponto_quente_max'].max():.1f} °C")
+    print(f"FEQA: {resultado['FEQA'].min():.3f} a {resultado['FEQA'].max():.3f}")
+    print(f"Perda de vida no ano: {resultado['perda_vida_pct'].min():.3f} a {resultado['perda_vida_pct'].max():.3f} %")
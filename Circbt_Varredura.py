@@ -0,0 +1,167 @@
+##########################################################
+##   Varredura de dimensionamento/alocação de baterias  ##
+##   Data: 18/10/2026   REV 1.0                         ##
+##########################################################
+
+# Executa a grade (poste x kW x kWh x SOC) em um pool de processos. Cada
+# processo possui a sua própria instância py_dss_interface.DSS(), compila o
+# circuito uma única vez (SessaoDSS) e resolve apenas os deltas de cada ponto.
+# Com cache de simulações, pontos já resolvidos (nesta ou em varreduras
+# anteriores) são lidos do disco sem novo solve.
+
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Circbt_Sessao import SessaoDSS
+import Circbt_Perfil as perfil
+from Circbt_Indicadores import calcular_indicadores
+from Circbt_Monitores import extrair_monitores
+from Circbt_Resultados import EscritorResultados, colunas_cenario
+from Circbt_Cache import CacheSimulacoes, resolver_com_cache, pasta_cache_padrao, LIMITE_PADRAO
+from Circbt_Trafo import envelhecimento_trafo
+from Circbt_Despacho import carga_base, despachar_bateria
+
+############################
+### Processo trabalhador ###
+############################
+
+_sessao = None
+_pasta_resultados = None
+_cache = None
+_base_despacho = None
+
+
+def _iniciar_trabalhador(file_dss, stepsize, number, pasta_resultados=None, pasta_cache=None,
+                         limite_cache=LIMITE_PADRAO, despacho_otimo=False):
+    global _sessao, _pasta_resultados, _cache, _base_despacho
+    perfil.iniciar_trabalhador()
+    _sessao = SessaoDSS(file_dss, modo="daily", stepsize=stepsize, number=number)
+    _pasta_resultados = pasta_resultados
+    _cache = CacheSimulacoes(pasta_cache, limite_cache) if pasta_cache is not None else None
+    # Caso sem bateria resolvido uma vez por processo: base do despacho otimizado de todos os pontos
+    _base_despacho = carga_base(_sessao) if despacho_otimo else None
+
+
+def avaliar_ponto(sessao, poste, kwrated, kwhrated, socbat, escritor=None, cache=None, despacho=None):
+    monitor_v = sessao.monitor_barra(poste)
+    monitores_trafos = [f"P_{t}" for t in sessao.transformers]
+
+    # Inserindo a bateria (kwrated=0 -> caso sem bateria) e resolvendo o dia. Com o caso base
+    # (despacho = carga_base), a bateria segue a curva de corte de pico em vez da CurvaBAT
+    if kwrated > 0 and despacho is not None:
+        despachar_bateria(sessao, poste, kwrated, kwhrated, socbat, despacho)
+    elif kwrated > 0:
+        sessao.adicionar_bateria(poste, kwrated, kwhrated, socbat)
+    try:
+        if cache is not None:
+            # Todos os monitores (do cache ou de um novo solve); os casos sem bateria dos
+            # vários postes são o mesmo cenário e são resolvidos uma única vez
+            dados, salvos = resolver_com_cache(sessao, cache)
+            convergiu = bool(salvos["convergiu"])
+        else:
+            sessao.resolver()
+            convergiu = bool(sessao.dss.solution.converged)
+            monitores = None if escritor is not None else [monitor_v] + monitores_trafos
+            dados = extrair_monitores(sessao.dss, monitores)
+
+        # Extraindo as tensões do poste da bateria (Va = canal1, Vb = canal3, Vc = canal5)
+        tensoes = dados.selecionar([monitor_v], [1, 3, 5])[0]
+
+        # Extraindo as potências de todos os trafos (P = canais 1, 3, 5 || Q = canais 2, 4, 6): (trafo, tempo)
+        ptrafos = dados.selecionar(monitores_trafos, [1, 3, 5]).sum(axis=1, dtype=float)
+        qtrafos = dados.selecionar(monitores_trafos, [2, 4, 6]).sum(axis=1, dtype=float)
+        strafos = np.sqrt(ptrafos**2 + qtrafos**2)
+        principal = [t.lower() for t in sessao.transformers].index(sessao.trafo.lower())
+        ptotal, stotal = ptrafos[principal], strafos[principal]
+
+        # Séries completas de todos os monitores no armazém de resultados (opcional)
+        if escritor is not None:
+            parametros = {"poste": poste, "kwrated": kwrated, "kwhrated": kwhrated, "socbat": socbat,
+                          "com_bateria": kwrated > 0}
+            escritor.adicionar(parametros, colunas_cenario(dados, sessao.trafo),
+                               np.arange(len(ptotal)) * sessao.dss.solution.step_size / 3600)
+    finally:
+        # A sessão volta ao caso base mesmo se o solve ou a extração falhar (próximos pontos do processo)
+        if kwrated > 0:
+            sessao.desfazer()
+
+    indicadores = calcular_indicadores(tensoes)
+    resultado = {"poste": poste, "kwrated": kwrated, "kwhrated": kwhrated, "socbat": socbat}
+    for indice in ("DRP", "DRC", "P1", "P99"):
+        for fase, valor in zip("ABC", indicadores[indice]):
+            resultado[f"{indice}_{fase}"] = valor
+    resultado["kVA_max"] = stotal.max()
+    resultado["kWh_trafo"] = ptotal.sum() * sessao.dss.solution.step_size / 3600
+
+    # Temperatura do ponto mais quente e perda de vida de todos os trafos de uma vez (curvas diárias
+    # repetidas: regime periódico). Colunas sem sufixo: trafo principal; com vários trafos, uma por trafo
+    kva_trafos = []
+    for trafo in sessao.transformers:
+        sessao.dss.transformers.name = trafo
+        kva_trafos.append(sessao.dss.transformers.kva)
+    termico = envelhecimento_trafo(strafos, np.array(kva_trafos), sessao.dss.solution.step_size / 3600,
+                                   periodico=True)
+    colunas = [(principal, "")]
+    if len(sessao.transformers) > 1:
+        colunas += [(k, f"_{trafo}") for k, trafo in enumerate(sessao.transformers)]
+    for k, sufixo in colunas:
+        resultado[f"ponto_quente_max{sufixo}"] = float(termico["ponto_quente_max"][k])
+        resultado[f"FEQA{sufixo}"] = float(termico["FEQA"][k])
+        resultado[f"perda_vida_h{sufixo}"] = float(termico["perda_vida_h"][k])
+    resultado["convergiu"] = convergiu
+    return resultado
+
+
+def _executar_pontos(pontos):
+    # Um lote de pontos por tarefa: com armazém de resultados, o lote vira uma parte
+    if _pasta_resultados is None:
+        return [avaliar_ponto(_sessao, *ponto, cache=_cache, despacho=_base_despacho) for ponto in pontos]
+    with EscritorResultados(_pasta_resultados, por_parte=len(pontos)) as escritor:
+        return [avaliar_ponto(_sessao, *ponto, escritor=escritor, cache=_cache, despacho=_base_despacho)
+                for ponto in pontos]
+
+############################
+### Varredura completa   ###
+############################
+
+
+def executar_varredura(file_dss, postes, kwrated, kwhrated, socbat, n_processos=None,
+                       stepsize="10m", number=144, incluir_sem_bateria=True, pasta_resultados=None,
+                       pasta_cache=None, limite_cache=LIMITE_PADRAO, despacho_otimo=False):
+    # Grade cartesiana de todos os pontos da varredura
+    pontos = list(itertools.product(postes, kwrated, kwhrated, socbat))
+    if incluir_sem_bateria:
+        pontos = [(poste, 0, 0, 0) for poste in postes] + pontos
+
+    n_processos = n_processos or os.cpu_count()
+    tamanho = max(1, len(pontos) // (4 * n_processos))
+    lotes = [pontos[i:i + tamanho] for i in range(0, len(pontos), tamanho)]
+    if pasta_resultados is not None:
+        pasta_resultados = os.path.abspath(pasta_resultados)
+    if pasta_cache is not None:
+        pasta_cache = os.path.abspath(pasta_cache)
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                             initargs=(os.path.abspath(file_dss), stepsize, number, pasta_resultados,
+                                       pasta_cache, limite_cache, despacho_otimo)) as executor:
+        resultados = [r for lote in executor.map(_executar_pontos, lotes) for r in lote]
+
+    return pd.DataFrame(resultados)
+
+
+if __name__ == "__main__":
+    perfil.ativar_pelo_ambiente()   # CIRCBT_PERFIL / CIRCBT_PERFIL_RASTRO (rastro de cada trabalhador)
+    file_dss = os.path.join(os.path.dirname(__file__), 'dssfiles/circbtfull_storage.dss')
+
+    # Grade da varredura
+    postes = [f"P{i}" for i in range(1, 16)]   # postes candidatos P1..P15
+    kwrated = [10, 20, 30]                     # kW da bateria
+    kwhrated = [50, 100, 150]                  # kWh da bateria
+    socbat = [0, 50]                           # SOC inicial (%)
+
+    # Pontos já simulados em varreduras anteriores vêm do cache (dssfiles/__cache__/simulacoes)
+    df_varredura = executar_varredura(file_dss, postes, kwrated, kwhrated, socbat,
+                                      pasta_cache=pasta_cache_padrao(file_dss))
+    print(df_varredura)
+    df_varredura.to_csv('varredura_baterias.csv', index=False)
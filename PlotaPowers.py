@@ -1,25 +1,24 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from Circbt_Resultados import ArmazemResultados
 
-# Lendo os arquivos CSV
-kVA_total_comBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kVA_total_comBat.csv')
-kVA_total_semBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kVA_total_semBat.csv')
-kW_total_comBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kW_total_comBat.csv')
-kW_total_semBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kW_total_semBat.csv')
-kvar_total_comBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kvar_total_comBat.csv')
-kvar_total_semBat = pd.read_csv(r'C:\pythonjr\circuito_bt\dssfiles\kvar_total_semBat.csv')
+# Lendo os resultados gravados pelo Circbt_Storage_REV7.py (armazém colunar em resultados/):
+# apenas as colunas de potência total do trafo, do último cenário com e sem storage
+armazem = ArmazemResultados(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados'))
+colunas = ['kVA_total', 'kW_total', 'kvar_total']
 
-# Renomeando as colunas para que fiquem identificáveis no DataFrame final
-kVA_total_comBat.columns = ['kVA_total_comBat']
-kVA_total_semBat.columns = ['kVA_total_semBat']
-kW_total_comBat.columns = ['kW_total_comBat']
-kW_total_semBat.columns = ['kW_total_semBat']
-kvar_total_comBat.columns = ['kvar_total_comBat']
-kvar_total_semBat.columns = ['kvar_total_semBat']
+df = pd.DataFrame()
+for com_bateria, sufixo in ((True, 'comBat'), (False, 'semBat')):
+    parametros, valores = armazem.ler(colunas, {'com_bateria': com_bateria})
+    if parametros.empty:
+        raise SystemExit(f"Nenhum cenário {'com' if com_bateria else 'sem'} storage em {armazem.pasta}")
+    for coluna in colunas:
+        df[f'{coluna}_{sufixo}'] = valores[coluna][-1]
 
-# Concatenando as colunas para formar o DataFrame final
-df = pd.concat([kVA_total_comBat, kVA_total_semBat, kW_total_comBat, kW_total_semBat, kvar_total_comBat, kvar_total_semBat], axis=1)
+# Mesma ordem de colunas do DataFrame montado a partir dos CSVs
+df = df[['kVA_total_comBat', 'kVA_total_semBat', 'kW_total_comBat', 'kW_total_semBat', 'kvar_total_comBat', 'kvar_total_semBat']]
 
 # Garantindo que o DataFrame final tenha as dimensões 144x6
 df = df.head(144)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Módulos do repositório importáveis nos testes (o py_dss_interface muda o diretório corrente)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
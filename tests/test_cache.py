@@ -0,0 +1,31 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from Circbt_Sessao import SessaoDSS
+from Circbt_Cache import CacheSimulacoes
+
+FILE_DSS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "dssfiles", "circbtfull_storage.dss")
+
+
+def _chaves_frota(pasta):
+    sessao = SessaoDSS(FILE_DSS, modo="daily", stepsize="10m", number=144)
+    cache = CacheSimulacoes(pasta)
+    frota = [{"barra": "P7", "kwrated": 20, "kwhrated": 50}, {"barra": "P12", "kwrated": 10, "kwhrated": 40}]
+    chaves = [cache.chave(sessao)]
+    sessao.adicionar_frota(frota)
+    chaves.append(cache.chave(sessao))
+    sessao.desfazer(len(frota))
+    chaves.append(cache.chave(sessao))
+    sessao.adicionar_frota(frota)
+    chaves.append(cache.chave(sessao))
+    return chaves
+
+
+def test_frota_desfeita_volta_a_chave_do_caso_base(tmp_path):
+    # OpenDSS em um processo à parte: o processo do pytest não carrega o OpenDSS (os lotes usam fork)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        base, frota, desfeita, refeita = executor.submit(_chaves_frota, str(tmp_path)).result()
+    assert desfeita == base   # monitores de estado E_* desabilitados junto com as baterias
+    assert refeita == frota
+    assert frota != base
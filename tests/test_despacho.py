@@ -0,0 +1,33 @@
+import os
+import numpy as np
+import pytest
+from Circbt_Varredura import executar_varredura
+from Circbt_Despacho import despacho_pico, SOC_MINIMO
+
+FILE_DSS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "dssfiles", "circbtfull_storage.dss")
+
+
+def test_descarga_limitada_a_energia_disponivel():
+    # Bateria vazia e pico no fim do dia: a descarga só conta com a energia carregada antes do pico
+    horas = np.arange(144) / 6
+    carga = 40 + 50 * np.exp(-((horas - 19) / 1.5)**2)
+    reativa = 0.3 * carga
+    despacho = despacho_pico(carga, 1 / 6, 20, 60, soc_inicial=0, reativa=reativa)
+
+    # Energia carregada antes do pico suficiente para a descarga plena no pico (menor pico possível)
+    pico = carga.argmax()
+    assert despacho["potencia"][pico] == pytest.approx(20)
+    assert despacho["pico_resultante"] == pytest.approx(np.hypot(carga[pico] - 20, reativa[pico]))
+    assert despacho["soc"][pico:].min() >= SOC_MINIMO - 1e-9
+
+
+def test_despacho_otimo_nunca_pior_que_curvabat():
+    # Os solves ficam nos processos da varredura (o processo do pytest não carrega o OpenDSS)
+    grade = (["P3", "P7", "P15"], [10, 20, 30], [40, 110, 150], [0, 50])
+    fixo = executar_varredura(FILE_DSS, *grade, n_processos=2, incluir_sem_bateria=False)
+    otimo = executar_varredura(FILE_DSS, *grade, n_processos=2, incluir_sem_bateria=False, despacho_otimo=True)
+    assert (otimo["kVA_max"] <= fixo["kVA_max"] + 0.01).all()
+    # Ponto da revisão: bateria vazia no P7 (o nível de descarga ignorava o SOC inicial)
+    ponto = (otimo["poste"] == "P7") & (otimo["kwrated"] == 20) & (otimo["kwhrated"] == 110) & (otimo["socbat"] == 0)
+    assert otimo.loc[ponto, "kVA_max"].item() < fixo.loc[ponto, "kVA_max"].item()
@@ -0,0 +1,13 @@
+import os
+from Circbt_Hospedagem import calcular_hospedagem
+
+FILE_DSS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "dssfiles", "circbtfull_storage.dss")
+
+
+def test_violacao_do_caso_base_nao_zera_a_capacidade():
+    # p5 a p7 já passam do DRP no caso base: relatadas à parte e fora da verificação da GD no p2
+    df, df_base = calcular_hospedagem(FILE_DSS, barras=["p2"], ligacoes=["A"], n_processos=1)
+    violadas = df_base.loc[df_base["restricao"] == "tensao_133", "elemento"].tolist()
+    assert violadas == ["p5", "p6", "p7"]
+    assert df["kw_max"].item() > 1.0   # antes limitado a 0,3125 kW pelo DRP das barras já violadas
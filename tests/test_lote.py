@@ -0,0 +1,19 @@
+from Circbt_Gerador import gravar_alimentador
+from Circbt_Lote import executar_lote
+
+
+def test_alimentador_com_erro_nao_afeta_os_seguintes(tmp_path):
+    # Redirect inexistente: o OpenDSS do processo fica inutilizável e o processo deve ser substituído
+    bom = tmp_path / "s10" / "s10.dss"
+    grande = tmp_path / "s100" / "s100.dss"
+    gravar_alimentador(str(bom), n_barras=10)
+    gravar_alimentador(str(grande), n_barras=100)
+    ruim = tmp_path / "ruim" / "ruim.dss"
+    ruim.parent.mkdir()
+    ruim.write_text(bom.read_text(encoding="latin-1").replace("loadshapes.dss", "inexistente.dss"),
+                    encoding="latin-1")
+
+    df = executar_lote([str(bom), str(ruim), str(bom), str(grande)], n_processos=1)
+    assert list(df["erro"] == "") == [True, False, True, True]
+    assert df["convergiu"].tolist() == [True, False, True, True]
+    assert "inexistente.dss" in df["erro"][1]   # mensagem do Compile, não "circuito sem transformador"